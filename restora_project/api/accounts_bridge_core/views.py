@@ -11,6 +11,8 @@ from django.shortcuts import get_object_or_404
 from django.db import transaction
 
 from project_apps.accounts.models import User, Profile
+from project_apps.core.logging import lazy_attr
+from project_apps.core.pagination import KeysetPaginationMixin
 from project_apps.accounts.serializers import (UserSerializer,
                                                RegisterSerializer,
                                                ProfileSerializer,
@@ -40,19 +42,19 @@ class RegisterView(APIView):
                         "access": str(refresh.access_token),
                     }
 
-                    logger.info(f"New user registered: {user.email}")
+                    logger.info("New user registered: %s", user.email)
                     return Response({
                         "user": UserSerializer(user).data,
                         "token": token_data,  # Return the token data to the user
                         "message": "Registration successful"
                     }, status=status.HTTP_201_CREATED)
             except Exception as e:
-                logger.error(f"Error during registration: {str(e)}", exc_info=True)
+                logger.error("Error during registration: %s", e, exc_info=True)
                 return Response({"error": "Error during registration"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # Profile View - Handle Access to User Profiles
-class ProfileAPIView(APIView):
+class ProfileAPIView(KeysetPaginationMixin, APIView):
     permission_classes = [IsAuthenticated]  # Only authenticated users can access
 
     def get(self, request):
@@ -62,10 +64,10 @@ class ProfileAPIView(APIView):
         """
         user = request.user
         if user.role == "admin":
-            profiles = Profile.objects.filter(is_deleted=False)
-            serializer = ProfileSerializer(profiles, many=True)
+            profiles = Profile.alive.select_related("user")
+            return self.paginated_response(profiles, ProfileSerializer)
         else:
-            profile = get_object_or_404(Profile, user=user, is_deleted=False)
+            profile = get_object_or_404(Profile.alive, user=user)
             serializer = ProfileSerializer(profile)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -79,10 +81,10 @@ class ProfileAPIView(APIView):
         if serializer.is_valid():
             try:
                 serializer.save()
-                logger.info(f"New profile created: {request.user.email}")
+                logger.info("New profile created: %s", request.user.email)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             except Exception as e:
-                logger.error(f"Error creating profile: {str(e)}", exc_info=True)
+                logger.error("Error creating profile: %s", e, exc_info=True)
                 return Response({'error': 'Error during profile creation'},
                                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
                                 )
@@ -98,7 +100,7 @@ class ProfileDetailAPIView(APIView):
         Admin can view any profile.
         Regular users can only view their own profile.
         """
-        profile = get_object_or_404(Profile, id=id, is_deleted=False)
+        profile = get_object_or_404(Profile.alive, id=id)
         user = request.user
         if user.role != 'admin' and profile.user != user:
             return Response({'error': 'You do not have permission to view this profile'},
@@ -114,7 +116,7 @@ class ProfileDetailAPIView(APIView):
         Admin can update any profile.
         Regular users can only update their own profile.
         """
-        profile = get_object_or_404(Profile, id=id, is_deleted=False)
+        profile = get_object_or_404(Profile.alive, id=id)
         user = request.user
         if user.role != 'admin' and profile.user != user:
             return Response({'error': 'You do not have permission to update this profile'},
@@ -127,10 +129,10 @@ class ProfileDetailAPIView(APIView):
         if serializer.is_valid():
             try:
                 serializer.save()
-                logger.info(f"Profile updated: {profile.user.email}")
+                logger.info("Profile updated: %s", lazy_attr(profile, 'user.email'))
                 return Response(serializer.data, status=status.HTTP_200_OK)
             except Exception as e:
-                logger.error(f"Error updating profile: {str(e)}", exc_info=True)
+                logger.error("Error updating profile: %s", e, exc_info=True)
                 return Response({'error': 'Error during profile update'},
                                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
                                 )
@@ -143,17 +145,17 @@ class ProfileDetailAPIView(APIView):
         Admin can delete any profile.
         Regular users can only delete their own profile.
         """
-        profile = get_object_or_404(Profile, id=id, is_deleted=False)
+        profile = get_object_or_404(Profile.alive, id=id)
         user = request.user
         if user.role != 'admin' and profile.user != user:
             return Response({'error': 'You do not have permission to delete this profile'},
                              status=status.HTTP_403_FORBIDDEN)
         try:
             profile.delete()  # Soft delete functionality
-            logger.info(f"Profile deleted: {profile.user.email}")
+            logger.info("Profile deleted: %s", lazy_attr(profile, 'user.email'))
             return Response({'message': 'Profile successfully deleted.'}, status=status.HTTP_204_NO_CONTENT)
         except Exception as e:
-            logger.error(f"Error deleting profile: {str(e)}", exc_info=True)
+            logger.error("Error deleting profile: %s", e, exc_info=True)
             return Response({'error': 'Error during profile deletion'},
                              status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -165,7 +167,7 @@ class LoginView(APIView):
         """
         Login using email and password.
         """
-        logger.debug(f"Login request received successfully {request.data}")
+        logger.debug("Login request received successfully %s", request.data)
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
             try:
@@ -175,7 +177,7 @@ class LoginView(APIView):
                     'refresh': str(refresh),
                     'access': str(refresh.access_token),
                 }
-                logger.info(f"User logged in: {user.email}")
+                logger.info("User logged in: %s", user.email)
                 return Response({
                     'user': {
                         'id': user.id,
@@ -186,11 +188,11 @@ class LoginView(APIView):
                     'tokens': token_data
                 }, status=status.HTTP_200_OK)
             except Exception as e:
-                logger.error(f"Login error: {str(e)}", exc_info=True)
+                logger.error("Login error: %s", e, exc_info=True)
                 return Response({'error': 'Error during login'},
                                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
                                 )
-        logger.error(f"Serializer error: {serializer.errors}")
+        logger.error("Serializer error: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # Logout View - Handle User Logout
@@ -201,7 +203,7 @@ class LogoutView(APIView):
         """
         Log out the user by adding the refresh token to the blacklist.
         """
-        logger.debug(f"Logout request received: {request.data}")
+        logger.debug("Logout request received: %s", request.data)
         try:
             refresh_token = request.data.get("refresh")
             if not refresh_token:
@@ -212,11 +214,11 @@ class LogoutView(APIView):
 
             token = RefreshToken(refresh_token)
             token.blacklist()  # Add the token to the blacklist to invalidate it
-            logger.info(f"User logged out: {request.user.email}")
+            logger.info("User logged out: %s", request.user.email)
             return Response({"message": "Successfully logged out"},
                             status=status.HTTP_205_RESET_CONTENT)
         except Exception as e:
-            logger.error(f"Logout error: {str(e)}", exc_info=True)
+            logger.error("Logout error: %s", e, exc_info=True)
             return Response({"error": f"Error during logout: {str(e)}"},
                             status=status.HTTP_400_BAD_REQUEST
                             )
@@ -241,9 +243,9 @@ class AdminUserCreateView(APIView):
             try:
                 with transaction.atomic():
                     user = serializer.save()
-                    logger.info(f"Admin created new user: {user.email}, role: {user.role}")
+                    logger.info("Admin created new user: %s, role: %s", user.email, user.role)
                     return Response(serializer.data, status=status.HTTP_201_CREATED)
             except Exception as e:
-                logger.error(f"Error creating user: {str(e)}", exc_info=True)
+                logger.error("Error creating user: %s", e, exc_info=True)
                 return Response({"error": "Error during user creation."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -8,14 +8,15 @@ from rest_framework.permissions import IsAuthenticated
 
 from project_apps.accounts.models import User
 from project_apps.accounts.serializers import UserSerializer
-from project_apps.notifications.models import DiscountCode, BonusPoints
-from project_apps.customers.models import BonusTransaction
+from project_apps.notifications.models import DiscountCode
+from project_apps.customers import loyalty, stats as customer_stats
+from project_apps.core.constants import BONUS_COFFEE_THRESHOLD
+from project_apps.core.pagination import KeysetPaginationMixin
 from project_apps.core.logging import get_logger
-from project_apps.orders.models import Order
 
 logger = get_logger(__name__)
 
-class CustomerView(APIView):
+class CustomerView(KeysetPaginationMixin, APIView):
     # List, detail, creation, update, and deletion of customers.
     permission_classes = [IsAuthenticated]
 
@@ -23,39 +24,39 @@ class CustomerView(APIView):
         # Returns the customer list or details.
         user = request.user
         logger.debug(
-            f"Customer request received: {user.email}, ID: {customer_id}"
+            "Customer request received: %s, ID: %s", user.email, customer_id
         )
 
         if customer_id:
-            customer = get_object_or_404(User, id=customer_id, is_deleted=False, role="customer")
+            customer = get_object_or_404(User.alive, id=customer_id, role="customer")
             if user.role == "customer" and customer != user:
                 logger.error(
-                    f"Unauthorized customer view attempt: {user.email}, customer ID: {customer_id}"
+                    "Unauthorized customer view attempt: %s, customer ID: %s", user.email, customer_id
                 )
                 return Response(
                     {"error": "You can only view your own data."},
                     status=status.HTTP_403_FORBIDDEN,
                 )
             serializer = UserSerializer(customer)
-            logger.info(f"Customer details returned: ID {customer_id}")
+            logger.sampled().info("Customer details returned: ID %s", customer_id)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         if user.role not in ["admin", "staff"]:
-            customer = get_object_or_404(User, id=user.id, is_deleted=False, role="customer")
+            customer = get_object_or_404(User.alive, id=user.id, role="customer")
             serializer = UserSerializer(customer)
-            logger.info(f"Own customer data returned: {user.email}")
+            logger.sampled().info("Own customer data returned: %s", user.email)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
-        customers = User.objects.filter(is_deleted=False, role="customer")
-        serializer = UserSerializer(customers, many=True)
-        logger.info(f"Customer list returned: count: {customers.count()}")
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        customers = User.alive.filter(role="customer")
+        response = self.paginated_response(customers, UserSerializer)
+        logger.sampled().info("Customer list returned: count: %s", len(response.data['results']))
+        return response
 
     def post(self, request):
         # Creates a new customer (only admin).
         if request.user.role != "admin":
             logger.error(
-                f"Unauthorized creation attempt: {request.user.email}, role: {request.user.role}"
+                "Unauthorized creation attempt: %s, role: %s", request.user.email, request.user.role
             )
             return Response(
                 {"error": "Only admins can create customers."},
@@ -66,10 +67,10 @@ class CustomerView(APIView):
         if serializer.is_valid():
             customer = serializer.save(role="customer")
             logger.info(
-                f"Customer created: ID {customer.id}, email: {customer.email}"
+                "Customer created: ID %s, email: %s", customer.id, customer.email
             )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
-        logger.error(f"Serializer error: {serializer.errors}")
+        logger.error("Serializer error: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def patch(self, request, customer_id=None):
@@ -81,10 +82,10 @@ class CustomerView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         user = request.user
-        customer = get_object_or_404(User, id=customer_id, is_deleted=False, role="customer")
+        customer = get_object_or_404(User.alive, id=customer_id, role="customer")
         if user.role == "customer" and customer != user:
             logger.error(
-                f"Unauthorized update attempt: {user.email}, customer ID: {customer_id}"
+                "Unauthorized update attempt: %s, customer ID: %s", user.email, customer_id
             )
             return Response(
                 {"error": "You can only update your own data."},
@@ -92,7 +93,7 @@ class CustomerView(APIView):
             )
         if user.role not in ["admin", "customer"]:
             logger.error(
-                f"Unauthorized update attempt: {user.email}, role: {user.role}"
+                "Unauthorized update attempt: %s, role: %s", user.email, user.role
             )
             return Response(
                 {"error": "Only admins or customers can update."},
@@ -105,10 +106,10 @@ class CustomerView(APIView):
         if serializer.is_valid():
             serializer.save()
             logger.info(
-                f"Customer updated: ID {customer.id}, email: {customer.email}"
+                "Customer updated: ID %s, email: %s", customer.id, customer.email
             )
             return Response(serializer.data, status=status.HTTP_200_OK)
-        logger.error(f"Serializer error: {serializer.errors}")
+        logger.error("Serializer error: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, customer_id=None):
@@ -121,17 +122,17 @@ class CustomerView(APIView):
             )
         if request.user.role != "admin":
             logger.error(
-                f"Unauthorized deletion attempt: {request.user.email}, role: {request.user.role}"
+                "Unauthorized deletion attempt: %s, role: %s", request.user.email, request.user.role
             )
             return Response(
                 {"error": "Only admins can delete customers."},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        customer = get_object_or_404(User, id=customer_id, is_deleted=False, role="customer")
+        customer = get_object_or_404(User.alive, id=customer_id, role="customer")
         customer.delete()
         logger.info(
-            f"Customer deleted: ID {customer.id}, email: {customer.email}"
+            "Customer deleted: ID %s, email: %s", customer.id, customer.email
         )
         return Response(
             {"message": "Customer deleted."},
@@ -147,7 +148,7 @@ class CustomerDiscountCodeView(APIView):
         """Checks the discount code."""
         if request.user.role != "customer":
             logger.error(
-                f"Unauthorized discount code attempt: {request.user.email}, role: {request.user.role}"
+                "Unauthorized discount code attempt: %s, role: %s", request.user.email, request.user.role
             )
             return Response(
                 {"error": "Only customers can use discount codes."},
@@ -156,17 +157,17 @@ class CustomerDiscountCodeView(APIView):
 
         code = request.data.get("code")
         if not code:
-            logger.error(f"Discount code not provided: {request.user.email}")
+            logger.error("Discount code not provided: %s", request.user.email)
             return Response(
                 {"error": "Discount code is required."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        discount = DiscountCode.objects.filter(
-            code=code, user=request.user, is_deleted=False, is_used=False
+        discount = DiscountCode.alive.filter(
+            code=code, user=request.user, is_used=False
         ).first()
         if not discount:
-            logger.error(f"Invalid discount code: {request.user.email}, code: {code}")
+            logger.error("Invalid discount code: %s, code: %s", request.user.email, code)
             return Response(
                 {"error": "Discount code is invalid or already used."},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -174,15 +175,15 @@ class CustomerDiscountCodeView(APIView):
 
         discount_percentage = 20.00
         if discount.notification and discount.notification.title == "70% Discount on First Order":
-            if Order.objects.filter(user=request.user, is_deleted=False).exists():
-                logger.error(f"Not the first order: {request.user.email}")
+            if customer_stats.has_orders(request.user.id):
+                logger.error("Not the first order: %s", request.user.email)
                 return Response(
                     {"error": "The 70% discount code is only valid for the first order."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
             discount_percentage = 70.00
 
-        logger.info(f"Discount code accepted: {request.user.email}, code: {code}")
+        logger.info("Discount code accepted: %s, code: %s", request.user.email, code)
         return Response(
             {
                 "message": "Discount code accepted. Use it when placing an order.",
@@ -201,7 +202,7 @@ class BonusRedeemView(APIView):
         """Requests a free coffee gift."""
         if request.user.role != "customer":
             logger.error(
-                f"Unauthorized spend attempt: {request.user.email}, role: {request.user.role}"
+                "Unauthorized spend attempt: %s, role: %s", request.user.email, request.user.role
             )
             return Response(
                 {"error": "Only customers can redeem bonus points."},
@@ -211,33 +212,25 @@ class BonusRedeemView(APIView):
         user = request.user
         action = request.data.get("action")
         if action != "coffee":
-            logger.error(f"Invalid action: {user.email}, action: {action}")
+            logger.error("Invalid action: %s, action: %s", user.email, action)
             return Response(
                 {"error": "The action must be 'coffee'."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        bonus_points = BonusPoints.objects.filter(user=user, is_deleted=False).first()
-        total_points = bonus_points.points if bonus_points else 0
-        if total_points < 5:
+        try:
+            loyalty.redeem_points(user.id, BONUS_COFFEE_THRESHOLD, "Free coffee gift")
+        except loyalty.InsufficientPoints as e:
             logger.error(
-                f"Not enough points: {user.email}, points: {total_points}"
+                "Not enough points: %s, points: %s", user.email, e.balance
             )
             return Response(
                 {"error": "At least 5 points are required for a free coffee."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        BonusTransaction.objects.create(
-            user=user,
-            points=-5,
-            description="Free coffee gift",
-            order=None
-        )
-        bonus_points.points -= 5
-        bonus_points.save()
         logger.info(
-            f"Free coffee gift: customer: {user.email}, points: -5"
+            "Free coffee gift: customer: %s, points: -5", user.email
         )
         return Response(
             {"message": "Free coffee gift successfully redeemed."},
@@ -1,61 +1,73 @@
-from rest_framework.views import APIView
+from django.conf import settings
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import APIException
 
 from project_apps.menu.models import (Category,
                                       MenuItem
                                       )
 from project_apps.menu.serializers import (CategorySerializer,
-                                           MenuItemSerializer
+                                           MenuItemSerializer,
+                                           MenuSearchSerializer
                                            )
+from project_apps.menu.search import search_menu_items
+from project_apps.menu.cache import cached_menu_response
+from project_apps.core.db import replica_reads
+from project_apps.core.pagination import KeysetPaginationMixin
+from project_apps.core.views import AsyncAPIView, is_asgi_request
 from project_apps.core.logging import get_logger
 
 logger = get_logger(__name__)
 
-class CategoryView(APIView):
-    def get(self, request, category_id=None):
+class CategoryView(KeysetPaginationMixin, AsyncAPIView):
+    @replica_reads
+    async def get(self, request, category_id=None):
         """
         Returns the categories and the list.
         Everyone can access, no permission required.
         """
-        logger.debug(f"Category query received: {request.user.email if request.user.is_authenticated else 'Guest'}, ID: {category_id}")
+        logger.debug("Category query received: %s, ID: %s", request.user.email if request.user.is_authenticated else 'Guest', category_id)
         try:
-            if category_id:
-                category = Category.objects.filter(id=category_id, is_deleted=False).first()
-                if not category:
-                    logger.error(f"Category not found: ID {category_id}")
-                    return Response({'error': 'Category not found'}, status=status.HTTP_404_NOT_FOUND)
-                serializer = CategorySerializer(category)
-                logger.info(f"Category details found: ID {category_id}")
-                return Response(serializer.data, status=status.HTTP_200_OK)
-
-            categories = Category.objects.filter(is_deleted=False)
-            serializer = CategorySerializer(categories, many=True)
-            logger.info(f"Category list returned: count: {categories.count()}")
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return await cached_menu_response(request, lambda: self.build_data(category_id))
+        except APIException:
+            raise
         except Exception as e:
-            logger.error(f"Error while retrieving category list: {str(e)}", exc_info=True)
+            logger.error("Error while retrieving category list: %s", e, exc_info=True)
             return Response({'error': 'Error while retrieving category list'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    async def build_data(self, category_id=None):
+        if category_id:
+            category = await Category.alive.filter(id=category_id).afirst()
+            if not category:
+                logger.error("Category not found: ID %s", category_id)
+                return Response({'error': 'Category not found'}, status=status.HTTP_404_NOT_FOUND)
+            logger.sampled().info("Category details found: ID %s", category_id)
+            return CategorySerializer(category).data
+
+        categories = Category.alive.all()
+        response = await self.apaginated_response(categories, CategorySerializer)
+        logger.sampled().info("Category list returned: count: %s", len(response.data['results']))
+        return response.data
+
     def post(self, request):
         """
         Create a new category, only for admins.
         """
-        logger.debug(f"Category creation query received: {request.data}")
+        logger.debug("Category creation query received: %s", request.data)
         if not request.user.is_authenticated or request.user.role != 'admin':
-            logger.error(f"Permission denied for category creation: {request.user.email if request.user.is_authenticated else 'Guest'}")
+            logger.error("Permission denied for category creation: %s", request.user.email if request.user.is_authenticated else 'Guest')
             return Response({'error': 'Permission denied for category creation.'}, status=status.HTTP_403_FORBIDDEN)
 
         serializer = CategorySerializer(data=request.data)
         if serializer.is_valid():
             try:
                 category = serializer.save()
-                logger.info(f"Category created: {category.name}, Admin: {request.user.email}")
+                logger.info("Category created: %s, Admin: %s", category.name, request.user.email)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             except Exception as e:
-                logger.error(f"Error while creating category: {str(e)}", exc_info=True)
+                logger.error("Error while creating category: %s", e, exc_info=True)
                 return Response({'error': 'Error while creating category.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        logger.error(f"Serializer error: {serializer.errors}")
+        logger.error("Serializer error: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def patch(self, request, category_id=None):
@@ -67,25 +79,25 @@ class CategoryView(APIView):
             return Response({'error': 'Category ID is required'}, status=status.HTTP_400_BAD_REQUEST)
 
         if not request.user.is_authenticated or request.user.role != 'admin':
-            logger.error(f"Permission denied for update: {request.user.email if request.user.is_authenticated else 'Guest'}, ID: {category_id}")
+            logger.error("Permission denied for update: %s, ID: %s", request.user.email if request.user.is_authenticated else 'Guest', category_id)
             return Response({'error': 'Permission denied for update.'}, status=status.HTTP_403_FORBIDDEN)
 
-        logger.debug(f"Category update query received: {request.user.email}, ID: {category_id}")
+        logger.debug("Category update query received: %s, ID: %s", request.user.email, category_id)
         try:
-            category = Category.objects.filter(id=category_id, is_deleted=False).first()
+            category = Category.alive.filter(id=category_id).first()
             if not category:
-                logger.error(f"Category not found: ID {category_id}")
+                logger.error("Category not found: ID %s", category_id)
                 return Response({'error': 'Category not found'}, status=status.HTTP_404_NOT_FOUND)
 
             serializer = CategorySerializer(category, data=request.data, partial=True)
             if serializer.is_valid():
                 serializer.save()
-                logger.info(f"Category updated: {category.name}, Admin: {request.user.email}")
+                logger.info("Category updated: %s, Admin: %s", category.name, request.user.email)
                 return Response(serializer.data, status=status.HTTP_200_OK)
-            logger.error(f"Serializer error: {serializer.errors}")
+            logger.error("Serializer error: %s", serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            logger.error(f"Error while updating category: {str(e)}", exc_info=True)
+            logger.error("Error while updating category: %s", e, exc_info=True)
             return Response({'error': 'Error while updating category.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     def delete(self, request, category_id=None):
@@ -97,66 +109,71 @@ class CategoryView(APIView):
             return Response({'error': 'Category ID not provided'}, status=status.HTTP_400_BAD_REQUEST)
 
         if not request.user.is_authenticated or request.user.role != 'admin':
-            logger.error(f"Permission denied for category deletion: {request.user.email if request.user.is_authenticated else 'Guest'}, ID: {category_id}")
+            logger.error("Permission denied for category deletion: %s, ID: %s", request.user.email if request.user.is_authenticated else 'Guest', category_id)
             return Response({'error': 'Permission denied for category deletion: only admins can delete.'}, status=status.HTTP_403_FORBIDDEN)
 
-        logger.debug(f"Category delete query received: {request.user.email}, ID: {category_id}")
+        logger.debug("Category delete query received: %s, ID: %s", request.user.email, category_id)
         try:
-            category = Category.objects.filter(id=category_id, is_deleted=False).first()
+            category = Category.alive.filter(id=category_id).first()
             if not category:
-                logger.error(f"Category not found: ID {category_id}")
+                logger.error("Category not found: ID %s", category_id)
                 return Response({'error': 'Category not found!'}, status=status.HTTP_404_NOT_FOUND)
 
             category.is_deleted = True
             category.save()
-            logger.info(f"Category deleted: {category.name}, Admin: {request.user.email}")
+            logger.info("Category deleted: %s, Admin: %s", category.name, request.user.email)
             return Response({'message': 'Category successfully deleted.'}, status=status.HTTP_200_OK)
         except Exception as e:
-            logger.error(f"Error while deleting category: {str(e)}", exc_info=True)
+            logger.error("Error while deleting category: %s", e, exc_info=True)
             return Response({'error': 'Error while deleting category.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class MenuItemView(APIView):
-    def get(self, request, item_id=None):
+class MenuItemView(KeysetPaginationMixin, AsyncAPIView):
+    @replica_reads
+    async def get(self, request, item_id=None):
         # Menu can be viewed by everyone
         
-        logger.debug(f"Menu item query received: {request.user.email if request.user.is_authenticated else 'Guest'}, ID: {item_id}")
+        logger.debug("Menu item query received: %s, ID: %s", request.user.email if request.user.is_authenticated else 'Guest', item_id)
         try:
-            if item_id:
-                item = MenuItem.objects.filter(id=item_id, is_deleted=False).first()
-                if not item:
-                    logger.error(f"Menu item not found: ID {item_id}")
-                    return Response({'error': 'Menu item not found'}, status=status.HTTP_404_NOT_FOUND)
-                serializer = MenuItemSerializer(item)
-                logger.info(f"Menu item details returned: ID {item_id}")
-                return Response(serializer.data, status=status.HTTP_200_OK)
-
-            items = MenuItem.objects.filter(is_deleted=False)
-            serializer = MenuItemSerializer(items, many=True)
-            logger.info(f"Menu item list returned: count: {items.count()}")
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return await cached_menu_response(request, lambda: self.build_data(item_id))
+        except APIException:
+            raise
         except Exception as e:
-            logger.error(f"Error while retrieving item list: {str(e)}", exc_info=True)
+            logger.error("Error while retrieving item list: %s", e, exc_info=True)
             return Response({'error': 'Error while retrieving item list'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    async def build_data(self, item_id=None):
+        if item_id:
+            item = await MenuItem.alive.with_related().filter(id=item_id).afirst()
+            if not item:
+                logger.error("Menu item not found: ID %s", item_id)
+                return Response({'error': 'Menu item not found'}, status=status.HTTP_404_NOT_FOUND)
+            logger.sampled().info("Menu item details returned: ID %s", item_id)
+            return MenuItemSerializer(item).data
+
+        items = MenuItem.alive.with_related()
+        response = await self.apaginated_response(items, MenuItemSerializer)
+        logger.sampled().info("Menu item list returned: count: %s", len(response.data['results']))
+        return response.data
+
     def post(self, request):
         """
         Create a menu item, only for admins.
         """
-        logger.debug(f"Menu item creation query received: {request.data}")
+        logger.debug("Menu item creation query received: %s", request.data)
         if not request.user.is_authenticated or request.user.role != 'admin':
-            logger.error(f"Menu creation is restricted to admins: {request.user.email if request.user.is_authenticated else 'Guest'}")
+            logger.error("Menu creation is restricted to admins: %s", request.user.email if request.user.is_authenticated else 'Guest')
             return Response({'error': 'Only admins can create menu items'}, status=status.HTTP_403_FORBIDDEN)
 
         serializer = MenuItemSerializer(data=request.data)
         if serializer.is_valid():
             try:
                 item = serializer.save()
-                logger.info(f"Menu item created: {item.name}, Admin: {request.user.email}")
+                logger.info("Menu item created: %s, Admin: %s", item.name, request.user.email)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             except Exception as e:
-                logger.error(f"Error while creating menu item: {str(e)}", exc_info=True)
+                logger.error("Error while creating menu item: %s", e, exc_info=True)
                 return Response({'error': 'Error while creating menu item.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        logger.error(f"Serializer error: {serializer.errors}")
+        logger.error("Serializer error: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def patch(self, request, item_id=None):
@@ -168,25 +185,25 @@ class MenuItemView(APIView):
             return Response({'error': 'Menu item ID not provided'}, status=status.HTTP_400_BAD_REQUEST)
 
         if not request.user.is_authenticated or request.user.role != 'admin':
-            logger.error(f"Unauthorized menu item modification: {request.user.email if request.user.is_authenticated else 'Guest'}, ID: {item_id}")
+            logger.error("Unauthorized menu item modification: %s, ID: %s", request.user.email if request.user.is_authenticated else 'Guest', item_id)
             return Response({'error': 'Unauthorized menu item modification, only admins can modify.'}, status=status.HTTP_403_FORBIDDEN)
 
-        logger.debug(f"Menu item update query received: {request.user.email}, ID: {item_id}")
+        logger.debug("Menu item update query received: %s, ID: %s", request.user.email, item_id)
         try:
-            item = MenuItem.objects.filter(id=item_id, is_deleted=False).first()
+            item = MenuItem.alive.filter(id=item_id).first()
             if not item:
-                logger.error(f"Menu item not found: ID {item_id}")
+                logger.error("Menu item not found: ID %s", item_id)
                 return Response({'error': 'Menu item not found.'}, status=status.HTTP_404_NOT_FOUND)
 
             serializer = MenuItemSerializer(item, data=request.data, partial=True)
             if serializer.is_valid():
                 serializer.save()
-                logger.info(f"Menu item updated: {item.name}, Admin: {request.user.email}")
+                logger.info("Menu item updated: %s, Admin: %s", item.name, request.user.email)
                 return Response(serializer.data, status=status.HTTP_200_OK)
-            logger.error(f"Serializer error: {serializer.errors}")
+            logger.error("Serializer error: %s", serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            logger.error(f"Error while updating menu item: {str(e)}", exc_info=True)
+            logger.error("Error while updating menu item: %s", e, exc_info=True)
             return Response({'error': 'Error while updating menu item.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     def delete(self, request, item_id=None):
@@ -198,20 +215,48 @@ class MenuItemView(APIView):
             return Response({'error': 'Menu item ID not provided'}, status=status.HTTP_400_BAD_REQUEST)
 
         if not request.user.is_authenticated or request.user.role != 'admin':
-            logger.error(f"Unauthorized menu deletion attempt: {request.user.email if request.user.is_authenticated else 'Guest'}, ID: {item_id}")
+            logger.error("Unauthorized menu deletion attempt: %s, ID: %s", request.user.email if request.user.is_authenticated else 'Guest', item_id)
             return Response({'error': 'Only admins can delete menu items'}, status=status.HTTP_403_FORBIDDEN)
 
-        logger.debug(f"Admin delete item query received: {request.user.email}, ID: {item_id}")
+        logger.debug("Admin delete item query received: %s, ID: %s", request.user.email, item_id)
         try:
-            item = MenuItem.objects.filter(id=item_id, is_deleted=False).first()
+            item = MenuItem.alive.filter(id=item_id).first()
             if not item:
-                logger.error(f"Menu item not found: ID {item_id}")
+                logger.error("Menu item not found: ID %s", item_id)
                 return Response({'error': 'Menu item not found'}, status=status.HTTP_404_NOT_FOUND)
 
             item.is_deleted = True
             item.save()
-            logger.info(f"Menu item deleted: {item.name}, Admin: {request.user.email}")
+            logger.info("Menu item deleted: %s, Admin: %s", item.name, request.user.email)
             return Response({'message': 'Menu item successfully deleted.'}, status=status.HTTP_200_OK)
         except Exception as e:
-            logger.error(f"Error while deleting menu item: {str(e)}", exc_info=True)
+            logger.error("Error while deleting menu item: %s", e, exc_info=True)
             return Response({'error': 'Error while deleting menu item.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class MenuSearchView(AsyncAPIView):
+    @replica_reads
+    async def get(self, request):
+        """
+        Searches menu items by text, category, price, availability and discount.
+        Everyone can access, no permission required.
+        """
+        serializer = MenuSearchSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            logger.error("Menu search parameters are invalid: %s", serializer.errors)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        params = serializer.validated_data
+        limit = params.get('page_size') or settings.REST_FRAMEWORK['PAGE_SIZE']
+        try:
+            items, source = await search_menu_items(params, limit, shared_client=is_asgi_request(request))
+        except Exception as e:
+            logger.error("Error while searching menu items: %s", e, exc_info=True)
+            return Response({'error': 'Error while searching menu items'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        logger.sampled().info("Menu search returned: query: %s, count: %s, source: %s", params.get('q', ''), len(items), source)
+        return Response({
+            'source': source,
+            'count': len(items),
+            'results': MenuItemSerializer(items, many=True, context={'request': request}).data,
+        }, status=status.HTTP_200_OK)
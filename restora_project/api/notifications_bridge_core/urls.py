@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import MessageCreateView
+from .views import MessageCreateView, BroadcastView
 
 urlpatterns = [
     path('messages/', MessageCreateView.as_view(), name='message_create'),
     path('messages/<int:message_id>/', MessageCreateView.as_view(), name='message_detail'),
+    path('broadcasts/', BroadcastView.as_view(), name='broadcast_list'),
+    path('broadcasts/<int:broadcast_id>/', BroadcastView.as_view(), name='broadcast_detail'),
 ]
\ No newline at end of file
@@ -1,56 +1,63 @@
+from functools import partial
+
+from django.db import transaction
 from django.db.models import Q 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import APIException
 from rest_framework.permissions import IsAuthenticated
 
-from project_apps.notifications.models import Message
-from project_apps.notifications.serializers import MessageSerializer
+from project_apps.notifications.models import Message, Broadcast
+from project_apps.notifications.serializers import MessageSerializer, BroadcastSerializer
+from project_apps.notifications.tasks import broadcast_recipients, send_broadcast
 
-from project_apps.core.logging import get_logger
+from project_apps.core.pagination import KeysetPaginationMixin
+from project_apps.core.views import AsyncAPIView
+from project_apps.core.logging import get_logger, lazy_attr
 
 logger = get_logger(__name__)
 
 
-class MessageCreateView(APIView):
+class MessageCreateView(KeysetPaginationMixin, AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         """
         Sending message between customer and admin
         """
-        logger.debug(f"Message request received {request.data}")
+        logger.debug("Message request received %s", request.data)
         serializer = MessageSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             try:
                 message = serializer.save()
-                logger.info(f"Message sent {request.user.email} -> {message.recipient.email}")
+                logger.info("Message sent %s -> %s", request.user.email, lazy_attr(message, 'recipient.email'))
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             except Exception as e:
-                logger.error(f"Error sending message: {str(e)}", exc_info=True)
+                logger.error("Error sending message: %s", e, exc_info=True)
                 return Response({'error': 'Error occurred while sending the message.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        logger.error(f"Serializer error {serializer.errors}")
+        logger.error("Serializer error %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    def get(self, request):
+    async def get(self, request):
         # For admin and customer to view their messages
 
-        logger.debug(f"Message query received for listing: {request.user.email}")
+        logger.debug("Message query received for listing: %s", request.user.email)
         try:
             user = request.user
-            if user.role == "customer":
-                # Customer can only see their own messages
-                messages = Message.objects.filter(is_deleted=False).filter(Q(sender=user) | Q(recipient=user))
-            else:
-                if request.query_params.get("all") == "true":
-                    # Admin can see all messages
-                    messages = Message.objects.filter(is_deleted=False).filter(Q(sender=user) | Q(recipient=user))
-
-            serializer = MessageSerializer(messages, many=True)
-            logger.info(f"Message list returned: {user.email}, count: {messages.count()}")
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # Everyone sees their own messages by default
+            messages = Message.alive.filter(Q(sender=user) | Q(recipient=user))
+            if user.role == "admin" and request.query_params.get("all") == "true":
+                # Admin can see all messages
+                messages = Message.alive.all()
+
+            response = await self.apaginated_response(messages, MessageSerializer)
+            logger.sampled().info("Message list returned: %s, count: %s", user.email, len(response.data['results']))
+            return response
+        except APIException:
+            raise
         except Exception as e:
-            logger.error(f"Error occurred while retrieving message list: {str(e)}", exc_info=True)
+            logger.error("Error occurred while retrieving message list: %s", e, exc_info=True)
             return Response({"error": "Error occurred while retrieving message list."}, 
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR
                             )
@@ -61,20 +68,20 @@ class MessageCreateView(APIView):
             Customer can only delete their own messages
             Admin can delete any message
             """
-            logger.debug(f"Delete message request received {request.user.email}, Message ID: {message_id}")
+            logger.debug("Delete message request received %s, Message ID: %s", request.user.email, message_id)
             if not message_id:
                 logger.error("Message ID not provided.")
                 return Response({'error': 'Message ID is required'}, status=status.HTTP_400_BAD_REQUEST)
 
             try:
-                message = Message.objects.filter(id=message_id, is_deleted=False).first()
+                message = Message.alive.filter(id=message_id).first()
                 if not message:
-                    logger.error(f"Message not found ID {message_id}")
+                    logger.error("Message not found ID %s", message_id)
                     return Response({'error': 'Message not found'}, status=status.HTTP_404_NOT_FOUND)
 
                 user = request.user
                 if user.role == 'customer' and message.sender != user:
-                    logger.error(f"Unauthorized attempt to delete message {user.email}, Message ID: {message_id}")
+                    logger.error("Unauthorized attempt to delete message %s, Message ID: %s", user.email, message_id)
                     return Response({'error': 'You can only delete your own messages.'},
                                     status=status.HTTP_403_FORBIDDEN
                                     )
@@ -82,10 +89,54 @@ class MessageCreateView(APIView):
                 # Admin can delete any message
                 message.is_deleted = True
                 message.save()
-                logger.info(f"Message deleted: {user.email}, Message ID: {message_id}")
+                logger.info("Message deleted: %s, Message ID: %s", user.email, message_id)
                 return Response({'message': 'Message deleted successfully.'}, status=status.HTTP_200_OK)
             except Exception as e:
-                logger.error(f"Error occurred while deleting message: {str(e)}", exc_info=True)
+                logger.error("Error occurred while deleting message: %s", e, exc_info=True)
                 return Response({'error': 'Error occurred while deleting the message.'},
                                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
                                 )
+
+
+class BroadcastView(KeysetPaginationMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, broadcast_id=None):
+        """
+        Sending a promotional notification to every customer.
+        Returns at once, the notifications are created by a Celery task
+        """
+        if request.user.role != "admin":
+            logger.error("Permission required to broadcast: %s, role: %s", request.user.email, request.user.role)
+            return Response({'error': 'Only admins can send broadcasts'}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = BroadcastSerializer(data=request.data)
+        if not serializer.is_valid():
+            logger.error("Broadcast serializer error %s", serializer.errors)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            broadcast = serializer.save(created_by=request.user, total_recipients=broadcast_recipients().count())
+            transaction.on_commit(partial(send_broadcast.delay, broadcast.id))
+        logger.info(
+            "Broadcast queued: #%s, admin: %s, recipients: %s",
+            broadcast.id, request.user.email, broadcast.total_recipients,
+        )
+        return Response(BroadcastSerializer(broadcast).data, status=status.HTTP_202_ACCEPTED)
+
+    def get(self, request, broadcast_id=None):
+        """
+        Broadcast list, or the progress of one broadcast
+        """
+        if request.user.role != "admin":
+            logger.error("Permission required to view broadcasts: %s, role: %s", request.user.email, request.user.role)
+            return Response({'error': 'Only admins can view broadcasts'}, status=status.HTTP_403_FORBIDDEN)
+
+        if broadcast_id is None:
+            return self.paginated_response(Broadcast.objects.all(), BroadcastSerializer)
+
+        broadcast = Broadcast.objects.filter(id=broadcast_id).first()
+        if not broadcast:
+            logger.error("Broadcast not found ID %s", broadcast_id)
+            return Response({'error': 'Broadcast not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(BroadcastSerializer(broadcast).data, status=status.HTTP_200_OK)
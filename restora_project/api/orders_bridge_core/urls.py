@@ -1,7 +1,9 @@
 from django.urls import path
 from .views import (OrderView,
                     OrderItemView,
-                    SalesReportView
+                    SalesReportView,
+                    SalesReportExportView,
+                    SalesAnalyticsView
                     )
 
 urlpatterns = [
@@ -10,4 +12,6 @@ urlpatterns = [
     path('order-items/', OrderItemView.as_view(), name='order_item_list'),
     path('order-items/<int:item_id>/', OrderItemView.as_view(), name='order_item_detail'),
     path('report/', SalesReportView.as_view(), name='sales_report'),
+    path('report/export/', SalesReportExportView.as_view(), name='sales_report_export'),
+    path('report/analytics/', SalesAnalyticsView.as_view(), name='sales_analytics'),
 ]
\ No newline at end of file
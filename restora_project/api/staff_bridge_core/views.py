@@ -5,17 +5,18 @@ from rest_framework import status
 
 from project_apps.staff.models import Staff
 from project_apps.staff.serializers import StaffSerializer
-from project_apps.core.logging import get_logger
+from project_apps.core.pagination import KeysetPaginationMixin
+from project_apps.core.logging import get_logger, lazy_attr
 
 logger = get_logger(__name__)
 
 
-class StaffView(APIView):
+class StaffView(KeysetPaginationMixin, APIView):
     
     def get(self, request, staff_id=None):
         """Returns the list of staff or a staff detail."""
         if not request.user.is_authenticated:
-            logger.error(f"Unauthorized view attempt: Guest")
+            logger.error("Unauthorized view attempt: Guest")
             return Response(
                 {"error": "Authentication is required to view staff."},
                 status=status.HTTP_401_UNAUTHORIZED,
@@ -23,48 +24,49 @@ class StaffView(APIView):
 
         user = request.user
         logger.debug(
-            f"Staff request received: {user.email}, ID: {staff_id}"
+            "Staff request received: %s, ID: %s", user.email, staff_id
         )
 
         if staff_id:
-            staff = get_object_or_404(Staff, id=staff_id, is_deleted=False)
+            staff = get_object_or_404(Staff.alive, id=staff_id)
             if user.role == "staff" and staff.user != user:
                 logger.error(
-                    f"Unauthorized staff view: {user.email}, staff ID: {staff_id}"
+                    "Unauthorized staff view: %s, staff ID: %s", user.email, staff_id
                 )
                 return Response(
                     {"error": "You can only view your own information."},
                     status=status.HTTP_403_FORBIDDEN,
                 )
             serializer = StaffSerializer(staff)
-            logger.info(f"Staff detail returned: ID {staff_id}")
+            logger.sampled().info("Staff detail returned: ID %s", staff_id)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         if user.role != "admin":
             if user.role == "staff":
-                staff = get_object_or_404(Staff, user=user, is_deleted=False)
+                staff = get_object_or_404(Staff.alive, user=user)
                 serializer = StaffSerializer(staff)
-                logger.info(f"Own staff information returned: {user.email}")
+                logger.sampled().info("Own staff information returned: %s", user.email)
                 return Response(serializer.data, status=status.HTTP_200_OK)
             logger.error(
-                f"Unauthorized list view: {user.email}, role: {user.role}"
+                "Unauthorized list view: %s, role: %s", user.email, user.role
             )
             return Response(
                 {"error": "Only admins can view the staff list."},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        staff_list = Staff.objects.filter(is_deleted=False)
-        serializer = StaffSerializer(staff_list, many=True)
-        logger.info(f"Staff list returned: count: {staff_list.count()}")
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        staff_list = Staff.alive.select_related("user")
+        response = self.paginated_response(staff_list, StaffSerializer)
+        logger.sampled().info("Staff list returned: count: %s", len(response.data['results']))
+        return response
 
     def post(self, request):
         """Creates a new staff member (only admin)."""
         if not request.user.is_authenticated or request.user.role != "admin":
             logger.error(
-                f"Unauthorized create attempt: {request.user.email if request.user.is_authenticated else 'Guest'}, "
-                f"role: {request.user.role if request.user.is_authenticated else 'None'}"
+                "Unauthorized create attempt: %s, "
+                "role: %s",
+                request.user.email if request.user.is_authenticated else 'Guest', request.user.role if request.user.is_authenticated else 'None',
             )
             return Response(
                 {"error": "Only admins can create staff."},
@@ -75,11 +77,12 @@ class StaffView(APIView):
         if serializer.is_valid():
             staff = serializer.save()
             logger.info(
-                f"Staff created: ID {staff.id}, "
-                f"email: {staff.user.email}, created by: {request.user.email}"
+                "Staff created: ID %s, "
+                "email: %s, created by: %s",
+                staff.id, lazy_attr(staff, 'user.email'), request.user.email,
             )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
-        logger.error(f"Serializer error: {serializer.errors}")
+        logger.error("Serializer error: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def patch(self, request, staff_id=None):
@@ -92,26 +95,28 @@ class StaffView(APIView):
             )
         if not request.user.is_authenticated or request.user.role != "admin":
             logger.error(
-                f"Unauthorized update attempt: {request.user.email if request.user.is_authenticated else 'Guest'}, "
-                f"role: {request.user.role if request.user.is_authenticated else 'None'}"
+                "Unauthorized update attempt: %s, "
+                "role: %s",
+                request.user.email if request.user.is_authenticated else 'Guest', request.user.role if request.user.is_authenticated else 'None',
             )
             return Response(
                 {"error": "Only admins can update staff."},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        staff = get_object_or_404(Staff, id=staff_id, is_deleted=False)
+        staff = get_object_or_404(Staff.alive, id=staff_id)
         serializer = StaffSerializer(
             staff, data=request.data, partial=True, context={"request": request}
         )
         if serializer.is_valid():
             serializer.save()
             logger.info(
-                f"Staff updated: ID {staff.id}, "
-                f"email: {staff.user.email}, updated by: {request.user.email}"
+                "Staff updated: ID %s, "
+                "email: %s, updated by: %s",
+                staff.id, lazy_attr(staff, 'user.email'), request.user.email,
             )
             return Response(serializer.data, status=status.HTTP_200_OK)
-        logger.error(f"Serializer error: {serializer.errors}")
+        logger.error("Serializer error: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, staff_id=None):
@@ -124,19 +129,21 @@ class StaffView(APIView):
             )
         if not request.user.is_authenticated or request.user.role != "admin":
             logger.error(
-                f"Unauthorized delete attempt: {request.user.email if request.user.is_authenticated else 'Guest'}, "
-                f"role: {request.user.role if request.user.is_authenticated else 'None'}"
+                "Unauthorized delete attempt: %s, "
+                "role: %s",
+                request.user.email if request.user.is_authenticated else 'Guest', request.user.role if request.user.is_authenticated else 'None',
             )
             return Response(
                 {"error": "Only admins can delete staff."},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        staff = get_object_or_404(Staff, id=staff_id, is_deleted=False)
+        staff = get_object_or_404(Staff.alive, id=staff_id)
         staff.delete()
         logger.info(
-            f"Staff permanently deleted: ID {staff.id}, "
-            f"email: {staff.user.email}, admin: {request.user.email}"
+            "Staff permanently deleted: ID %s, "
+            "email: %s, admin: %s",
+            staff.id, lazy_attr(staff, 'user.email'), request.user.email,
         )
         return Response(
             {"message": "Staff permanently deleted."},
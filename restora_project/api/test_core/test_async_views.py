@@ -0,0 +1,85 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from project_apps.accounts.models import User
+from project_apps.core.tests.fake_elasticsearch import FakeAsyncElasticsearch
+from project_apps.menu.documents import MenuItemDocument
+from project_apps.menu.models import Category, MenuItem
+from project_apps.notifications.models import Message
+
+
+class AsyncReadViewsTest(TestCase):
+    """
+    The read endpoints served through the ASGI handler, as under uvicorn.
+    """
+
+    def setUp(self):
+        cache.clear()
+        with patch('project_apps.notifications.signals.send_admin_code_email.delay'), \
+                patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            self.admin = User.objects.create_user(
+                username='admin', email='admin@example.com', password='testpass123', role='admin'
+            )
+            self.customer = User.objects.create_user(
+                username='customer', email='customer@example.com', password='testpass123'
+            )
+        self.soups = Category.objects.create(name='Soups')
+        self.lentil = MenuItem.objects.create(category=self.soups, name='Lentil soup', price=Decimal('4.50'))
+        self.client = AsyncClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    def _auth(self, user):
+        return {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    async def test_menu_list_and_conditional_get(self):
+        response = await self.client.get(reverse('menu_item_list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['name'] for item in response.json()['results']], ['Lentil soup'])
+        # Queries of the async ORM are measured too
+        self.assertNotIn('"0 queries', response['Server-Timing'])
+
+        response = await self.client.get(reverse('menu_item_list'), headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_missing_category(self):
+        response = await self.client.get(reverse('category_detail', args=[self.soups.id + 1]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_writes_take_the_sync_path(self):
+        response = await self.client.post(
+            reverse('category_list'), {'name': 'Grill'}, content_type='application/json', headers=self._auth(self.admin)
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(await Category.alive.filter(name='Grill').aexists())
+
+    async def test_message_list_is_authenticated(self):
+        await Message.objects.acreate(sender=self.customer, recipient=self.admin, content='Is the soup vegan?')
+
+        response = await self.client.get(reverse('message_create'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = await self.client.get(reverse('message_create'), headers=self._auth(self.customer))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([message['content'] for message in response.json()['results']], ['Is the soup vegan?'])
+
+    async def test_search_uses_the_async_client(self):
+        fake_client = FakeAsyncElasticsearch()
+        fake_client.documents[(MenuItemDocument._index._name, str(self.lentil.id))] = {}
+
+        with patch('project_apps.menu.search.AsyncElasticsearch', return_value=fake_client) as client_class:
+            response = await self.client.get(reverse('menu_search'), {'q': 'lentil'})
+            await self.client.get(reverse('menu_search'), {'q': 'soup'})
+
+        self.assertEqual(response.json()['source'], 'elasticsearch')
+        self.assertEqual([item['name'] for item in response.json()['results']], ['Lentil soup'])
+        # The worker's event loop keeps one open client for all requests
+        self.assertEqual(client_class.call_count, 1)
+        self.assertFalse(fake_client.closed)
@@ -0,0 +1,112 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from elasticsearch_dsl.connections import connections
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from project_apps.accounts.models import User
+from project_apps.core.tests.eager_celery import eager_celery
+from project_apps.core.tests.fake_elasticsearch import FakeElasticsearch
+from project_apps.notifications.models import Broadcast, EmailOutbox, Notification
+from project_apps.notifications.tasks import send_broadcast
+
+
+@patch('project_apps.notifications.outbox.schedule_drain')
+class BroadcastTest(TestCase):
+    def setUp(self):
+        eager_celery(self)
+        cache.clear()
+        with patch('project_apps.notifications.signals.send_admin_code_email.delay'):
+            self.admin = User.objects.create_user(
+                username='admin', email='admin@example.com', password='testpass123', role='admin'
+            )
+        # Bulk inserted, so no welcome discount codes
+        self.customers = User.objects.bulk_create([
+            User(username=f'customer{i}', email=f'customer{i}@example.com', role='customer') for i in range(5)
+        ])
+        User.objects.bulk_create([
+            User(username='gone', email='gone@example.com', role='customer', is_deleted=True),
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('broadcast_list')
+
+    def _broadcast(self, **extra):
+        return Broadcast.objects.create(
+            title='Holiday menu', message='Try our new plov', total_recipients=5, created_by=self.admin, **extra
+        )
+
+    def test_broadcast_reaches_every_active_customer(self, schedule_drain):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url, {'title': 'Holiday menu', 'message': 'Try our new plov'}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.data)
+        self.assertEqual(response.data['total_recipients'], 5)
+
+        broadcast = Broadcast.objects.get(pk=response.data['id'])
+        self.assertEqual((broadcast.status, broadcast.notifications_created, broadcast.emails_queued),
+                         ('completed', 5, 5))
+        self.assertEqual(Notification.objects.filter(title='Holiday menu').count(), 5)
+        self.assertEqual(
+            sorted(EmailOutbox.objects.values_list('recipients', flat=True)),
+            [[f'customer{i}@example.com'] for i in range(5)],
+        )
+
+        progress = self.client.get(reverse('broadcast_detail', args=[broadcast.id]))
+        self.assertEqual(progress.data['progress'], 100)
+
+    def test_chunks_have_a_fixed_query_count(self, schedule_drain):
+        broadcast = self._broadcast()
+        with patch('project_apps.notifications.tasks.BROADCAST_CHUNK_SIZE', 2):
+            # Per chunk: savepoint, select customers, insert notifications, insert emails,
+            # update progress, release; once: load, mark running, final empty chunk, mark completed
+            with self.assertNumQueries(3 * 6 + 6):
+                send_broadcast(broadcast.id)
+        self.assertEqual(Notification.objects.count(), 5)
+
+    def test_restarted_broadcast_continues_after_last_chunk(self, schedule_drain):
+        broadcast = self._broadcast(status='running', notifications_created=2, last_user_id=self.customers[1].pk)
+
+        send_broadcast(broadcast.id)
+        send_broadcast(broadcast.id)
+
+        broadcast.refresh_from_db()
+        self.assertEqual((broadcast.status, broadcast.notifications_created), ('completed', 5))
+        self.assertEqual(
+            set(Notification.objects.values_list('user_id', flat=True)), {user.pk for user in self.customers[2:]}
+        )
+
+    def test_emails_are_optional(self, schedule_drain):
+        broadcast = self._broadcast(send_email=False)
+        send_broadcast(broadcast.id)
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    @override_settings(ELASTICSEARCH_DSL_AUTOSYNC=True)
+    def test_notifications_are_indexed_in_bulk(self, schedule_drain):
+        previous_client = connections.get_connection()
+        client = FakeElasticsearch()
+        connections.add_connection('default', client)
+        self.addCleanup(connections.add_connection, 'default', previous_client)
+
+        broadcast = self._broadcast()
+        with self.captureOnCommitCallbacks(execute=True):
+            send_broadcast(broadcast.id)
+
+        self.assertEqual(len(client.bulk_requests), 1)
+        self.assertEqual(sum(index == 'notifications' for index, _ in client.documents), 5)
+
+    def test_only_admins_can_broadcast(self, schedule_drain):
+        with patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            customer = User.objects.create_user(
+                username='customer', email='customer@example.com', password='testpass123'
+            )
+        self.client.force_authenticate(user=customer)
+
+        response = self.client.post(self.url, {'title': 'Free food', 'message': 'For everyone'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Broadcast.objects.exists())
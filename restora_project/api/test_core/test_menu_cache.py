@@ -0,0 +1,80 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from project_apps.menu.cache import MENU_VERSION_KEY
+from project_apps.menu.models import Category, MenuItem
+
+
+class MenuCacheTest(TestCase):
+    """
+    Public menu responses are cached per menu version and revalidated with ETags.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name='Main', description='Main dishes')
+        self.item = MenuItem.objects.create(category=self.category, name='Kebab', price=Decimal('12.00'))
+        self.url = reverse('menu_item_list')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_repeated_requests_do_not_hit_the_database(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_menu_change_bumps_the_version(self):
+        first = self.client.get(self.url)
+        version = cache.get(MENU_VERSION_KEY)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.price = Decimal('15.00')
+            self.item.save()
+
+        self.assertGreater(cache.get(MENU_VERSION_KEY), version)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['price'], '15.00')
+
+    def test_soft_deleted_category_invalidates_category_list(self):
+        url = reverse('category_list')
+        self.assertEqual(len(self.client.get(url).data['results']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.delete()
+
+        self.assertEqual(self.client.get(url).data['results'], [])
+
+    def test_pages_are_cached_separately(self):
+        MenuItem.objects.create(category=self.category, name='Dolma', price=Decimal('8.00'))
+
+        first_page = self.client.get(self.url, {'page_size': 1})
+        second_page = self.client.get(first_page.data['next'])
+
+        self.assertNotEqual(first_page['ETag'], second_page['ETag'])
+        self.assertNotEqual(first_page.data['results'], second_page.data['results'])
+
+    def test_missing_item_is_not_cached(self):
+        url = reverse('menu_item_detail', args=[self.item.id + 100])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,95 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from elasticsearch import ConnectionError
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from project_apps.core.tests.fake_elasticsearch import FakeAsyncElasticsearch
+from project_apps.menu.models import Category, MenuItem
+
+
+class MenuSearchTest(TestCase):
+    """
+    Menu search is answered by Elasticsearch and by the database while it is down.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('menu_search')
+        soups = Category.objects.create(name='Soups')
+        grill = Category.objects.create(name='Grill')
+        self.lentil = MenuItem.objects.create(
+            category=soups, name='Lentil soup', description='Red lentils', price=Decimal('4.00')
+        )
+        self.kebab = MenuItem.objects.create(
+            category=grill, name='Lamb kebab', description='Charcoal grilled', price=Decimal('14.00'),
+            discount_percentage=20,
+        )
+        self.wings = MenuItem.objects.create(
+            category=grill, name='Chicken wings', price=Decimal('9.00'), is_available=False
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def _names(self, response):
+        return [item['name'] for item in response.data['results']]
+
+    @patch('project_apps.menu.search._search_index')
+    def test_results_follow_elasticsearch_order(self, mock_search):
+        mock_search.return_value = [self.wings.id, self.lentil.id]
+
+        response = self.client.get(self.url, {'q': 'soup'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['source'], 'elasticsearch')
+        self.assertEqual(self._names(response), ['Chicken wings', 'Lentil soup'])
+
+    def test_filters_are_sent_to_elasticsearch(self):
+        fake_client = FakeAsyncElasticsearch()
+
+        with patch('project_apps.menu.search.AsyncElasticsearch', return_value=fake_client):
+            self.client.get(self.url, {
+                'q': 'kebab', 'category': self.kebab.category_id, 'min_price': '5', 'max_price': '20',
+                'is_available': 'true', 'min_discount': 10,
+            })
+        # The event loop ends with a WSGI request, the client must not outlive it
+        self.assertTrue(fake_client.closed)
+
+        body = fake_client.search_requests[0]
+        filters = body['query']['bool']['filter']
+        self.assertIn({'term': {'category_id': self.kebab.category_id}}, filters)
+        self.assertIn({'term': {'is_available': True}}, filters)
+        self.assertIn({'range': {'price': {'gte': 5.0, 'lte': 20.0}}}, filters)
+        self.assertIn({'range': {'discount_percentage': {'gte': 10}}}, filters)
+        self.assertEqual(body['query']['bool']['must'][0]['multi_match']['query'], 'kebab')
+
+    @patch('project_apps.menu.search._search_index', side_effect=ConnectionError('down'))
+    def test_database_fallback_when_elasticsearch_is_down(self, mock_search):
+        response = self.client.get(self.url, {'q': 'LENTIL'})
+
+        self.assertEqual(response.data['source'], 'database')
+        self.assertEqual(self._names(response), ['Lentil soup'])
+
+        # Elasticsearch is not retried until the fallback window passes
+        response = self.client.get(self.url, {'q': 'grill'})
+        self.assertEqual(mock_search.call_count, 1)
+        self.assertEqual(self._names(response), ['Chicken wings', 'Lamb kebab'])
+
+    @patch('project_apps.menu.search._search_index', side_effect=ConnectionError('down'))
+    def test_database_fallback_filters(self, mock_search):
+        response = self.client.get(self.url, {'is_available': 'true', 'min_price': '5'})
+        self.assertEqual(self._names(response), ['Lamb kebab'])
+
+        cache.clear()
+        response = self.client.get(self.url, {'min_discount': 10})
+        self.assertEqual(self._names(response), ['Lamb kebab'])
+
+    def test_invalid_price_range(self):
+        response = self.client.get(self.url, {'min_price': '10', 'max_price': '5'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,120 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from project_apps.accounts.models import User
+from project_apps.core.tests.eager_celery import eager_celery
+from project_apps.customers.models import BonusTransaction
+from project_apps.menu.models import Category, MenuItem
+from project_apps.notifications.models import DiscountCode, Notification
+from project_apps.orders.models import Order, OrderItem
+
+
+@patch('project_apps.orders.serializers.queue_email')
+class OrderCreationTest(TestCase):
+    """
+    Orders are created in one transaction with a fixed number of queries,
+    and rewards are granted only after the commit.
+    """
+
+    def setUp(self):
+        eager_celery(self)
+        with patch('project_apps.notifications.signals.send_admin_code_email.delay'):
+            self.admin = User.objects.create_user(
+                username='admin', email='admin@example.com', password='testpass123', role='admin'
+            )
+        with patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            self.customer = User.objects.create_user(
+                username='customer', email='customer@example.com', password='testpass123'
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+        category = Category.objects.create(name='Banquet', description='Banquet dishes')
+        self.items = [
+            MenuItem.objects.create(category=category, name=f'Dish {i}', price=Decimal('2.00'))
+            for i in range(30)
+        ]
+        self.url = reverse('order_list')
+
+    def _payload(self, items, **extra):
+        return {
+            'user_id': self.customer.id,
+            'payment_type': 'card',
+            'total_amount': '0.00',
+            'order_items': [
+                {'menu_item_id': item.id, 'quantity': 1, 'price': str(item.price)} for item in items
+            ],
+            **extra,
+        }
+
+    def _post(self, payload):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return response, len(queries)
+
+    def test_query_count_does_not_grow_with_line_items(self, mock_email):
+        # The first order also creates the customer's points and rollup rows,
+        # every order here is worth bonus points so each one writes a ledger entry
+        self._post(self._payload(self.items[:5]))
+        _, small = self._post(self._payload(self.items[:5]))
+        response, large = self._post(self._payload(self.items))
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data['order_items']), 30)
+        self.assertEqual(OrderItem.objects.filter(order_id=response.data['id']).count(), 30)
+
+    def test_rewards_run_on_commit(self, mock_email):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self._post(self._payload(self.items))[0]
+
+        order = Order.objects.get(pk=response.data['id'])
+        self.assertEqual(order.total_amount, Decimal('60.00'))
+        self.assertFalse(
+            BonusTransaction.objects.filter(order=order, description="Bonus earned from 50 AZN order").exists()
+        )
+        mock_email.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+
+        self.assertTrue(BonusTransaction.objects.filter(order=order, points=5).exists())
+        self.assertTrue(
+            DiscountCode.objects.filter(user=self.customer, notification__title='50 AZN Order Discount').exists()
+        )
+        mock_email.assert_called_once()
+
+    def test_failed_rewards_do_not_fail_the_order(self, mock_email):
+        with patch('project_apps.orders.serializers.grant_order_rewards', side_effect=RuntimeError('down')), \
+                self.assertLogs('django', 'ERROR'), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self._post(self._payload(self.items))[0]
+
+        self.assertTrue(Order.objects.filter(pk=response.data['id']).exists())
+
+    def test_discount_code_is_applied_and_used(self, mock_email):
+        notification = Notification.objects.create(
+            user=self.customer, title='50 AZN Order Discount', message='Discount'
+        )
+        DiscountCode.objects.create(user=self.customer, code='SAVE20', notification=notification)
+
+        response = self._post(self._payload(self.items[:10], discount_code='SAVE20'))[0]
+
+        self.assertEqual(Decimal(response.data['total_amount']), Decimal('16.00'))
+        self.assertTrue(DiscountCode.objects.get(code='SAVE20').is_used)
+
+    def test_invalid_discount_code_creates_nothing(self, mock_email):
+        response = self.client.post(
+            self.url, self._payload(self.items[:3], discount_code='MISSING'), format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
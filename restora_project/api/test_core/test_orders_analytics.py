@@ -0,0 +1,126 @@
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from project_apps.accounts.models import User
+from project_apps.menu.models import Category, MenuItem
+from project_apps.orders.analytics import sales_analytics
+from project_apps.orders.models import Order, OrderItem
+
+MONDAY = datetime(2026, 3, 2)
+TUESDAY = datetime(2026, 3, 3)
+
+
+@patch('project_apps.customers.loyalty.send_coffee_bonus_email.delay')
+class SalesAnalyticsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        with patch('project_apps.notifications.signals.send_admin_code_email.delay'), \
+                patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            self.admin = User.objects.create_user(
+                username='admin', email='admin@example.com', password='testpass123', role='admin'
+            )
+            self.customer = User.objects.create_user(
+                username='customer', email='customer@example.com', password='testpass123'
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+        soups, kebabs, drinks = (Category.objects.create(name=name) for name in ('Soups', 'Kebabs', 'Drinks'))
+        self.soup = MenuItem.objects.create(category=soups, name='Lentil soup', price=Decimal('4.50'))
+        self.kebab = MenuItem.objects.create(category=kebabs, name='Lula kebab', price=Decimal('12.00'))
+        self.tea = MenuItem.objects.create(category=drinks, name='Black tea', price=Decimal('1.20'))
+
+        self._order(MONDAY.replace(hour=9, minute=15), 'cash', (self.soup, 2), (self.tea, 1))
+        self._order(MONDAY.replace(hour=9, minute=40), 'card', (self.soup, 1), (self.kebab, 1))
+        self._order(TUESDAY.replace(hour=12), 'cash', (self.soup, 1), (self.tea, 1))
+        self.last = self._order(TUESDAY.replace(hour=19, minute=5), 'cash', (self.kebab, 2), (self.tea, 1))
+        self._order(TUESDAY.replace(hour=20), 'cash', (self.kebab, 5)).delete()
+
+    def _order(self, created_at, payment_type, *lines):
+        order = Order.objects.create(
+            user=self.customer,
+            payment_type=payment_type,
+            total_amount=sum(item.price * quantity for item, quantity in lines),
+        )
+        for item, quantity in lines:
+            OrderItem.objects.create(order=order, menu_item=item, quantity=quantity, price=item.price)
+        Order.objects.filter(pk=order.pk).update(created_at=timezone.make_aware(created_at))
+        return order
+
+    def _analytics(self, **params):
+        params = {'start_date': '2026-03-01', 'end_date': '2026-03-31', **params}
+        return self.client.get(reverse('sales_analytics'), params)
+
+    def test_revenue_by_dimension(self, coffee_delay):
+        response = self._analytics()
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        report = response.data
+
+        self.assertEqual(report['totals'], {
+            'revenue': Decimal('57.60'),
+            'order_count': 4,
+            'item_count': 10,
+            'average_order_value': Decimal('14.40'),
+            'average_items_per_order': 2.5,
+        })
+        hours = {row['hour']: (row['revenue'], row['order_count']) for row in report['by_hour'] if row['order_count']}
+        self.assertEqual(hours, {
+            9: (Decimal('26.70'), 2), 12: (Decimal('5.70'), 1), 19: (Decimal('25.20'), 1),
+        })
+        self.assertEqual(
+            [(row['weekday'], row['revenue'], row['order_count']) for row in report['by_weekday'][:3]],
+            [(1, Decimal('26.70'), 2), (2, Decimal('30.90'), 2), (3, Decimal('0.00'), 0)],
+        )
+        self.assertEqual(
+            [(row['name'], row['revenue'], row['quantity']) for row in report['by_category']],
+            [('Kebabs', Decimal('36.00'), 3), ('Soups', Decimal('18.00'), 4), ('Drinks', Decimal('3.60'), 3)],
+        )
+        self.assertEqual(
+            [(row['name'], row['revenue'], row['quantity'], row['order_count']) for row in report['top_items']],
+            [('Lula kebab', Decimal('36.00'), 3, 2), ('Lentil soup', Decimal('18.00'), 4, 3),
+             ('Black tea', Decimal('3.60'), 3, 3)],
+        )
+        self.assertEqual(report['top_pairs'][0]['names'], ['Lentil soup', 'Black tea'])
+        self.assertEqual(report['top_pairs'][0]['order_count'], 2)
+        self.assertEqual(report['basket_sizes'], [{'items': 2, 'order_count': 2}, {'items': 3, 'order_count': 2}])
+
+    def test_filters_and_top(self, coffee_delay):
+        report = self._analytics(payment_type='card', top=1).data
+        self.assertEqual(report['totals']['revenue'], Decimal('16.50'))
+        self.assertEqual([row['name'] for row in report['top_items']], ['Lula kebab'])
+
+        self.assertEqual(self._analytics(status='completed').data['totals']['order_count'], 0)
+        # A cached day is read again when only its order changed
+        self.last.refresh_from_db()
+        self.last.status = 'completed'
+        self.last.save()
+        self.assertEqual(self._analytics(status='completed').data['totals']['revenue'], Decimal('25.20'))
+
+    def test_day_partitions_are_cached_until_the_day_changes(self, coffee_delay):
+        sales_analytics(MONDAY.date(), TUESDAY.date())
+        # Day versions, then the menu item names
+        with self.assertNumQueries(2):
+            sales_analytics(MONDAY.date(), TUESDAY.date())
+
+        item = self.last.order_items.get(menu_item=self.tea)
+        item.quantity = 3
+        item.save()
+        with self.assertNumQueries(3):
+            report = sales_analytics(MONDAY.date(), TUESDAY.date())
+        self.assertEqual(report['totals']['revenue'], Decimal('60.00'))
+
+    def test_permissions_and_validation(self, coffee_delay):
+        self.assertEqual(
+            self._analytics(start_date='2025-01-01', end_date='2026-03-31').status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.client.force_authenticate(user=self.customer)
+        self.assertEqual(self._analytics().status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from project_apps.accounts.models import User
+from project_apps.orders.models import Order
+
+
+class SalesReportExportTest(TestCase):
+    def setUp(self):
+        with patch('project_apps.notifications.signals.send_admin_code_email.delay'), \
+                patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            self.admin = User.objects.create_user(
+                username='admin', email='admin@example.com', password='testpass123', role='admin'
+            )
+            self.customer = User.objects.create_user(
+                username='customer', email='customer@example.com', password='testpass123'
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        self.today = timezone.localdate().isoformat()
+
+        Order.objects.create(user=self.customer, total_amount=Decimal('15.00'), payment_type='cash')
+        Order.objects.create(user=self.customer, total_amount=Decimal('40.00'), payment_type='card')
+
+    def _export(self, **params):
+        params = {'start_date': self.today, 'end_date': self.today, **params}
+        return self.client.get(reverse('sales_report_export'), params)
+
+    def test_csv_export_streams_rows(self):
+        response = self._export()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn(f'sales_report_{self.today}_to_{self.today}.csv', response['Content-Disposition'])
+
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ['ID', 'User', 'Total Amount', 'Payment Type', 'Status', 'Created At'])
+        self.assertEqual([row[1:4] for row in rows[1:]], [
+            ['customer@example.com', '15.00', 'cash'],
+            ['customer@example.com', '40.00', 'card'],
+        ])
+
+    @patch('project_apps.orders.exports.EXPORT_CHUNK_SIZE', 2)
+    def test_rows_are_read_in_keyset_batches(self):
+        Order.objects.create(user=self.customer, total_amount=Decimal('25.00'), payment_type='cash')
+        # Equal timestamps are ordered by id across batch boundaries
+        Order.objects.update(created_at=timezone.now())
+
+        response = self._export()
+        with self.assertNumQueries(2):
+            rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row[2] for row in rows[1:]], ['15.00', '40.00', '25.00'])
+
+    def test_ndjson_export_with_payment_filter(self):
+        response = self._export(export_format='ndjson', payment_type='card')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['user'], 'customer@example.com')
+        self.assertEqual(records[0]['total_amount'], '40.00')
+
+    def test_invalid_format_and_permissions(self):
+        self.assertEqual(self._export(export_format='xml').status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.customer)
+        self.assertEqual(self._export().status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_asgi_export_is_streamed_asynchronously(self):
+        response = await AsyncClient().get(
+            reverse('sales_report_export'), {'start_date': self.today, 'end_date': self.today},
+            headers={'Authorization': f'Bearer {AccessToken.for_user(self.admin)}'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # A sync iterator would be read to the end in memory before the first byte is sent
+        self.assertTrue(response.is_async)
+
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(len(rows), 3)
+
+    def test_wsgi_export_is_streamed_synchronously(self):
+        self.assertFalse(self._export().is_async)
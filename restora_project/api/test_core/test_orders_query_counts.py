@@ -0,0 +1,121 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from project_apps.accounts.models import User
+from project_apps.menu.models import Category, MenuItem
+from project_apps.orders.models import Order, OrderItem
+
+
+@patch('project_apps.notifications.signals.send_discount_code_email.delay')
+@patch('project_apps.notifications.signals.send_admin_code_email.delay')
+class OrderQueryCountTest(TestCase):
+    """
+    List endpoints must run a fixed number of queries no matter how many
+    orders they return.
+    """
+
+    def setUp(self):
+        with patch('project_apps.notifications.signals.send_admin_code_email.delay'):
+            self.admin = User.objects.create_user(
+                username='admin', email='admin@example.com', password='testpass123', role='admin'
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+        self.category = Category.objects.create(name='Main', description='Main dishes')
+        self.items = [
+            MenuItem.objects.create(category=self.category, name=f'Dish {i}', price=Decimal('12.00'))
+            for i in range(3)
+        ]
+        self.counter = 0
+
+    def _create_orders(self, count):
+        for _ in range(count):
+            self.counter += 1
+            with patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+                customer = User.objects.create_user(
+                    username=f'customer{self.counter}',
+                    email=f'customer{self.counter}@example.com',
+                    password='testpass123',
+                )
+            order = Order.objects.create(
+                user=customer, created_by=self.admin, total_amount=Decimal('36.00'), payment_type='card'
+            )
+            for item in self.items:
+                OrderItem.objects.create(order=order, menu_item=item, quantity=1, price=item.price)
+            deleted = OrderItem.objects.create(order=order, menu_item=self.items[0], quantity=1, price=1)
+            deleted.delete()
+
+    def _count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response
+
+    def test_order_list_query_count_is_constant(self, admin_delay, discount_delay):
+        self._create_orders(2)
+        small, _ = self._count_queries(reverse('order_list'))
+        self._create_orders(6)
+        large, response = self._count_queries(reverse('order_list'))
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data['results']), 8)
+        # Soft-deleted items are filtered by the prefetch
+        self.assertEqual(len(response.data['results'][0]['order_items']), 3)
+
+    def test_sales_report_query_count_is_constant(self, admin_delay, discount_delay):
+        today = timezone.localdate().isoformat()
+        params = {'start_date': today, 'end_date': today, 'include_orders': 'true'}
+
+        self._create_orders(2)
+        small, _ = self._count_queries(reverse('sales_report'), params)
+        self._create_orders(6)
+        large, response = self._count_queries(reverse('sales_report'), params)
+
+        self.assertEqual(small, large)
+        self.assertEqual(response.data['order_count'], 8)
+        self.assertEqual(len(response.data['orders']), 8)
+
+    def test_default_sales_report_does_not_load_orders(self, admin_delay, discount_delay):
+        today = timezone.localdate().isoformat()
+        params = {'start_date': today, 'end_date': today}
+
+        self._create_orders(2)
+        small, _ = self._count_queries(reverse('sales_report'), params)
+        self._create_orders(6)
+        large, response = self._count_queries(reverse('sales_report'), params)
+
+        # One rollup query, however many orders the range holds
+        self.assertEqual(small, 1)
+        self.assertEqual(large, 1)
+        self.assertNotIn('orders', response.data)
+        self.assertEqual(response.data['order_count'], 8)
+
+    def test_order_item_list_query_count_is_constant(self, admin_delay, discount_delay):
+        self._create_orders(1)
+        small, _ = self._count_queries(reverse('order_item_list'))
+        self._create_orders(4)
+        large, _ = self._count_queries(reverse('order_item_list'))
+
+        self.assertEqual(small, large)
+
+    def test_sales_report_totals_without_orders(self, admin_delay, discount_delay):
+        today = timezone.localdate().isoformat()
+        self._create_orders(3)
+        count, response = self._count_queries(
+            reverse('sales_report'), {'start_date': today, 'end_date': today, 'include_orders': 'false'}
+        )
+
+        self.assertEqual(count, 1)
+        self.assertNotIn('orders', response.data)
+        self.assertEqual(response.data['order_count'], 3)
+        self.assertEqual(response.data['total_amount'], Decimal('108.00'))
+        self.assertEqual(response.data['total_bonus_points'], 9)
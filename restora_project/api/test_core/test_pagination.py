@@ -0,0 +1,66 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from project_apps.accounts.models import User
+from project_apps.menu.models import Category, MenuItem
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        # Menu responses are cached and the rows below are written without signals
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name='Drinks')
+        # Identical created_at values make the id tie-breaker matter
+        created_at = timezone.now()
+        MenuItem.objects.bulk_create([
+            MenuItem(category=self.category, name=f'Drink {i}', price=Decimal('3.00'))
+            for i in range(7)
+        ])
+        MenuItem.objects.filter(name__in=['Drink 2', 'Drink 3', 'Drink 4']).update(created_at=created_at)
+
+    def _collect(self, url):
+        names = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            names.extend(item['name'] for item in response.data['results'])
+            url = response.data['next']
+            pages += 1
+        return names, pages
+
+    def test_pages_cover_every_row_once(self):
+        names, pages = self._collect(reverse('menu_item_list') + '?page_size=3')
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(names), 7)
+        self.assertEqual(len(set(names)), 7)
+
+    @override_settings(REST_FRAMEWORK={'PAGE_SIZE': 4}, API_MAX_PAGE_SIZE=5)
+    def test_page_size_default_and_cutoff(self):
+        response = self.client.get(reverse('menu_item_list'))
+        self.assertEqual(len(response.data['results']), 4)
+
+        response = self.client.get(reverse('menu_item_list'), {'page_size': 100})
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('menu_item_list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_new_rows_do_not_shift_next_page(self):
+        response = self.client.get(reverse('menu_item_list'), {'page_size': 3})
+        first_page = [item['name'] for item in response.data['results']]
+        MenuItem.objects.create(category=self.category, name='Fresh', price=Decimal('3.00'))
+
+        response = self.client.get(response.data['next'])
+        second_page = [item['name'] for item in response.data['results']]
+        self.assertFalse(set(first_page) & set(second_page))
+        self.assertNotIn('Fresh', second_page)
@@ -1,14 +1,28 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 
 from project_apps.core.constants import ROLE_CHOICES  # Choices for roles
-from project_apps.core.mixins import TimestampMixin, SoftDeleteMixin   
+from project_apps.core.mixins import TimestampMixin, SoftDeleteMixin, SoftDeleteQuerySet, alive_index
+
+
+# create_user/create_superuser plus the soft delete queryset methods
+class SoftDeleteUserManager(UserManager.from_queryset(SoftDeleteQuerySet)):
+    pass
+
 
 class User(TimestampMixin, SoftDeleteMixin, AbstractUser):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='customer')  # User role (customer, staff, admin)
     email = models.EmailField(unique=True)  # Unique email field
     phone_number = models.CharField(max_length=20, blank=True, null=True)  # Optional phone number
 
+    # SoftDeleteMixin comes first in the bases, so its manager would hide UserManager
+    objects = SoftDeleteUserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            alive_index('role', name='user_role_alive_idx'),
+        ]
+
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"  # String representation of the user with role display
     
@@ -44,7 +44,7 @@ class UserSerializer(serializers.ModelSerializer):
 class ProfileSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.filter(is_deleted=False),  # Only active users are included
+        queryset=User.alive.all(),  # Only active users are included
         source="user",
         write_only=True
     )
@@ -115,7 +115,7 @@ class LoginSerializer(serializers.Serializer):
             logger.error("Email or password not provided")
             raise serializers.ValidationError('Email and password are required')
 
-        user = User.objects.filter(email=email, is_deleted=False, is_active=True).first()
+        user = User.alive.filter(email=email, is_active=True).first()
         if not user:
             logger.error(f"User not found: email={email}, is_deleted=False, is_active=True")
             raise serializers.ValidationError('Account not found or is inactive')
@@ -160,7 +160,7 @@ class AdminUserCreateSerializer(serializers.ModelSerializer):
     def validate_email(self, value):
         if not value.strip():
             raise serializers.ValidationError('Invalid email')
-        if User.objects.filter(email=value, is_deleted=False).exists():
+        if User.alive.filter(email=value).exists():
             raise serializers.ValidationError('This email is already taken')
         return value
 
@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from project_apps.core.models import TaskCheckpoint
+
+
+@admin.register(TaskCheckpoint)
+class TaskCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('name', 'high_water_mark', 'updated_at')
+    search_fields = ('name',)
+    ordering = ('name',)
+    readonly_fields = ('created_at', 'updated_at')
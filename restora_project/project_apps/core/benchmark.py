@@ -0,0 +1,257 @@
+import math
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from project_apps.accounts.models import User
+from project_apps.core.constants import BONUS_POINTS_PER_AZN
+from project_apps.customers.models import BonusTransaction
+from project_apps.customers.stats import rebuild_customer_stats
+from project_apps.menu.models import Category, MenuItem
+from project_apps.notifications.models import BonusPoints
+from project_apps.notifications.tasks import check_customer_points
+from project_apps.orders.models import Order, OrderItem
+from project_apps.orders.rollups import rebuild_rollups
+from project_apps.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+SEED_BATCH_SIZE = 1000
+NOISE_FLOOR_MS = 1  # Smaller p50 differences are not reported
+MIN_LATENCY_ITERATIONS = 20  # The median of fewer runs is too noisy to compare
+REPORT_DAYS = 30
+CATEGORY_NAMES = ('Soups', 'Salads', 'Kebabs', 'Pilaf', 'Desserts', 'Breakfast', 'Drinks', 'Coffee')
+
+
+def seed(customers, menu_items, orders, seed=0):
+    """
+    Fills an empty database with a deterministic data set: the same arguments
+    always produce the same rows (timestamps are relative to now).
+    Rows are bulk inserted, so no model signals or Celery tasks run.
+    """
+    rng = random.Random(seed)
+    password = make_password('benchmark')
+
+    admin = User.objects.create(
+        username='bench_admin', email='bench_admin@example.com', role='admin', password=password
+    )
+    users = User.objects.bulk_create(
+        [
+            User(username=f'customer{i}', email=f'customer{i}@example.com', role='customer', password=password)
+            for i in range(customers)
+        ],
+        batch_size=SEED_BATCH_SIZE,
+    )
+
+    categories = Category.objects.bulk_create(
+        [Category(name=name, description=f'{name} of the day') for name in CATEGORY_NAMES]
+    )
+    items = MenuItem.objects.bulk_create(
+        [
+            MenuItem(
+                category=categories[i % len(categories)],
+                name=f'{categories[i % len(categories)].name} #{i}',
+                description='Benchmark dish',
+                price=Decimal(rng.randint(200, 3000)) / 100,
+                discount_percentage=rng.choice((0, 0, 0, 10, 20)),
+            )
+            for i in range(menu_items)
+        ],
+        batch_size=SEED_BATCH_SIZE,
+    )
+
+    now = timezone.now()
+    order_rows = []
+    created_at = []
+    line_items = []
+    for _ in range(orders):
+        lines = [(rng.choice(items), rng.randint(1, 3)) for _ in range(rng.randint(1, 5))]
+        order_rows.append(Order(
+            user=rng.choice(users),
+            created_by=admin,
+            total_amount=sum(item.price * quantity for item, quantity in lines),
+            status=rng.choice(('completed', 'completed', 'completed', 'pending', 'cancelled')),
+            payment_type=rng.choice(('cash', 'card')),
+        ))
+        created_at.append(now - timedelta(minutes=rng.randint(0, REPORT_DAYS * 24 * 60)))
+        line_items.append(lines)
+
+    Order.objects.bulk_create(order_rows, batch_size=SEED_BATCH_SIZE)
+    # created_at is auto_now_add, so the spread-out timestamps are written afterwards
+    for order, timestamp in zip(order_rows, created_at):
+        order.created_at = timestamp
+    Order.objects.bulk_update(order_rows, ['created_at'], batch_size=SEED_BATCH_SIZE)
+    OrderItem.objects.bulk_create(
+        [
+            OrderItem(order=order, menu_item=item, quantity=quantity, price=item.price)
+            for order, lines in zip(order_rows, line_items)
+            for item, quantity in lines
+        ],
+        batch_size=SEED_BATCH_SIZE,
+    )
+    rebuild_rollups()
+    rebuild_customer_stats()
+
+    # The bonus ledger as the order signals would have written it
+    ledger = [
+        BonusTransaction(user=order.user, order=order, points=int(order.total_amount // BONUS_POINTS_PER_AZN),
+                         description=f"Points for order #{order.pk}")
+        for order in order_rows
+        if order.total_amount >= BONUS_POINTS_PER_AZN
+    ]
+    BonusTransaction.objects.bulk_create(ledger, batch_size=SEED_BATCH_SIZE)
+    balances = {}
+    for entry in ledger:
+        balances[entry.user_id] = balances.get(entry.user_id, 0) + entry.points
+    BonusPoints.objects.bulk_create(
+        [BonusPoints(user_id=user_id, points=points, last_notified_points=points) for user_id, points in balances.items()],
+        batch_size=SEED_BATCH_SIZE,
+    )
+
+    logger.info(
+        "Benchmark data seeded: customers: %s, menu items: %s, orders: %s",
+        customers, menu_items, orders,
+    )
+    return admin, users, items
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def measure(func, iterations, warmup=2, setup=None):
+    """
+    Calls func() warmup + iterations times and returns its latency and query statistics.
+    setup() runs before each call and is not measured.
+    """
+    durations = []
+    queries = []
+    for run in range(warmup + iterations):
+        if setup is not None:
+            setup()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            func()
+            duration = time.perf_counter() - started
+        if run >= warmup:
+            durations.append(duration * 1000)
+            queries.append(len(captured))
+    return {
+        'p50_ms': round(percentile(durations, 50), 2),
+        'p95_ms': round(percentile(durations, 95), 2),
+        'mean_ms': round(statistics.fmean(durations), 2),
+        'queries': statistics.median_low(queries),
+        'max_queries': max(queries),
+    }
+
+
+def _request(client, method, url, expected_status, **kwargs):
+    response = getattr(client, method)(url, **kwargs)
+    if response.status_code != expected_status:
+        raise RuntimeError(f'{method.upper()} {url} returned {response.status_code}: {response.content[:200]!r}')
+    return response
+
+
+def _select_one():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def build_scenarios(admin, customers, items, seed=0):
+    """
+    Returns {name: (func, setup)} for the measured endpoints and tasks.
+    """
+    rng = random.Random(seed)
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    anonymous = APIClient()
+
+    today = timezone.localdate()
+    report_params = {
+        'start_date': (today - timedelta(days=REPORT_DAYS)).isoformat(),
+        'end_date': today.isoformat(),
+    }
+
+    def create_order():
+        lines = [(rng.choice(items), rng.randint(1, 3)) for _ in range(3)]
+        payload = {
+            'user_id': rng.choice(customers).id,
+            'payment_type': rng.choice(('cash', 'card')),
+            'total_amount': '0.00',
+            'order_items': [
+                {'menu_item_id': item.id, 'quantity': quantity, 'price': str(item.price)}
+                for item, quantity in lines
+            ],
+        }
+        _request(client, 'post', reverse('order_list'), 201, data=payload, format='json')
+
+    return {
+        'order_create': (create_order, None),
+        'order_list': (lambda: _request(client, 'get', reverse('order_list'), 200), None),
+        'sales_report': (
+            lambda: _request(client, 'get', reverse('sales_report'), 200, data=report_params), None
+        ),
+        'sales_analytics': (
+            lambda: _request(client, 'get', reverse('sales_analytics'), 200, data=report_params), cache.clear
+        ),
+        'sales_analytics_cached': (
+            lambda: _request(client, 'get', reverse('sales_analytics'), 200, data=report_params), None
+        ),
+        'menu_item_list': (
+            lambda: _request(anonymous, 'get', reverse('menu_item_list'), 200), cache.clear
+        ),
+        'menu_item_list_cached': (
+            lambda: _request(anonymous, 'get', reverse('menu_item_list'), 200), None
+        ),
+        'check_customer_points': (lambda: check_customer_points(), None),
+        # Connection overhead of a request or task: a new connection every time (CONN_MAX_AGE=0),
+        # against the request-end cleanup of the configured mode. In-memory SQLite is never closed,
+        # so compare these on PostgreSQL.
+        'query_new_connection': (_select_one, connection.close),
+        'query_reused_connection': (_select_one, connection.close_if_unusable_or_obsolete),
+    }
+
+
+def latency_comparable(results, baseline):
+    """
+    Latency is only compared between runs on the same database engine, with
+    the same data set sizes and the same number of iterations, of at least
+    MIN_LATENCY_ITERATIONS.
+    """
+    same_setup = all(
+        results['meta'].get(key) == baseline['meta'].get(key)
+        for key in ('database', 'customers', 'menu_items', 'orders', 'iterations')
+    )
+    return same_setup and results['meta'].get('iterations', 0) >= MIN_LATENCY_ITERATIONS
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns the regressions of results against a baseline as readable strings.
+    Query counts must not grow. Latency is compared on the median, p95 of a
+    few dozen runs is decided by one or two outliers.
+    """
+    regressions = []
+    compare_latency = latency_comparable(results, baseline)
+    for name, current in results['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if previous is None:
+            continue
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+        slower = current['p50_ms'] - previous['p50_ms']
+        if compare_latency and slower > NOISE_FLOOR_MS and current['p50_ms'] > previous['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {previous['p50_ms']} ms -> {current['p50_ms']} ms")
+    return regressions
@@ -0,0 +1,126 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import transaction
+
+from project_apps.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_current = ContextVar('bulk_batch', default=None)
+_hooks = {}
+
+
+class BulkRow:
+    __slots__ = ('pk', 'instance', 'created', 'state')
+
+    def __init__(self, pk, instance):
+        self.pk = pk
+        self.instance = instance
+        self.created = False
+        # Receiver-specific values from the row's first write in the batch, e.g. the old order snapshot
+        self.state = {}
+
+
+class BulkBatch:
+    """
+    Rows written inside bulk_signals(), grouped by model.
+    """
+
+    def __init__(self):
+        self.rows = {}
+
+    def defer(self, instance, created=False, **state):
+        model = instance._meta.concrete_model
+        row = self.rows.setdefault(model, {}).get(instance.pk)
+        if row is None:
+            row = self.rows[model][instance.pk] = BulkRow(instance.pk, instance)
+        row.instance = instance
+        row.created = row.created or created
+        for key, value in state.items():
+            row.state.setdefault(key, value)
+
+    def add_created(self, instances):
+        """
+        Registers rows inserted with bulk_create, which sends no signals.
+        """
+        for instance in instances:
+            self.defer(instance, created=True)
+
+    def run_hooks(self):
+        # Imported here, core.indexing imports the Celery tasks
+        from project_apps.core.indexing import queue_ids_for_indexing
+
+        for model, rows in self.rows.items():
+            rows = list(rows.values())
+            for hook in _hooks.get(model, ()):
+                hook(rows)
+            queue_ids_for_indexing(model, [row.pk for row in rows])
+            logger.info("Bulk writes replayed: %s, rows: %s", model._meta.label, len(rows))
+
+
+def register_batch_hook(model):
+    """
+    Registers hook(rows) to replay a model's essential side effects once per bulk_signals() block.
+    """
+    def decorator(func):
+        _hooks.setdefault(model, []).append(func)
+        return func
+    return decorator
+
+
+def current_batch():
+    return _current.get()
+
+
+def defer_to_batch(instance, created=False, **state):
+    """
+    Records the row in the open batch. Returns False outside bulk_signals(),
+    where the receiver should do its work right away.
+    """
+    batch = _current.get()
+    if batch is None:
+        return False
+    batch.defer(instance, created, **state)
+    return True
+
+
+def skip_in_bulk(receiver):
+    """
+    For receivers that only log or do work the batch hooks redo anyway.
+    """
+    @wraps(receiver)
+    def wrapper(*args, **kwargs):
+        if _current.get() is not None:
+            return None
+        return receiver(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def bulk_signals():
+    """
+    Runs a block of writes in one transaction with per-row receivers and search
+    autosync replaced by the registered batch hooks, which run once at the end:
+
+        with bulk_signals() as batch:
+            orders = Order.objects.bulk_create(rows)
+            batch.add_created(orders)
+
+    Nested blocks join the outer one.
+    """
+    batch = _current.get()
+    if batch is not None:
+        yield batch
+        return
+
+    batch = BulkBatch()
+    with transaction.atomic():
+        token = _current.set(batch)
+        try:
+            yield batch
+        finally:
+            _current.reset(token)
+        # Hook writes go through the normal receivers
+        batch.run_hooks()
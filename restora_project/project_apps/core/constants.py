@@ -30,3 +30,36 @@ PAYMENT_TYPE_CHOICES = (
     ('cash', 'Cash'),
     ('card', 'Card'),
 )
+
+# Bonus ledger
+BONUS_LEDGER_BATCH_SIZE = 1000  # Balances compared with the ledger per grouped query
+BONUS_LEDGER_COMPACT_AFTER_DAYS = 90  # Older entries are merged into one per customer
+
+# Search indexing
+SEARCH_INDEX_BATCH_SIZE = 500  # Documents per Elasticsearch bulk request and per indexing task
+
+# Menu search
+MENU_SEARCH_FALLBACK_SECONDS = 30  # Elasticsearch is skipped for this long after a failure
+
+# Menu item images, longest side box per variant
+MENU_IMAGE_SIZES = {
+    'thumbnail': (100, 100),
+    'small': (320, 320),
+    'medium': (800, 800),
+}
+
+# Email outbox
+EMAIL_OUTBOX_BATCH_SIZE = 100  # Emails sent over one SMTP connection
+EMAIL_OUTBOX_MAX_BATCHES = 50  # Batches per drain task run, the rest is left for the next run
+EMAIL_OUTBOX_DRAIN_DELAY_SECONDS = 5  # Emails queued within this window are drained together
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_SECONDS = 60  # First retry delay, doubled after every failure
+EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS = 600  # Rows left in "sending" by a crashed worker are retried after this
+
+# Notification broadcasts
+BROADCAST_CHUNK_SIZE = 2000  # Customers per transaction, notification and email bulk insert
+
+# Sales analytics
+ORDER_ANALYTICS_MAX_DAYS = 366  # Longest date range of one analytics report
+ORDER_ANALYTICS_CACHE_SECONDS = 7 * 24 * 3600  # Day partitions are also replaced as soon as their orders change
+ORDER_ANALYTICS_CHUNK_SIZE = 5000  # Order item rows converted to arrays at a time
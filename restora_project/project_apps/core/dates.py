@@ -0,0 +1,23 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+
+def day_start(date):
+    """Midnight of a calendar day in the current time zone, as an aware datetime."""
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+def date_range_q(field, start_date=None, end_date=None):
+    """
+    Inclusive calendar-day filter on a datetime field as a half-open range:
+    field >= start 00:00 and field < (end + 1 day) 00:00.
+    Unlike field__date, the column is compared as is, so an index on it can be used.
+    """
+    q = Q()
+    if start_date:
+        q &= Q(**{f'{field}__gte': day_start(start_date)})
+    if end_date:
+        q &= Q(**{f'{field}__lt': day_start(end_date + timedelta(days=1))})
+    return q
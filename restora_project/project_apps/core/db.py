@@ -0,0 +1,167 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+from project_apps.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+REPLICA_ALIAS = 'replica'
+CONNECTION_MODES = ('persistent', 'pgbouncer', 'per_request')
+# Set on responses to requests that wrote, the client's next requests read from the primary
+PRIMARY_PIN_COOKIE = 'db_primary'
+
+_routing = ContextVar('db_routing', default=None)
+
+
+class Routing:
+    """
+    Database routing state of one request or task.
+    """
+
+    __slots__ = ('replica', 'pinned', 'wrote')
+
+    def __init__(self, pinned=False):
+        self.replica = False  # Inside replica_reads
+        self.pinned = pinned  # Reads stay on the primary
+        self.wrote = False
+
+
+def connection_settings(mode, max_age):
+    """
+    DATABASES entries for a connection mode:
+    persistent  - connections are kept for max_age seconds and checked before reuse
+    pgbouncer   - the same, for PgBouncer in transaction pooling mode
+    per_request - a new connection for every request and task
+    """
+    if mode not in CONNECTION_MODES:
+        raise ImproperlyConfigured(f"Unknown DB_CONNECTION_MODE: {mode}, expected one of {', '.join(CONNECTION_MODES)}")
+    if mode == 'per_request':
+        return {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False}
+    # A connection dropped while idle (database restart, PgBouncer timeout) is replaced instead of failing the request
+    options = {'CONN_MAX_AGE': max_age, 'CONN_HEALTH_CHECKS': True}
+    if mode == 'pgbouncer':
+        # Server-side cursors (QuerySet.iterator()) do not survive PgBouncer moving the session between transactions
+        options['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return options
+
+
+def replica_configured():
+    return REPLICA_ALIAS in connections.settings
+
+
+@contextmanager
+def reading_from_replica():
+    """
+    Sends the reads of the block to the replica, until the block or its request writes.
+    """
+    routing = _routing.get()
+    token = None
+    if routing is None:
+        routing = Routing()
+        token = _routing.set(routing)
+    previous = routing.replica
+    routing.replica = True
+    try:
+        yield routing
+    finally:
+        routing.replica = previous
+        if token is not None:
+            _routing.reset(token)
+
+
+def replica_reads(func):
+    """
+    For views and tasks that tolerate replication lag: reporting, public menu
+    reads. Stack it under @shared_task.
+    """
+    if iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with reading_from_replica():
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with reading_from_replica():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Writes, and reads outside replica_reads, go to default. Without a replica
+    alias in DATABASES everything goes to default.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None or not routing.replica or routing.pinned or not replica_configured():
+            return None
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            # Read-your-writes: the rest of the request reads from the primary
+            routing.pinned = routing.wrote = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA_ALIAS:
+            return False
+        return None
+
+
+class ReplicaPinMiddleware:
+    """
+    Keeps requests that write, and the same client's requests for
+    REPLICA_PIN_SECONDS after them, on the primary.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        routing, token = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        return self._finish(routing, response)
+
+    async def __acall__(self, request):
+        routing, token = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        return self._finish(routing, response)
+
+    def _start(self, request):
+        routing = Routing(pinned=request.method not in ('GET', 'HEAD', 'OPTIONS') or PRIMARY_PIN_COOKIE in request.COOKIES)
+        return routing, _routing.set(routing)
+
+    def _finish(self, routing, response):
+        if routing.wrote and replica_configured():
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+            )
+        return response
@@ -0,0 +1,20 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.db.backends.ddl_references import Statement
+
+
+class PostgresGinIndex(GinIndex):
+    """
+    GIN index that is skipped on other databases, so the schema can still be
+    created on SQLite for local benchmark and test runs (queries fall back to scans).
+    """
+
+    def _skipped(self, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            return None
+        return Statement('-- %(name)s is only created on PostgreSQL', name=self.name)
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        return self._skipped(schema_editor) or super().create_sql(model, schema_editor, using=using, **kwargs)
+
+    def remove_sql(self, model, schema_editor, **kwargs):
+        return self._skipped(schema_editor) or super().remove_sql(model, schema_editor, **kwargs)
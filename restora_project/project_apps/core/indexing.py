@@ -0,0 +1,97 @@
+import threading
+
+from django.db import models, transaction
+from django_elasticsearch_dsl.apps import DEDConfig
+from django_elasticsearch_dsl.registries import registry
+from django_elasticsearch_dsl.signals import BaseSignalProcessor
+
+from project_apps.core.bulk import defer_to_batch
+from project_apps.core.constants import SEARCH_INDEX_BATCH_SIZE
+from project_apps.core.tasks import index_documents
+
+_state = threading.local()
+
+
+class IndexBatch:
+    """
+    Ids changed in one transaction, sent to Celery by its on_commit callback.
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.flushed = False
+
+    def __call__(self):
+        self.flushed = True
+        for model_label, ids in self.pending.items():
+            ids = sorted(ids)
+            for start in range(0, len(ids), SEARCH_INDEX_BATCH_SIZE):
+                index_documents.delay(model_label, ids[start:start + SEARCH_INDEX_BATCH_SIZE])
+
+
+def _current_batch():
+    """
+    The batch of the running transaction. A rollback discards the batch's
+    on_commit callback, so the next write starts a new batch and the rolled
+    back ids are never sent.
+    """
+    connection = transaction.get_connection()
+    batch = getattr(_state, 'batch', None)
+    registered = batch is not None and any(func is batch for _, func, _ in connection.run_on_commit)
+    if not registered or batch.flushed:
+        batch = _state.batch = IndexBatch()
+        transaction.on_commit(batch)
+    return batch
+
+
+def queue_for_indexing(instance):
+    """
+    Remembers a changed row; its documents are synced after the transaction commits.
+    """
+    queue_ids_for_indexing(instance.__class__, [instance.pk])
+
+
+def queue_ids_for_indexing(model, ids):
+    """
+    Same for rows written without signals, e.g. by bulk_create.
+    """
+    if not DEDConfig.autosync_enabled() or model not in registry.get_models():
+        return
+    if all(document.django.ignore_signals for document in registry.get_documents([model])):
+        return
+    in_transaction = transaction.get_connection().in_atomic_block
+    batch = _current_batch() if in_transaction else IndexBatch()
+    batch.pending.setdefault(model._meta.label, set()).update(ids)
+    if not in_transaction:
+        # Autocommit: the rows are already committed
+        batch()
+
+
+def clear_index_queue():
+    """
+    Forgets the ids of the running transaction, for tests.
+    """
+    _state.batch = None
+
+
+class QueuedSignalProcessor(BaseSignalProcessor):
+    """
+    Indexes saved and deleted rows from a Celery task instead of inside the request.
+    """
+
+    def setup(self):
+        models.signals.post_save.connect(self.handle_save)
+        models.signals.post_delete.connect(self.handle_delete)
+
+    def teardown(self):
+        models.signals.post_save.disconnect(self.handle_save)
+        models.signals.post_delete.disconnect(self.handle_delete)
+
+    def handle_save(self, sender, instance, **kwargs):
+        # Inside bulk_signals() the batch queues all its rows at the end
+        if not defer_to_batch(instance):
+            queue_for_indexing(instance)
+
+    def handle_delete(self, sender, instance, **kwargs):
+        if not defer_to_batch(instance):
+            queue_for_indexing(instance)
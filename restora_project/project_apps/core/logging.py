@@ -1,41 +1,227 @@
+import atexit
+import json
 import logging
 import os
-from pathlib import Path
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from operator import attrgetter
+
+# Attributes every LogRecord has; anything else came in through `extra`
+RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
 
-# Log qovluğunu yarat
-LOG_DIR = Path(__file__).resolve().parent.parent.parent / 'logs'
-LOG_DIR.mkdir(exist_ok=True)
 
 def get_logger(name):
     """
     Modul üçün log qaytarır.
+    Handlers live on the root logger (settings.LOGGING), so records propagate to one queue.
     """
-    logger = logging.getLogger(name)
-    
-    if not logger.handlers:
-        # Konsol handler
-        console_handler = logging.StreamHandler()
-        console_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
-
-        # Fayl handler
-        log_file = LOG_DIR / f'{name}.log'
-        file_handler = RotatingFileHandler(
-            log_file,
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=5,
-            encoding='utf-8'
+    return AppLogger(logging.getLogger(name))
+
+
+class lazy:
+    """
+    Log argument that is computed only when the record is actually emitted:
+    logger.info("Order item: %s", lazy(lambda: item.menu_item.name))
+    """
+    __slots__ = ('func',)
+
+    def __init__(self, func):
+        self.func = func
+
+    def __str__(self):
+        return str(self.func())
+
+    def __repr__(self):
+        return repr(self.func())
+
+
+def lazy_attr(obj, path):
+    """
+    Lazy dotted attribute; lazy_attr(order, 'user.email') loads the user only if the record is emitted.
+    """
+    return lazy(lambda: attrgetter(path)(obj))
+
+
+class _DisabledLogger:
+    """Stands in for a logger whose record was sampled or throttled away."""
+
+    def isEnabledFor(self, level):
+        return False
+
+    def _skip(self, *args, **kwargs):
+        pass
+
+    debug = info = warning = error = exception = critical = log = _skip
+
+
+DISABLED_LOGGER = _DisabledLogger()
+
+_throttle_lock = threading.Lock()
+_throttled_at = {}
+
+
+class AppLogger(logging.LoggerAdapter):
+    """
+    Logger with sampling and rate limiting for high-frequency events.
+    Use %-style arguments so nothing is formatted for disabled levels.
+    """
+
+    def __init__(self, logger, extra=None):
+        super().__init__(logger, extra or {})
+
+    def process(self, msg, kwargs):
+        if self.extra:
+            kwargs['extra'] = {**self.extra, **kwargs.get('extra', {})}
+        return msg, kwargs
+
+    def sampled(self, rate=None):
+        """
+        Returns a logger for about `rate` of the calls and a no-op logger for the rest.
+        Emitted records carry sample_rate so counts can be scaled back up.
+        """
+        if rate is None:
+            from django.conf import settings
+            rate = settings.LOG_SAMPLE_RATE
+        if rate >= 1:
+            return self
+        if random.random() >= rate:
+            return DISABLED_LOGGER
+        return AppLogger(self.logger, {**self.extra, 'sample_rate': rate})
+
+    def throttled(self, key, seconds=60):
+        """
+        Lets one record per `seconds` through for `key` in this process.
+        """
+        now = time.monotonic()
+        key = (self.logger.name, key)
+        with _throttle_lock:
+            last = _throttled_at.get(key)
+            if last is not None and now - last < seconds:
+                return DISABLED_LOGGER
+            _throttled_at[key] = now
+        return self
+
+
+def parse_log_levels(value):
+    """
+    Turns "project_apps.orders=DEBUG,django.db.backends=WARNING" into LOGGING['loggers'] entries.
+    """
+    loggers = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, level = item.partition('=')
+        if not level:
+            raise ValueError(f"Invalid log level setting: {item}")
+        loggers[name.strip()] = {'level': level.strip().upper()}
+    return loggers
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line, with `extra` fields kept as keys.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.thread,
+        }
+        entry.update(
+            (key, value) for key, value in record.__dict__.items()
+            if key not in RECORD_ATTRIBUTES and not key.startswith('_')
         )
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class BackgroundLogHandler(QueueHandler):
+    """
+    Puts records on an in-memory queue that one writer thread per process drains.
+    The calling thread only builds the message; file and console I/O happen on the
+    writer thread. When the queue is full, records are dropped instead of waiting.
+    """
+
+    def __init__(self, log_file=None, error_file=None, console=True, queue_size=10000,
+                 max_bytes=10 * 1024 * 1024, backup_count=5):
+        self.queue_size = queue_size
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.targets = []
+        if log_file:
+            self.targets.append(self._file_handler(log_file, logging.NOTSET, max_bytes, backup_count))
+        if error_file:
+            self.targets.append(self._file_handler(error_file, logging.ERROR, max_bytes, backup_count))
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+            self.targets.append(console_handler)
+        self.dropped = 0
+        self.listener = None
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+
+    @staticmethod
+    def _file_handler(filename, level, max_bytes, backup_count):
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        # delay: the file is opened by the writer thread, after any fork
+        handler = RotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True
         )
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        handler.setLevel(level)
+        handler.setFormatter(JsonFormatter())
+        return handler
+
+    def _ensure_listener(self):
+        # Threads do not survive fork, so each gunicorn/celery child starts its own writer
+        if self._listener_pid == os.getpid():
+            return
+        with self._listener_lock:
+            if self._listener_pid == os.getpid():
+                return
+            if self._listener_pid is not None:
+                self.queue = queue.Queue(maxsize=self.queue_size)
+            self.listener = QueueListener(self.queue, *self.targets, respect_handler_level=True)
+            self.listener.start()
+            self._listener_pid = os.getpid()
+            atexit.register(self.stop)
+
+    def stop(self):
+        """Writes out what is still queued and stops the writer thread."""
+        with self._listener_lock:
+            if self.listener is not None and self._listener_pid == os.getpid():
+                self.listener.stop()
+                self.listener = None
+                self._listener_pid = None
+
+    def prepare(self, record):
+        # Resolve the message here: lazy arguments may need this thread's database connection
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
 
-        logger.setLevel(logging.INFO)
-    
-    return logger
\ No newline at end of file
+    def close(self):
+        self.stop()
+        super().close()
@@ -0,0 +1,111 @@
+import json
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from project_apps.core.benchmark import build_scenarios, compare, latency_comparable, measure, seed
+from restora_project.celery import app as celery_app
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = 'Seed a throwaway database and measure latency and query counts of the main endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=200)
+        parser.add_argument('--menu-items', type=int, default=100)
+        parser.add_argument('--orders', type=int, default=2000)
+        parser.add_argument('--iterations', type=int, default=20, help='Measured runs per scenario')
+        parser.add_argument('--seed', type=int, default=42, help='Seed of the data generator')
+        parser.add_argument('--scenario', action='append', help='Run only this scenario (repeatable)')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline JSON to compare with')
+        parser.add_argument('--no-compare', action='store_true', help='Do not compare with the baseline')
+        parser.add_argument('--save-baseline', action='store_true', help='Overwrite the baseline with these results')
+        parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed p50 growth, 0.25 = 25%%')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('Iterations must be at least 1')
+
+        # A test database is created and dropped, so existing data is never touched
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+        try:
+            with override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False):
+                results = self._run(options)
+        finally:
+            celery_app.conf.task_always_eager = eager
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(output + '\n')
+            self.stdout.write(f"Results written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline saved: {baseline_path}'))
+        elif not options['no_compare']:
+            self._compare(results, baseline_path, options['tolerance'])
+
+    def _run(self, options):
+        admin, customers, items = seed(
+            options['customers'], options['menu_items'], options['orders'], seed=options['seed']
+        )
+        scenarios = build_scenarios(admin, customers, items, seed=options['seed'])
+        selected = options['scenario'] or list(scenarios)
+        unknown = set(selected) - set(scenarios)
+        if unknown:
+            raise CommandError(f"Unknown scenario: {', '.join(sorted(unknown))}")
+
+        results = {
+            'meta': {
+                'database': connection.vendor,
+                'connection_mode': settings.DB_CONNECTION_MODE,
+                'django': django.get_version(),
+                'customers': options['customers'],
+                'menu_items': options['menu_items'],
+                'orders': options['orders'],
+                'iterations': options['iterations'],
+                'seed': options['seed'],
+            },
+            'scenarios': {},
+        }
+        for name in selected:
+            func, setup = scenarios[name]
+            results['scenarios'][name] = measure(func, options['iterations'], setup=setup)
+            self.stderr.write(f"{name}: {results['scenarios'][name]}")
+        return results
+
+    def _compare(self, results, baseline_path, tolerance):
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f'No baseline at {baseline_path}, run with --save-baseline'))
+            return
+        baseline = json.loads(baseline_path.read_text())
+        regressions = compare(results, baseline, tolerance)
+        if not latency_comparable(results, baseline):
+            self.stdout.write(self.style.WARNING(
+                'Latency not compared: run with the setup and --iterations of the baseline'
+            ))
+        if regressions:
+            raise CommandError('Performance regressions:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
@@ -0,0 +1,332 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from project_apps.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bounds in seconds for the request duration histogram
+DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Cost of one request: wall time, database queries, cache accesses and response size.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.queries = 0
+        self.query_time = 0.0
+        self.duplicate_queries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.response_bytes = 0
+        self._statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # Execute wrapper signature, called by record_query
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_time += time.perf_counter() - started
+            self.queries += 1
+            key = (sql, repr(params))
+            self._statements[key] += 1
+            if self._statements[key] > 1:
+                self.duplicate_queries += 1
+
+    def finish(self, response):
+        self.duration = time.perf_counter() - self.started
+        # A streamed body is counted chunk by chunk while it is sent
+        if not response.streaming:
+            self.response_bytes = len(response.content)
+
+    def server_timing(self):
+        return ', '.join((
+            f'db;dur={self.query_time * 1000:.1f};desc="{self.queries} queries, {self.duplicate_queries} duplicate"',
+            f'cache;desc="{self.cache_hits} hit, {self.cache_misses} miss"',
+            f'app;dur={(self.duration - self.query_time) * 1000:.1f}',
+            f'total;dur={self.duration * 1000:.1f}',
+        ))
+
+    def budget_overruns(self, budget):
+        """Returns (name, limit, value) for every budget entry this request went over."""
+        values = {
+            'duration_ms': self.duration * 1000,
+            'queries': self.queries,
+            'query_time_ms': self.query_time * 1000,
+            'duplicate_queries': self.duplicate_queries,
+            'response_bytes': self.response_bytes,
+        }
+        return [
+            (name, limit, values[name])
+            for name, limit in budget.items()
+            if name in values and values[name] > limit
+        ]
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper installed once on every database connection by core.signals.
+    Counts the query for the request measured in the current context, so
+    overlapping requests never count each other's queries.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def record_cache_access(hit):
+    """Counts a cache hit or miss for the current request, if it is being measured."""
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+class _ViewStats:
+    __slots__ = (
+        'requests', 'duration', 'queries', 'query_time', 'duplicate_queries',
+        'cache_hits', 'cache_misses', 'response_bytes', 'budget_overruns', 'buckets',
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.query_time = 0.0
+        self.duplicate_queries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.response_bytes = 0
+        self.budget_overruns = 0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+
+class MetricsRegistry:
+    """
+    Per-view totals since the process started, rendered in the Prometheus text format.
+    Each gunicorn worker keeps its own totals; Prometheus sums them across scrapes.
+    """
+
+    COUNTERS = (
+        ('queries', 'restora_db_queries_total', 'Database queries executed.'),
+        ('query_time', 'restora_db_query_seconds_total', 'Time spent in database queries.'),
+        ('duplicate_queries', 'restora_db_duplicate_queries_total', 'Queries repeated with the same SQL and parameters.'),
+        ('cache_hits', 'restora_cache_hits_total', 'Cache hits.'),
+        ('cache_misses', 'restora_cache_misses_total', 'Cache misses.'),
+        ('response_bytes', 'restora_response_bytes_total', 'Serialized response bytes.'),
+        ('budget_overruns', 'restora_budget_overruns_total', 'Requests over their performance budget.'),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(_ViewStats)
+
+    def observe(self, view, method, metrics, over_budget=False):
+        with self._lock:
+            stats = self._views[(view, method)]
+            stats.requests += 1
+            stats.duration += metrics.duration
+            stats.queries += metrics.queries
+            stats.query_time += metrics.query_time
+            stats.duplicate_queries += metrics.duplicate_queries
+            stats.cache_hits += metrics.cache_hits
+            stats.cache_misses += metrics.cache_misses
+            stats.response_bytes += metrics.response_bytes
+            stats.budget_overruns += int(over_budget)
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if metrics.duration <= bound:
+                    stats.buckets[index] += 1
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def render(self):
+        with self._lock:
+            views = sorted(self._views.items())
+            lines = [
+                '# HELP restora_request_duration_seconds Request wall time.',
+                '# TYPE restora_request_duration_seconds histogram',
+            ]
+            for (view, method), stats in views:
+                labels = f'view="{view}",method="{method}"'
+                for bound, count in zip(DURATION_BUCKETS, stats.buckets):
+                    lines.append(f'restora_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'restora_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.requests}')
+                lines.append(f'restora_request_duration_seconds_sum{{{labels}}} {stats.duration}')
+                lines.append(f'restora_request_duration_seconds_count{{{labels}}} {stats.requests}')
+            for attr, name, help_text in self.COUNTERS:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for (view, method), stats in views:
+                    lines.append(f'{name}{{view="{view}",method="{method}"}} {getattr(stats, attr)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+def get_budget(view):
+    budgets = settings.PERFORMANCE_BUDGETS
+    return {**budgets.get('default', {}), **budgets.get(view, {})}
+
+
+class _MeasuredStream:
+    """
+    Body of a streaming response. The chunks are produced in the request's
+    metrics context, so the queries of the stream are counted, and the request
+    is recorded when the response is closed.
+    """
+
+    def __init__(self, chunks, metrics, on_close):
+        self.chunks = chunks
+        self.metrics = metrics
+        self.on_close = on_close
+        self.closed = False
+
+    def close(self):
+        # Called by HttpResponse.close() through streaming_content
+        if not self.closed:
+            self.closed = True
+            self.on_close()
+
+    def _count(self, chunk):
+        self.metrics.response_bytes += len(chunk)
+        return chunk
+
+
+class _MeasuredSyncStream(_MeasuredStream):
+    def __iter__(self):
+        chunks = iter(self.chunks)
+        while True:
+            token = _current.set(self.metrics)
+            try:
+                chunk = next(chunks, None)
+            finally:
+                _current.reset(token)
+            if chunk is None:
+                return
+            yield self._count(chunk)
+
+
+class _MeasuredAsyncStream(_MeasuredStream):
+    async def __aiter__(self):
+        chunks = aiter(self.chunks)
+        while True:
+            token = _current.set(self.metrics)
+            try:
+                chunk = await anext(chunks, None)
+            finally:
+                _current.reset(token)
+            if chunk is None:
+                return
+            yield self._count(chunk)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures every request, adds a Server-Timing header, records the totals
+    in the registry and warns when a view goes over its PERFORMANCE_BUDGETS entry.
+    Queries are counted by record_query, for the request of the current context.
+    A streamed body is measured until the response is closed; its headers are
+    sent before that, so it gets no Server-Timing header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._record(request, metrics, response)
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            # sync_to_async copies the context, so queries in worker threads are counted too
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._record(request, metrics, response)
+
+    def _record(self, request, metrics, response):
+        view = _view_name(request)
+        if view == 'metrics':
+            return response
+        if response.streaming:
+            stream = _MeasuredAsyncStream if response.is_async else _MeasuredSyncStream
+            response.streaming_content = stream(
+                response.streaming_content, metrics, lambda: self._observe(request, view, metrics, response)
+            )
+            return response
+        self._observe(request, view, metrics, response)
+        response['Server-Timing'] = metrics.server_timing()
+        return response
+
+    def _observe(self, request, view, metrics, response):
+        metrics.finish(response)
+        overruns = metrics.budget_overruns(get_budget(view))
+        registry.observe(view, request.method, metrics, over_budget=bool(overruns))
+        if overruns:
+            logger.throttled(('budget', view)).warning(
+                "Performance budget exceeded: %s %s, %s", request.method, view,
+                ', '.join(f'{name}: {value:.0f} > {limit}' for name, limit, value in overruns),
+                extra={'view': view, 'queries': metrics.queries, 'duration_ms': round(metrics.duration * 1000, 1)},
+            )
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Requires METRICS_TOKEN as a bearer token when it is set,
+    and is only served in DEBUG otherwise.
+    """
+    if settings.METRICS_TOKEN:
+        expected = f'Bearer {settings.METRICS_TOKEN}'
+        if not constant_time_compare(request.headers.get('Authorization', ''), expected):
+            return HttpResponse(status=401)
+    elif not settings.DEBUG:
+        raise Http404
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
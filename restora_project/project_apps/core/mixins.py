@@ -12,6 +12,55 @@ class TimestampMixin(models.Model):
         abstract = True  # Indicates this is an abstract model
 
 
+# Live rows are `is_deleted = false`, the partial indexes below use the same condition
+ALIVE = models.Q(is_deleted=False)
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def alive(self):
+        return self.filter(ALIVE)
+
+    def deleted(self):
+        return self.filter(is_deleted=True)
+
+    def soft_delete(self):
+        """
+        Bulk SoftDeleteMixin.delete: one UPDATE, the receivers' work is replayed by
+        the bulk_signals() batch hooks. Returns the number of rows deleted.
+        """
+        return self._set_deleted(True, deleted_at=timezone.now())
+
+    def restore(self):
+        return self._set_deleted(False, deleted_at=None)
+
+    def _set_deleted(self, is_deleted, **values):
+        # Imported here, core.bulk is loaded by the apps' signal modules
+        from project_apps.core.bulk import bulk_signals
+
+        if any(field.name == 'updated_at' for field in self.model._meta.concrete_fields):
+            values['updated_at'] = timezone.now()
+        with bulk_signals() as batch:
+            rows = list(self.filter(is_deleted=not is_deleted).select_for_update())
+            for row in rows:
+                batch.defer(row, **row.batch_state())
+            return self.model._base_manager.filter(pk__in=[row.pk for row in rows]).update(
+                is_deleted=is_deleted, **values
+            )
+
+
+class AliveManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    # Model.alive: only rows that are not soft deleted
+    def get_queryset(self):
+        return super().get_queryset().filter(ALIVE)
+
+
+def alive_index(*fields, name):
+    """
+    Partial index over live rows only, so lookups stay small as deleted history grows.
+    """
+    return models.Index(fields=list(fields), name=name, condition=ALIVE)
+
+
 # Instead of deleting records, they are soft deleted (marked as deleted)
 class SoftDeleteMixin(models.Model):
     # Indicates if the record is deleted or not
@@ -19,6 +68,10 @@ class SoftDeleteMixin(models.Model):
     # The date and time when the record was deleted
     deleted_at = models.DateTimeField(blank=True, null=True)
 
+    # objects stays the default manager (admin, related lookups), alive hides deleted rows
+    objects = SoftDeleteQuerySet.as_manager()
+    alive = AliveManager()
+
     # Soft delete the record (does not remove it from the database)
     def delete(self, *args, **kwargs):
         self.is_deleted = True
@@ -31,6 +84,10 @@ class SoftDeleteMixin(models.Model):
         self.deleted_at = None
         self.save()
 
+    # State the bulk_signals() hooks need from before a bulk soft delete or restore
+    def batch_state(self):
+        return {}
+
     class Meta:
         abstract = True
 
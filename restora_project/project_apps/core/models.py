@@ -0,0 +1,18 @@
+from django.db import models
+
+from project_apps.core.mixins import TimestampMixin
+
+
+class TaskCheckpoint(TimestampMixin, models.Model):
+    """
+    Persisted high-water mark for incremental periodic tasks, or the time a one-off task completed
+    """
+    name = models.CharField(max_length=100, unique=True, verbose_name="name")
+    high_water_mark = models.DateTimeField(null=True, blank=True, verbose_name="high-water mark")
+
+    def __str__(self):
+        return f"{self.name} ({self.high_water_mark})"
+
+    class Meta:
+        verbose_name = "task checkpoint"
+        verbose_name_plural = "task checkpoints"
@@ -0,0 +1,14 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from project_apps.core.metrics import record_query
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    Installs the request metrics wrapper once per connection. It goes first,
+    because execute_wrapper() blocks pop the last wrapper when they exit.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
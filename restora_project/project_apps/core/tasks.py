@@ -0,0 +1,43 @@
+from celery import shared_task
+from django.apps import apps
+from django_elasticsearch_dsl.registries import registry
+from elasticsearch import ConnectionError, ConnectionTimeout
+
+from project_apps.core.constants import SEARCH_INDEX_BATCH_SIZE
+from project_apps.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _document_actions(document, ids):
+    # Rows that no longer exist are removed from the index
+    found = set()
+    for instance in document.get_queryset().filter(pk__in=ids).iterator(chunk_size=SEARCH_INDEX_BATCH_SIZE):
+        found.add(instance.pk)
+        if document.should_index_object(instance):
+            yield document._prepare_action(instance, 'index')
+    for pk in set(ids) - found:
+        yield {'_op_type': 'delete', '_index': document._index._name, '_id': pk}
+
+
+@shared_task(autoretry_for=(ConnectionError, ConnectionTimeout), retry_backoff=True, max_retries=5)
+def index_documents(model_label, ids):
+    """
+    Syncs the search documents of the given rows with one bulk request per batch.
+    """
+    model = apps.get_model(model_label)
+    for document_class in registry.get_documents([model]):
+        if document_class.django.ignore_signals:
+            continue
+        document = document_class()
+        kwargs = {'refresh': True} if document.django.auto_refresh else {}
+        success, errors = document.bulk(
+            _document_actions(document, ids),
+            chunk_size=SEARCH_INDEX_BATCH_SIZE,
+            raise_on_error=False,
+            ignore_status=(404,),
+            **kwargs,
+        )
+        if errors:
+            logger.error("Search indexing errors: %s, failed: %s, first: %s", document._index._name, len(errors), errors[0])
+        logger.info("Search documents synced: %s, ok: %s, requested: %s", document._index._name, success, len(ids))
@@ -0,0 +1,14 @@
+from restora_project.celery import app as celery_app
+
+# Celery reads its Django settings with the CELERY_ namespace, the prefixed key wins
+EAGER_KEY = 'CELERY_TASK_ALWAYS_EAGER'
+
+
+def eager_celery(test_case):
+    """
+    Runs Celery tasks inline for the rest of the test, whatever the settings say.
+    Call it from setUp; the previous setting is restored when the test ends.
+    """
+    previous = celery_app.conf.task_always_eager
+    celery_app.conf[EAGER_KEY] = True
+    test_case.addCleanup(celery_app.conf.__setitem__, EAGER_KEY, previous)
@@ -0,0 +1,80 @@
+import json
+from types import SimpleNamespace
+
+from elasticsearch import AsyncElasticsearch, Elasticsearch
+
+
+def _search(client, index, body):
+    """
+    Records the query and returns every stored document of the index, unfiltered.
+    """
+    client.search_requests.append(body)
+    indices = [index] if isinstance(index, str) else list(index or [])
+    hits = [
+        {'_index': doc_index, '_id': doc_id, '_score': 1.0}
+        for doc_index, doc_id in client.documents
+        if not indices or doc_index in indices
+    ]
+    return SimpleNamespace(body={
+        'took': 1,
+        'timed_out': False,
+        'hits': {'total': {'value': len(hits), 'relation': 'eq'}, 'max_score': 1.0, 'hits': hits},
+    })
+
+
+class FakeElasticsearch(Elasticsearch):
+    """
+    In-memory stand-in for the Elasticsearch client.
+    Records bulk and search requests and keeps the indexed documents, no server needed.
+    """
+
+    def __init__(self):
+        super().__init__('http://localhost:9200')
+        self.bulk_requests = []
+        self.search_requests = []
+        self.documents = {}
+
+    def options(self, **kwargs):
+        return self
+
+    def bulk(self, operations=None, **kwargs):
+        lines = [json.loads(line) for line in operations]
+        self.bulk_requests.append(lines)
+        items = []
+        position = 0
+        while position < len(lines):
+            op_type, meta = next(iter(lines[position].items()))
+            key = (meta['_index'], str(meta['_id']))
+            if op_type == 'delete':
+                status = 200 if self.documents.pop(key, None) is not None else 404
+                position += 1
+            else:
+                self.documents[key] = lines[position + 1]
+                status = 201
+                position += 2
+            items.append({op_type: {'_index': meta['_index'], '_id': meta['_id'], 'status': status}})
+        return SimpleNamespace(body={'errors': False, 'items': items})
+
+    def search(self, index=None, body=None, **kwargs):
+        return _search(self, index, body)
+
+
+class FakeAsyncElasticsearch(AsyncElasticsearch):
+    """
+    In-memory stand-in for the async client, answers searches like FakeElasticsearch.
+    """
+
+    def __init__(self):
+        super().__init__('http://localhost:9200')
+        self.search_requests = []
+        self.documents = {}
+        self.closed = False
+
+    def options(self, **kwargs):
+        return self
+
+    async def close(self):
+        self.closed = True
+
+    async def search(self, index=None, body=None, **kwargs):
+        return _search(self, index, body)
@@ -0,0 +1,69 @@
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase
+
+from project_apps.core.benchmark import compare, measure, percentile, seed
+from project_apps.core.tests.eager_celery import eager_celery
+from project_apps.orders.models import DailySalesRollup, Order, OrderItem
+
+
+class SeedTest(TestCase):
+    def setUp(self):
+        # Seeding sends signup emails and search indexing tasks
+        eager_celery(self)
+
+    def _orders(self):
+        return list(
+            Order.objects.order_by('id').values_list('user__username', 'total_amount', 'status', 'payment_type')
+        )
+
+    def test_seed_is_deterministic(self):
+        with transaction.atomic():
+            seed(customers=5, menu_items=10, orders=20, seed=7)
+            first = self._orders()
+            transaction.set_rollback(True)
+
+        seed(customers=5, menu_items=10, orders=20, seed=7)
+        self.assertEqual(self._orders(), first)
+
+    def test_seed_creates_rollups(self):
+        seed(customers=5, menu_items=10, orders=20, seed=7)
+        self.assertEqual(Order.objects.count(), 20)
+        self.assertTrue(OrderItem.objects.exists())
+        self.assertTrue(DailySalesRollup.objects.exists())
+
+
+class CompareTest(SimpleTestCase):
+    def _results(self, queries, p50, database='sqlite', iterations=20):
+        return {
+            'meta': {'database': database, 'customers': 1, 'menu_items': 1, 'orders': 1, 'iterations': iterations},
+            'scenarios': {'order_list': {'queries': queries, 'p50_ms': p50, 'p95_ms': p50 * 3}},
+        }
+
+    def test_query_growth_is_a_regression(self):
+        self.assertEqual(
+            compare(self._results(3, 10), self._results(2, 10), tolerance=0.25),
+            ['order_list: queries 2 -> 3'],
+        )
+
+    def test_latency_is_compared_on_the_same_setup_only(self):
+        self.assertEqual(len(compare(self._results(2, 20), self._results(2, 10), tolerance=0.25)), 1)
+        self.assertEqual(compare(self._results(2, 12), self._results(2, 10), tolerance=0.25), [])
+        self.assertEqual(
+            compare(self._results(2, 20, 'postgresql'), self._results(2, 10), tolerance=0.25), []
+        )
+
+    def test_latency_needs_the_baseline_iterations(self):
+        self.assertEqual(compare(self._results(2, 20, iterations=5), self._results(2, 10, iterations=5), 0.25), [])
+        self.assertEqual(compare(self._results(2, 20, iterations=30), self._results(2, 10), tolerance=0.25), [])
+        self.assertEqual(
+            compare(self._results(3, 20, iterations=5), self._results(2, 10), tolerance=0.25),
+            ['order_list: queries 2 -> 3'],
+        )
+
+    def test_measure(self):
+        calls = []
+        stats = measure(lambda: calls.append(1), iterations=5, warmup=1)
+        self.assertEqual(len(calls), 6)
+        self.assertEqual(stats['queries'], 0)
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 50), 3)
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 95), 5)
@@ -0,0 +1,170 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from elasticsearch_dsl.connections import connections
+
+from project_apps.accounts.models import User
+from project_apps.core.bulk import bulk_signals
+from project_apps.core.indexing import clear_index_queue
+from project_apps.core.tests.eager_celery import eager_celery
+from project_apps.core.tests.fake_elasticsearch import FakeElasticsearch
+from project_apps.customers.models import BonusTransaction, CustomerStats
+from project_apps.menu.cache import bump_menu_version
+from project_apps.menu.models import Category, MenuItem
+from project_apps.notifications.models import AdminCode, BonusPoints, DiscountCode
+from project_apps.orders.models import DailySalesRollup, Order
+
+
+def _rollup_totals():
+    # Per-row signals leave emptied rollup rows behind, the batch does not create them
+    return sorted(
+        DailySalesRollup.objects.exclude(order_count=0)
+        .values_list('status', 'revenue', 'order_count', 'bonus_points')
+    )
+
+
+@patch('project_apps.customers.loyalty.send_coffee_bonus_email.delay')
+class BulkSignalsTest(TestCase):
+    def setUp(self):
+        with patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            self.customer = User.objects.create_user(
+                username="customer", password="testpassword", email="customer@example.com", role="customer"
+            )
+
+    def _state(self):
+        stats = CustomerStats.objects.filter(pk=self.customer.pk).values_list(
+            'order_count', 'lifetime_spend', 'points'
+        ).first()
+        return (
+            _rollup_totals(),
+            stats,
+            BonusPoints.objects.get(user=self.customer).points,
+            sum(BonusTransaction.objects.filter(user=self.customer).values_list('points', flat=True)),
+        )
+
+    def _write_orders(self):
+        first = Order.objects.create(user=self.customer, total_amount=Decimal('120.00'))
+        second = Order.objects.create(user=self.customer, total_amount=Decimal('35.00'))
+        Order.objects.create(user=self.customer, total_amount=Decimal('60.00')).delete()
+        first.status = 'completed'
+        first.total_amount = Decimal('90.00')
+        first.save()
+        second.delete()
+
+    def test_batch_ends_in_the_same_state_as_per_row_signals(self, coffee_delay):
+        self._write_orders()
+        expected = self._state()
+        for model in (Order, DailySalesRollup, CustomerStats, BonusTransaction, BonusPoints):
+            model.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with bulk_signals():
+                self._write_orders()
+                # Nothing is replayed before the block ends
+                self.assertFalse(BonusTransaction.objects.exists())
+
+        self.assertEqual(self._state(), expected)
+        self.assertEqual(expected[2], 9)
+        self.assertEqual(coffee_delay.call_count, 1)
+
+    def test_bulk_created_rows_are_replayed(self, coffee_delay):
+        with bulk_signals() as batch:
+            orders = Order.objects.bulk_create([
+                Order(user=self.customer, total_amount=Decimal('25.00')) for _ in range(10)
+            ])
+            batch.add_created(orders)
+
+        self.assertEqual(_rollup_totals(), [('pending', Decimal('250.00'), 10, 20)])
+        self.assertEqual(CustomerStats.objects.get(pk=self.customer.pk).order_count, 10)
+        self.assertEqual(BonusTransaction.objects.filter(user=self.customer).count(), 10)
+        self.assertEqual(BonusPoints.objects.get(user=self.customer).points, 20)
+
+    def test_replay_query_count_does_not_grow_with_orders(self, coffee_delay):
+        def replay(count):
+            with bulk_signals() as batch:
+                orders = Order.objects.bulk_create([
+                    Order(user=self.customer, total_amount=Decimal('25.00')) for _ in range(count)
+                ])
+                batch.add_created(orders)
+
+        # The first batch also creates the balance and rollup rows
+        replay(1)
+        with CaptureQueriesContext(connection) as few:
+            replay(5)
+        with CaptureQueriesContext(connection) as many:
+            replay(50)
+        self.assertEqual(len(few), len(many))
+
+    def test_failed_block_replays_nothing(self, coffee_delay):
+        with self.assertRaises(ValueError):
+            with bulk_signals():
+                Order.objects.create(user=self.customer, total_amount=Decimal('120.00'))
+                raise ValueError("Import row is broken")
+
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(DailySalesRollup.objects.exists())
+        self.assertFalse(BonusTransaction.objects.exists())
+
+    @patch('project_apps.orders.signals.logging')
+    def test_log_receivers_are_skipped(self, order_logging, coffee_delay):
+        with bulk_signals():
+            Order.objects.create(user=self.customer, total_amount=Decimal('5.00'))
+        order_logging.info.assert_not_called()
+
+        Order.objects.create(user=self.customer, total_amount=Decimal('5.00'))
+        order_logging.info.assert_called_once()
+
+
+class BulkSignalsSideEffectsTest(TestCase):
+    @patch('project_apps.notifications.signals.send_admin_code_email.delay')
+    @patch('project_apps.notifications.signals.send_discount_code_email.delay')
+    def test_new_users_get_their_codes_after_commit(self, discount_delay, admin_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            with bulk_signals() as batch:
+                users = User.objects.bulk_create([
+                    User(username=f'imported{i}', email=f'imported{i}@example.com', role='customer')
+                    for i in range(3)
+                ])
+                batch.add_created(users)
+                User.objects.create_user(username='boss', email='boss@example.com', password='x', role='admin')
+                discount_delay.assert_not_called()
+
+        self.assertEqual(DiscountCode.objects.count(), 3)
+        self.assertEqual(AdminCode.objects.count(), 1)
+        self.assertEqual(discount_delay.call_count, 3)
+        admin_delay.assert_called_once()
+
+    def test_menu_cache_is_invalidated_once(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with bulk_signals():
+                category = Category.objects.create(name='Soups')
+                for i in range(5):
+                    MenuItem.objects.create(category=category, name=f'Soup {i}', price=Decimal('4.00'))
+
+        # One bump per replayed model instead of one per row
+        self.assertEqual(sum(callback is bump_menu_version for callback in callbacks), 2)
+
+    @override_settings(ELASTICSEARCH_DSL_AUTOSYNC=True)
+    def test_search_documents_are_sent_in_one_request(self):
+        eager_celery(self)
+        clear_index_queue()
+        previous_client = connections.get_connection()
+        client = FakeElasticsearch()
+        connections.add_connection('default', client)
+        self.addCleanup(connections.add_connection, 'default', previous_client)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with bulk_signals():
+                category = Category.objects.create(name='Soups')
+                items = [
+                    MenuItem.objects.create(category=category, name=f'Soup {i}', price=Decimal('4.00'))
+                    for i in range(5)
+                ]
+                items[0].name = 'Lentil soup'
+                items[0].save()
+
+        self.assertEqual(len(client.bulk_requests), 1)
+        self.assertEqual(client.documents[('menu_items', str(items[0].pk))]['name'], 'Lentil soup')
@@ -0,0 +1,24 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from project_apps.core.db import connection_settings
+
+
+class ConnectionSettingsTest(SimpleTestCase):
+    def test_persistent_connections_are_health_checked(self):
+        self.assertEqual(
+            connection_settings('persistent', 60),
+            {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True},
+        )
+
+    def test_pgbouncer_mode_disables_server_side_cursors(self):
+        options = connection_settings('pgbouncer', 300)
+        self.assertEqual(options['CONN_MAX_AGE'], 300)
+        self.assertTrue(options['DISABLE_SERVER_SIDE_CURSORS'])
+
+    def test_per_request_mode_closes_every_connection(self):
+        self.assertEqual(connection_settings('per_request', 60)['CONN_MAX_AGE'], 0)
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, 'pooled'):
+            connection_settings('pooled', 60)
@@ -0,0 +1,124 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from project_apps.accounts.models import User
+from project_apps.core.db import (
+    PRIMARY_PIN_COOKIE,
+    REPLICA_ALIAS,
+    ReplicaPinMiddleware,
+    ReplicaRouter,
+    reading_from_replica,
+    replica_reads,
+)
+from project_apps.menu.models import Category, MenuItem
+from project_apps.orders.models import Order
+
+
+@patch('project_apps.core.db.replica_configured', return_value=True)
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_the_replica_only_when_marked(self, configured):
+        self.assertIsNone(self.router.db_for_read(Order))
+        with reading_from_replica():
+            self.assertEqual(self.router.db_for_read(Order), REPLICA_ALIAS)
+        self.assertIsNone(self.router.db_for_read(Order))
+
+    def test_a_write_pins_the_rest_to_the_primary(self, configured):
+        @replica_reads
+        def report():
+            before = self.router.db_for_read(Order)
+            self.assertIsNone(self.router.db_for_write(Order))
+            return before, self.router.db_for_read(Order)
+
+        self.assertEqual(report(), (REPLICA_ALIAS, None))
+        # The next run starts on the replica again
+        self.assertEqual(report()[0], REPLICA_ALIAS)
+
+    def test_primary_is_used_without_a_replica(self, configured):
+        configured.return_value = False
+        with reading_from_replica():
+            self.assertIsNone(self.router.db_for_read(Order))
+
+    def test_replica_is_never_migrated(self, configured):
+        self.assertFalse(self.router.allow_migrate(REPLICA_ALIAS, 'orders'))
+        self.assertIsNone(self.router.allow_migrate('default', 'orders'))
+
+
+@patch('project_apps.core.db.replica_configured', return_value=True)
+class ReplicaPinMiddlewareTest(SimpleTestCase):
+    def _call(self, request, write=False):
+        routed = []
+
+        @replica_reads
+        def view(request):
+            if write:
+                ReplicaRouter().db_for_write(Order)
+            routed.append(ReplicaRouter().db_for_read(Order))
+            return HttpResponse()
+
+        response = ReplicaPinMiddleware(view)(request)
+        return routed[0], response
+
+    def test_safe_request_reads_from_the_replica(self, configured):
+        alias, response = self._call(RequestFactory().get('/'))
+        self.assertEqual(alias, REPLICA_ALIAS)
+        self.assertNotIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+    def test_writing_request_pins_the_client(self, configured):
+        alias, response = self._call(RequestFactory().get('/'), write=True)
+        self.assertIsNone(alias)
+        self.assertEqual(response.cookies[PRIMARY_PIN_COOKIE]['max-age'], 10)
+
+        request = RequestFactory().get('/')
+        request.COOKIES[PRIMARY_PIN_COOKIE] = '1'
+        self.assertIsNone(self._call(request)[0])
+
+    def test_unsafe_methods_stay_on_the_primary(self, configured):
+        self.assertIsNone(self._call(RequestFactory().post('/'))[0])
+
+
+class ReplicaViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Soups')
+        MenuItem.objects.create(category=category, name='Lentil soup', price='4.50')
+        self.routed = []
+        original = ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            alias = original(router, model, **hints)
+            self.routed.append((model, alias))
+            return alias
+
+        # The test database stands in for the replica
+        for patcher in (
+            patch.object(ReplicaRouter, 'db_for_read', record),
+            patch('project_apps.core.db.REPLICA_ALIAS', 'default'),
+            patch('project_apps.core.db.replica_configured', return_value=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_public_menu_reads_use_the_replica(self):
+        response = APIClient().get(reverse('menu_item_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn((MenuItem, 'default'), self.routed)
+
+    def test_order_list_reads_use_the_primary(self):
+        with patch('project_apps.notifications.signals.send_admin_code_email.delay'):
+            admin = User.objects.create_user(
+                username='admin', email='admin@example.com', password='testpass123', role='admin'
+            )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        self.routed.clear()
+
+        self.assertEqual(client.get(reverse('order_list')).status_code, 200)
+        self.assertEqual({alias for _, alias in self.routed}, {None})
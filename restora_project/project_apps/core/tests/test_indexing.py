@@ -0,0 +1,91 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+from elasticsearch_dsl.connections import connections
+
+from project_apps.core.indexing import clear_index_queue
+from project_apps.core.tests.eager_celery import eager_celery
+from project_apps.core.tests.fake_elasticsearch import FakeElasticsearch
+from project_apps.menu.models import Category, MenuItem
+
+
+@override_settings(ELASTICSEARCH_DSL_AUTOSYNC=True)
+class QueuedSignalProcessorTest(TestCase):
+    """
+    Saves only queue ids; documents are sent in bulk after the commit.
+    """
+
+    def setUp(self):
+        eager_celery(self)
+        clear_index_queue()
+        self.previous_client = connections.get_connection()
+        self.client = FakeElasticsearch()
+        connections.add_connection('default', self.client)
+        self.category = Category.objects.create(name='Main')
+
+    def tearDown(self):
+        connections.add_connection('default', self.previous_client)
+
+    def test_nothing_is_sent_before_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            MenuItem.objects.create(category=self.category, name='Kebab', price=Decimal('12.00'))
+        self.assertEqual(self.client.bulk_requests, [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(self.client.bulk_requests), 1)
+
+    def test_transaction_is_indexed_with_one_bulk_request(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                items = [
+                    MenuItem.objects.create(category=self.category, name=f'Dish {i}', price=Decimal('5.00'))
+                    for i in range(5)
+                ]
+                items[0].name = 'Renamed'
+                items[0].save()
+
+        self.assertEqual(len(self.client.bulk_requests), 1)
+        self.assertEqual(len(self.client.documents), 5)
+        self.assertEqual(self.client.documents[('menu_items', str(items[0].pk))]['name'], 'Renamed')
+        self.assertEqual(self.client.documents[('menu_items', str(items[1].pk))]['category'], 'Main')
+
+    def test_deleted_rows_are_removed_from_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            item = MenuItem.objects.create(category=self.category, name='Kebab', price=Decimal('12.00'))
+        pk = item.pk
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MenuItem.objects.filter(pk=pk).delete()
+
+        self.assertNotIn(('menu_items', str(pk)), self.client.documents)
+
+    @patch('project_apps.core.indexing.SEARCH_INDEX_BATCH_SIZE', 2)
+    @patch('project_apps.core.indexing.index_documents.delay')
+    def test_ids_are_split_into_batches(self, mock_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for i in range(5):
+                    MenuItem.objects.create(category=self.category, name=f'Dish {i}', price=Decimal('5.00'))
+
+        self.assertEqual(mock_delay.call_count, 3)
+        self.assertEqual(sum(len(call.args[1]) for call in mock_delay.call_args_list), 5)
+
+    @override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+    def test_autosync_disabled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            MenuItem.objects.create(category=self.category, name='Kebab', price=Decimal('12.00'))
+        self.assertEqual(self.client.bulk_requests, [])
+
+    def test_rolled_back_ids_are_not_sent(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                with transaction.atomic():
+                    MenuItem.objects.create(category=self.category, name='Kebab', price=Decimal('12.00'))
+                    transaction.set_rollback(True)
+                item = MenuItem.objects.create(category=self.category, name='Soup', price=Decimal('4.00'))
+
+        self.assertEqual(len(self.client.bulk_requests), 1)
+        self.assertEqual(list(self.client.documents), [('menu_items', str(item.pk))])
@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from unittest.mock import Mock, PropertyMock, patch
+
+from django.test import SimpleTestCase, override_settings
+
+from project_apps.core.logging import (
+    DISABLED_LOGGER,
+    BackgroundLogHandler,
+    JsonFormatter,
+    get_logger,
+    lazy,
+    lazy_attr,
+    parse_log_levels,
+)
+
+
+class BackgroundLogHandlerTest(SimpleTestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.log_dir, ignore_errors=True)
+        self.log_file = os.path.join(self.log_dir, 'app.log')
+        self.error_file = os.path.join(self.log_dir, 'error.log')
+        self.handler = BackgroundLogHandler(log_file=self.log_file, error_file=self.error_file, console=False)
+        self.addCleanup(self.handler.close)
+
+        self.logger = logging.getLogger('project_apps.tests.background')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(self.handler)
+        self.addCleanup(self.logger.removeHandler, self.handler)
+
+    def _lines(self, path):
+        with open(path, encoding='utf-8') as log:
+            return [json.loads(line) for line in log]
+
+    def test_records_are_written_as_json_by_the_writer_thread(self):
+        self.logger.info('Order created: ID %s', 7, extra={'order_id': 7})
+        self.logger.error('Payment failed')
+        self.handler.stop()
+
+        lines = self._lines(self.log_file)
+        self.assertEqual([line['message'] for line in lines], ['Order created: ID 7', 'Payment failed'])
+        self.assertEqual(lines[0]['order_id'], 7)
+        self.assertEqual(lines[0]['logger'], 'project_apps.tests.background')
+        self.assertNotEqual(lines[0]['thread'], None)
+        self.assertEqual([line['message'] for line in self._lines(self.error_file)], ['Payment failed'])
+
+    def test_file_io_happens_off_the_calling_thread(self):
+        writers = set()
+        original_emit = logging.handlers.RotatingFileHandler.emit
+
+        def record_thread(handler, record):
+            writers.add(threading.get_ident())
+            return original_emit(handler, record)
+
+        with patch('logging.handlers.RotatingFileHandler.emit', record_thread):
+            self.logger.info('List of orders returned')
+            self.handler.stop()
+
+        self.assertTrue(writers)
+        self.assertNotIn(threading.get_ident(), writers)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = BackgroundLogHandler(console=False, queue_size=1)
+        self.addCleanup(handler.close)
+        with patch.object(handler, '_ensure_listener'):
+            for _ in range(3):
+                handler.handle(logging.makeLogRecord({'msg': 'busy'}))
+        self.assertEqual(handler.dropped, 2)
+
+    def test_writer_restarts_in_forked_process(self):
+        self.logger.info('before fork')
+        first_listener = self.handler.listener
+        self.handler._listener_pid = -1  # As seen from a forked child
+
+        self.logger.info('after fork')
+        self.assertIsNot(self.handler.listener, first_listener)
+        self.handler.stop()
+        self.assertEqual(self._lines(self.log_file)[-1]['message'], 'after fork')
+        first_listener.stop()
+
+    def test_exception_is_formatted_before_queueing(self):
+        try:
+            raise ValueError('broken')
+        except ValueError:
+            self.logger.exception('Error while creating order')
+        self.handler.stop()
+
+        line = self._lines(self.error_file)[0]
+        self.assertIn('ValueError: broken', line['exception'])
+
+
+class LogConfigTest(SimpleTestCase):
+    def test_parse_log_levels(self):
+        self.assertEqual(
+            parse_log_levels('project_apps.orders=debug, django.db.backends=WARNING'),
+            {'project_apps.orders': {'level': 'DEBUG'}, 'django.db.backends': {'level': 'WARNING'}},
+        )
+        self.assertEqual(parse_log_levels(''), {})
+        with self.assertRaises(ValueError):
+            parse_log_levels('project_apps')
+
+    def test_json_formatter_keeps_unicode(self):
+        record = logging.makeLogRecord({'name': 'x', 'levelname': 'INFO', 'msg': 'Yeni sifariş'})
+        self.assertEqual(json.loads(JsonFormatter().format(record))['message'], 'Yeni sifariş')
+
+
+class LazyLoggingTest(SimpleTestCase):
+    def setUp(self):
+        self.records = []
+        handler = logging.Handler()
+        handler.emit = self.records.append
+        self.logger = get_logger('project_apps.tests.lazy')
+        self.logger.logger.propagate = False
+        self.logger.logger.addHandler(handler)
+        self.addCleanup(self.logger.logger.removeHandler, handler)
+        self.addCleanup(self.logger.logger.setLevel, logging.NOTSET)
+
+    def test_lazy_argument_is_not_computed_for_disabled_level(self):
+        self.logger.logger.setLevel(logging.INFO)
+        compute = Mock(return_value='expensive')
+
+        self.logger.debug('Value: %s', lazy(compute))
+        compute.assert_not_called()
+
+        self.logger.info('Value: %s', lazy(compute))
+        self.assertEqual(self.records[0].getMessage(), 'Value: expensive')
+
+    def test_lazy_attr_does_not_load_related_object_for_disabled_level(self):
+        self.logger.logger.setLevel(logging.INFO)
+        order = Mock()
+        user = PropertyMock(return_value=Mock(email='customer@example.com'))
+        type(order).user = user
+
+        self.logger.debug('Order owner: %s', lazy_attr(order, 'user.email'))
+        user.assert_not_called()
+
+        self.logger.info('Order owner: %s', lazy_attr(order, 'user.email'))
+        self.assertEqual(self.records[0].getMessage(), 'Order owner: customer@example.com')
+
+    def test_sampled_logger(self):
+        self.assertIs(self.logger.sampled(0), DISABLED_LOGGER)
+        self.assertIs(self.logger.sampled(1), self.logger)
+
+        with patch('project_apps.core.logging.random.random', return_value=0.05):
+            self.logger.sampled(0.1).info('List of orders returned')
+        self.assertEqual(self.records[0].sample_rate, 0.1)
+
+        with patch('project_apps.core.logging.random.random', return_value=0.5):
+            self.logger.sampled(0.1).info('List of orders returned')
+        self.assertEqual(len(self.records), 1)
+
+    @override_settings(LOG_SAMPLE_RATE=0)
+    def test_sampled_defaults_to_setting(self):
+        self.logger.sampled().info('Menu item list returned')
+        self.assertEqual(self.records, [])
+
+    def test_throttled_logger_lets_one_record_through_per_window(self):
+        self.logger.throttled('search-fallback', seconds=60).warning('Search index unavailable')
+        self.logger.throttled('search-fallback', seconds=60).warning('Search index unavailable')
+        self.logger.throttled('other', seconds=60).warning('Other event')
+
+        self.assertEqual([record.getMessage() for record in self.records],
+                         ['Search index unavailable', 'Other event'])
@@ -0,0 +1,117 @@
+import asyncio
+import re
+from decimal import Decimal
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from project_apps.accounts.models import User
+from project_apps.core.metrics import RequestMetrics, registry
+from project_apps.menu.models import Category, MenuItem
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.addCleanup(registry.reset)
+        category = Category.objects.create(name='Main', description='Main dishes')
+        MenuItem.objects.create(category=category, name='Kebab', price=Decimal('12.00'))
+        self.url = reverse('menu_item_list')
+
+    def test_server_timing_reports_queries_and_cache(self):
+        miss = self.client.get(self.url)['Server-Timing']
+        hit = self.client.get(self.url)['Server-Timing']
+
+        self.assertIn('cache;desc="0 hit, 1 miss"', miss)
+        self.assertNotIn('desc="0 queries', miss)
+        self.assertIn('cache;desc="1 hit, 0 miss"', hit)
+        self.assertIn('desc="0 queries, 0 duplicate"', hit)
+        self.assertIn('total;dur=', hit)
+
+    def test_overlapping_requests_count_only_their_own_queries(self):
+        client = AsyncClient()
+
+        async def overlapping_requests():
+            return await asyncio.gather(*(client.get(self.url) for _ in range(5)))
+
+        # async_to_sync runs the queries of all five requests on this thread's connection
+        with CaptureQueriesContext(connection) as executed:
+            responses = async_to_sync(overlapping_requests)()
+
+        reported = [int(re.search(r'desc="(\d+) queries', response['Server-Timing'])[1]) for response in responses]
+        self.assertEqual(sum(reported), len(executed))
+
+    def test_streamed_response_is_measured_until_closed(self):
+        with patch('project_apps.notifications.signals.send_admin_code_email.delay'):
+            admin = User.objects.create_user(
+                username='admin', email='admin@example.com', password='testpass123', role='admin'
+            )
+        today = timezone.localdate().isoformat()
+
+        with CaptureQueriesContext(connection) as executed:
+            response = self.client.get(
+                reverse('sales_report_export'), {'start_date': today, 'end_date': today},
+                headers={'Authorization': f'Bearer {AccessToken.for_user(admin)}'},
+            )
+            self.assertNotIn('Server-Timing', response)
+            self.assertNotIn('view="sales_report_export"', registry.render())
+            body = b''.join(response.streaming_content)
+        response.close()
+
+        labels = 'view="sales_report_export",method="GET"'
+        rendered = registry.render()
+        # The export's own queries run while the body is sent
+        self.assertIn(f'restora_db_queries_total{{{labels}}} {len(executed)}', rendered)
+        self.assertIn(f'restora_response_bytes_total{{{labels}}} {len(body)}', rendered)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint_renders_per_view_totals(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        body = response.content.decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('restora_request_duration_seconds_count{view="menu_item_list",method="GET"} 2', body)
+        self.assertIn('restora_cache_hits_total{view="menu_item_list",method="GET"} 1', body)
+        self.assertNotIn('view="metrics"', body)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=False)
+    def test_metrics_endpoint_is_hidden_without_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+    @override_settings(PERFORMANCE_BUDGETS={'default': {'queries': 100}, 'menu_item_list': {'queries': 0}})
+    def test_budget_overrun_is_logged_and_counted(self):
+        with patch('project_apps.core.metrics.logger') as logger:
+            self.client.get(self.url)
+
+        logger.throttled.return_value.warning.assert_called_once()
+        self.assertIn('restora_budget_overruns_total{view="menu_item_list",method="GET"} 1', registry.render())
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled_metrics(self):
+        self.assertNotIn('Server-Timing', self.client.get(self.url))
+
+
+class RequestMetricsTest(TestCase):
+    def test_duplicate_queries_are_detected(self):
+        metrics = RequestMetrics()
+        execute = lambda sql, params, many, context: None
+
+        metrics(execute, 'SELECT 1 WHERE id = %s', (1,), False, {})
+        metrics(execute, 'SELECT 1 WHERE id = %s', (2,), False, {})
+        metrics(execute, 'SELECT 1 WHERE id = %s', (1,), False, {})
+
+        self.assertEqual(metrics.queries, 3)
+        self.assertEqual(metrics.duplicate_queries, 1)
+        self.assertEqual(metrics.budget_overruns({'queries': 2, 'duplicate_queries': 1}), [('queries', 2, 3)])
@@ -0,0 +1,63 @@
+from datetime import date
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+
+from project_apps.accounts.models import User
+from project_apps.core.dates import date_range_q
+from project_apps.notifications.models import DiscountCode, Message, Notification
+from project_apps.orders.models import Order
+
+
+class QueryPlanTest(TestCase):
+    """
+    EXPLAIN checks that report and history queries are answered from their indexes.
+    The tables are nearly empty, so on PostgreSQL sequential scans are turned off
+    for the test, otherwise the planner would rightly prefer them.
+    """
+
+    def setUp(self):
+        self.user = User(pk=1)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_date_range_uses_the_report_index(self):
+        orders = Order.alive.filter(
+            date_range_q('created_at', date(2026, 1, 1), date(2026, 1, 31)), payment_type='cash'
+        )
+        self.assertUsesIndex(orders, 'order_created_alive_idx')
+
+    def test_customer_orders_use_the_user_index(self):
+        self.assertUsesIndex(Order.alive.filter(user=self.user).order_by('-created_at'), 'order_user_alive_idx')
+
+    def test_message_history_uses_the_sender_index(self):
+        self.assertUsesIndex(Message.alive.filter(sender=self.user)[:20], 'message_sender_alive_idx')
+
+    def test_discount_code_lookup_uses_an_index(self):
+        self.assertUsesIndex(DiscountCode.alive.filter(user=self.user, is_used=False), 'discount_code_user_alive_idx')
+
+    def test_date_range_matches_the_calendar_days(self):
+        with self.settings(TIME_ZONE='Asia/Baku'):
+            q = date_range_q('created_at', date(2026, 1, 1), date(2026, 1, 31))
+            start, end = (value for _, value in q.children)
+        self.assertEqual(start.isoformat(), '2026-01-01T00:00:00+04:00')
+        self.assertEqual(end.isoformat(), '2026-02-01T00:00:00+04:00')
+
+    # SQLite cannot use an index for the NOT "is_read" that Django emits for booleans
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL query plans')
+    def test_unread_notifications_use_the_composite_index(self):
+        notifications = Notification.alive.filter(user=self.user, is_read=False).order_by('-created_at')
+        self.assertUsesIndex(notifications, 'notification_user_alive_idx')
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL query plans')
+    def test_conversation_list_uses_both_message_indexes(self):
+        messages = Message.alive.filter(Q(sender=self.user) | Q(recipient=self.user))
+        self.assertUsesIndex(messages, 'message_sender_alive_idx')
+        self.assertUsesIndex(messages, 'message_recipient_alive_idx')
@@ -0,0 +1,65 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+
+from project_apps.accounts.models import User
+from project_apps.core.mixins import ALIVE
+from project_apps.customers.models import BonusTransaction, CustomerStats
+from project_apps.notifications.models import BonusPoints
+from project_apps.orders.models import DailySalesRollup, Order
+
+
+@patch('project_apps.customers.loyalty.send_coffee_bonus_email.delay')
+class SoftDeleteManagerTest(TestCase):
+    def setUp(self):
+        with patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            self.customer = User.objects.create_user(
+                username="customer", password="testpassword", email="customer@example.com", role="customer"
+            )
+        self.orders = [
+            Order.objects.create(user=self.customer, total_amount=Decimal('50.00')) for _ in range(3)
+        ]
+
+    def test_alive_hides_deleted_rows(self, coffee_delay):
+        self.orders[0].delete()
+
+        self.assertEqual(Order.objects.count(), 3)
+        self.assertEqual(set(Order.alive.values_list('pk', flat=True)), {o.pk for o in self.orders[1:]})
+        self.assertEqual(list(Order.objects.deleted()), [self.orders[0]])
+        # The custom queryset methods are kept on the alive manager
+        self.assertEqual(len(Order.alive.with_related()), 2)
+
+    def test_bulk_soft_delete_updates_rollups_and_ledger(self, coffee_delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted = Order.objects.filter(pk__in=[o.pk for o in self.orders[:2]]).soft_delete()
+
+        self.assertEqual(deleted, 2)
+        self.assertEqual(Order.alive.count(), 1)
+        self.assertIsNotNone(Order.objects.get(pk=self.orders[0].pk).deleted_at)
+        self.assertEqual(
+            list(DailySalesRollup.objects.exclude(order_count=0).values_list('revenue', 'order_count')),
+            [(Decimal('50.00'), 1)],
+        )
+        self.assertEqual(CustomerStats.objects.get(pk=self.customer.pk).order_count, 1)
+        self.assertEqual(BonusPoints.objects.get(user=self.customer).points, 5)
+        self.assertEqual(sum(BonusTransaction.objects.filter(user=self.customer).values_list('points', flat=True)), 5)
+
+    def test_restore_brings_the_orders_back(self, coffee_delay):
+        Order.objects.all().soft_delete()
+        # Already deleted rows are left alone
+        self.assertEqual(Order.objects.all().soft_delete(), 0)
+
+        self.assertEqual(Order.objects.deleted().restore(), 3)
+        self.assertEqual(Order.alive.count(), 3)
+        self.assertEqual(CustomerStats.objects.get(pk=self.customer.pk).order_count, 3)
+        self.assertEqual(BonusPoints.objects.get(user=self.customer).points, 15)
+
+    def test_live_row_indexes_are_partial(self, coffee_delay):
+        index = next(index for index in Order._meta.indexes if index.name == 'order_user_alive_idx')
+        self.assertEqual(index.condition, ALIVE)
+
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Order._meta.db_table)
+        self.assertEqual(constraints['order_user_alive_idx']['columns'], ['user_id', 'created_at'])
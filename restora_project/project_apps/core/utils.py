@@ -1,28 +1,67 @@
-from PIL import Image
+import hashlib
 import os
-from django.core.files.base import ContentFile
+from functools import lru_cache
+from io import BytesIO
+
+from PIL import Image, ImageOps
 from django.conf import settings
 
-def create_thumbnail(image, size=(100, 100)):
-    """Creates a thumbnail image."""
-    img = Image.open(image)  # Open the original image
-    img.thumbnail(size)  # Resize the image to the specified size
-    thumb_name = f"thumb_{os.path.basename(image.name)}"  # Name the thumbnail
-    thumb_path = os.path.join(settings.MEDIA_ROOT, 'menu-thumbnails', thumb_name)  # Define the path to save the thumbnail
-    os.makedirs(os.path.dirname(thumb_path), exist_ok=True)  # Create directories if they don't exist
-    img.save(thumb_path, 'JPEG')  # Save the thumbnail image in JPEG format
-    return os.path.join('menu-thumbnails', thumb_name)  # Return the relative path to the thumbnail
-
-def add_watermark(image):
-    """Adds a watermark to the image."""
-    img = Image.open(image)  # Open the original image
-    # Logic to add watermark (simplified)
+# Output encodings of every image variant: (extension, PIL format, save options)
+IMAGE_FORMATS = (
+    ('jpeg', 'JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+)
+
+
+def file_hash(file):
+    """Returns the SHA-256 of a Django file without loading it into memory."""
+    digest = hashlib.sha256()
+    file.open('rb')
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def load_watermark():
+    """Decodes the watermark once per process. Returns None when there is no watermark."""
     watermark_path = os.path.join(settings.MEDIA_ROOT, 'watermark.png')  # Path to watermark image
-    if os.path.exists(watermark_path):
-        watermark = Image.open(watermark_path)  # Open the watermark image
-        img.paste(watermark, (10, 10), watermark)  # Apply the watermark to the image at position (10, 10)
-    watermarked_name = f"wm_{os.path.basename(image.name)}"  # Name the watermarked image
-    watermarked_path = os.path.join(settings.MEDIA_ROOT, 'menu-images', watermarked_name)  # Path to save the watermarked image
-    os.makedirs(os.path.dirname(watermarked_path), exist_ok=True)  # Create directories if they don't exist
-    img.save(watermarked_path, 'JPEG')  # Save the image with watermark in JPEG format
-    return os.path.join('menu-images', watermarked_name)  # Return the relative path to the watermarked image
+    if not os.path.exists(watermark_path):
+        return None
+    with Image.open(watermark_path) as watermark:
+        return watermark.convert('RGBA')
+
+
+def _downscale(image, size):
+    """Shrinks by an integer factor with reduce() first, then resamples to the exact size."""
+    factor = min(image.width // size[0], image.height // size[1])
+    image = image.reduce(factor) if factor >= 2 else image.copy()
+    image.thumbnail(size, Image.LANCZOS)
+    return image
+
+
+def render_image_variants(file, sizes, watermark=True):
+    """
+    Decodes an image once and yields (size name, extension, bytes) for every size and format.
+    JPEG sources are decoded at reduced scale with draft(), so large uploads stay cheap.
+    """
+    largest = max(sizes.values(), key=lambda size: size[0] * size[1])
+    with Image.open(file) as source:
+        source.draft('RGB', largest)
+        image = ImageOps.exif_transpose(source).convert('RGB')
+
+    mark = load_watermark() if watermark else None
+
+    # Each variant is made from the previous, larger one, which stays unmarked
+    for name, size in sorted(sizes.items(), key=lambda item: item[1][0] * item[1][1], reverse=True):
+        image = _downscale(image, size)
+        variant = image
+        if mark is not None:
+            # Marked after downscaling, so the watermark keeps its size on every variant
+            variant = image.copy()
+            variant.paste(mark, (10, 10), mark)
+        for extension, image_format, options in IMAGE_FORMATS:
+            buffer = BytesIO()
+            variant.save(buffer, image_format, **options)
+            yield name, extension, buffer.getvalue()
@@ -0,0 +1,41 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from rest_framework.views import APIView
+
+
+def is_asgi_request(request):
+    """
+    True when the request is served by the ASGI handler, the event loop then
+    outlives the request. Accepts a Django or a DRF request.
+    """
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView with async read handlers, for the ASGI server.
+    An async handler runs on the event loop, so a worker serves other requests
+    while it waits on the database, Elasticsearch or a slow client. Sync
+    handlers (the writes) keep running as before, in the request's worker thread.
+    """
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        handler = getattr(self, request.method.lower(), None)
+        if not iscoroutinefunction(handler):
+            return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            # Authentication loads the user from the database
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from project_apps.customers.models import BonusTransaction
+from project_apps.customers.models import BonusTransaction, CustomerStats
 
 
 @admin.register(BonusTransaction)
@@ -15,4 +15,11 @@ class BonusTransactionAdmin(admin.ModelAdmin):
         if not obj.pk:
             obj.created_by = request.user
         obj.updated_by = request.user
-        super().save_model(request, obj, form, change)
\ No newline at end of file
+        super().save_model(request, obj, form, change)
+
+@admin.register(CustomerStats)
+class CustomerStatsAdmin(admin.ModelAdmin):
+    list_display = ('user', 'order_count', 'lifetime_spend', 'points', 'last_order_at')
+    search_fields = ('user__email',)
+    ordering = ('-lifetime_spend',)
+    readonly_fields = ('user', 'lifetime_spend', 'order_count', 'points', 'first_order_at', 'last_order_at', 'updated_at')
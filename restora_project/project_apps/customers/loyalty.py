@@ -0,0 +1,253 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from project_apps.accounts.models import User
+from project_apps.core.constants import BONUS_COFFEE_THRESHOLD, BONUS_LEDGER_BATCH_SIZE, BONUS_POINTS_PER_AZN
+from project_apps.core.models import TaskCheckpoint
+from project_apps.customers.models import BonusTransaction
+from project_apps.notifications.models import BonusPoints
+from project_apps.notifications.tasks import send_coffee_bonus_email
+from project_apps.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+CARRIED_FORWARD = "Balance carried forward"
+# Recorded once the balances kept before the ledger have been carried into it
+LEDGER_OPENED_CHECKPOINT = 'bonus_ledger_opened'
+
+
+class InsufficientPoints(Exception):
+    def __init__(self, balance, required):
+        super().__init__(f"Balance {balance} is less than {required} points")
+        self.balance = balance
+        self.required = required
+
+
+def _locked_balance(user_id):
+    """
+    Returns the customer's BonusPoints row locked for this transaction, creating it if needed.
+    """
+    balances = BonusPoints.alive.select_for_update().filter(user_id=user_id).order_by('id')
+    balance = balances.first()
+    if balance is None:
+        # BonusPoints has no unique user constraint, the user row serializes the first entry
+        list(User.objects.select_for_update().filter(pk=user_id).values_list('pk', flat=True))
+        balance = balances.first() or BonusPoints.objects.create(user_id=user_id)
+    return balance
+
+
+def _apply_to_balance(balance, points, entry_pk):
+    """
+    Moves the locked balance by points and queues a coffee bonus for every
+    threshold crossed since the last notification. Returns the new balance.
+    """
+    new_points = balance.points + points
+    last_notified = min(balance.last_notified_points, new_points)
+    bonuses = new_points // BONUS_COFFEE_THRESHOLD - last_notified // BONUS_COFFEE_THRESHOLD
+    if bonuses > 0:
+        last_notified = new_points
+        for i in range(bonuses):
+            transaction.on_commit(
+                partial(send_coffee_bonus_email.delay, balance.user_id, f"coffee-bonus:{entry_pk}:{i}")
+            )
+
+    BonusPoints.objects.filter(pk=balance.pk).update(
+        points=F('points') + points,
+        last_notified_points=last_notified,
+        updated_at=timezone.now(),
+    )
+    return new_points
+
+
+def add_points(user_id, points, description, order=None):
+    """
+    Appends a ledger entry and applies it to the balance in one transaction.
+    Negative points are allowed here (reversals); use redeem_points for spending.
+    Returns the new balance.
+    """
+    # No savepoint: a failed entry must fail the order or change it belongs to
+    with transaction.atomic(savepoint=False):
+        balance = _locked_balance(user_id)
+        entry = BonusTransaction.objects.create(user_id=user_id, points=points, description=description, order=order)
+        new_points = _apply_to_balance(balance, points, entry.pk)
+    logger.info("Bonus points added: user #%s, points: %s, balance: %s", user_id, points, new_points)
+    return new_points
+
+
+def redeem_points(user_id, points, description):
+    """
+    Spends points, raising InsufficientPoints when the balance is too low.
+    Returns the new balance.
+    """
+    with transaction.atomic():
+        balance = _locked_balance(user_id)
+        if balance.points < points:
+            raise InsufficientPoints(balance.points, points)
+        BonusTransaction.objects.create(user_id=user_id, points=-points, description=description)
+        new_points = balance.points - points
+        BonusPoints.objects.filter(pk=balance.pk).update(
+            points=F('points') - points,
+            # Earning the spent points back should notify again
+            last_notified_points=min(balance.last_notified_points, new_points),
+            updated_at=timezone.now(),
+        )
+    logger.info("Bonus points redeemed: user #%s, points: %s, balance: %s", user_id, points, new_points)
+    return new_points
+
+
+def order_points(snapshot):
+    """Points an order snapshot (see Order.sales_snapshot) is worth, 0 for deleted orders."""
+    if snapshot is None:
+        return 0
+    total_amount, is_deleted = snapshot[3], snapshot[4]
+    if is_deleted:
+        return 0
+    return int(total_amount // BONUS_POINTS_PER_AZN)
+
+
+def _order_entries(order, old_snapshot, new_snapshot):
+    """
+    Unsaved ledger entries for the difference in order points. An order moved to
+    another customer takes its points from the old customer to the new one.
+    """
+    # The customer is the last field of the snapshot
+    if old_snapshot is not None and new_snapshot is not None and old_snapshot[5] != new_snapshot[5]:
+        moves = (
+            (old_snapshot[5], -order_points(old_snapshot), f"Order #{order.pk} moved to another customer"),
+            (new_snapshot[5], order_points(new_snapshot), f"Points for order #{order.pk}"),
+        )
+        return [
+            BonusTransaction(user_id=user_id, points=points, description=description, order=order)
+            for user_id, points, description in moves
+            if points
+        ]
+    entry = _order_entry(order, old_snapshot, new_snapshot)
+    return [] if entry is None else [entry]
+
+
+def _order_entry(order, old_snapshot, new_snapshot):
+    """
+    Unsaved ledger entry for the difference in order points, None when nothing changed.
+    """
+    delta = order_points(new_snapshot) - order_points(old_snapshot)
+    if not delta:
+        return None
+    if old_snapshot is None:
+        description = f"Points for order #{order.pk}"
+    elif new_snapshot is None or new_snapshot[4]:
+        description = f"Order #{order.pk} deleted"
+    else:
+        description = f"Order #{order.pk} changed"
+    # A removed order row cannot be referenced any more
+    return BonusTransaction(
+        user_id=order.user_id, points=delta, description=description, order=None if new_snapshot is None else order
+    )
+
+
+def apply_order_change(order, old_snapshot, new_snapshot):
+    """
+    Books the difference in order points when an order is created, changed or deleted.
+    """
+    for entry in _order_entries(order, old_snapshot, new_snapshot):
+        add_points(entry.user_id, entry.points, entry.description, order=entry.order)
+
+
+def apply_order_changes(changes):
+    """
+    Bulk version of apply_order_change for (order, old_snapshot, new_snapshot) triples:
+    the ledger entries are inserted together and every balance is updated once.
+    """
+    entries = [entry for change in changes for entry in _order_entries(*change)]
+    if not entries:
+        return
+    with transaction.atomic(savepoint=False):
+        BonusTransaction.objects.bulk_create(entries, batch_size=BONUS_LEDGER_BATCH_SIZE)
+        totals = {}
+        for entry in entries:
+            points, last_pk = totals.get(entry.user_id, (0, None))
+            totals[entry.user_id] = (points + entry.points, entry.pk or last_pk)
+        # Balances are locked in user order, like concurrent bulk writers would
+        for user_id, (points, last_pk) in sorted(totals.items()):
+            if points:
+                _apply_to_balance(_locked_balance(user_id), points, last_pk)
+    logger.info("Bonus points booked in bulk: entries: %s, customers: %s", len(entries), len(totals))
+
+
+def ledger_balances(user_ids):
+    """Returns {user_id: sum of ledger entries} with one grouped query."""
+    return dict(
+        BonusTransaction.alive.filter(user_id__in=user_ids)
+        .values('user_id')
+        .annotate(total=Sum('points'))
+        .values_list('user_id', 'total')
+    )
+
+
+def ledger_opened():
+    return TaskCheckpoint.objects.filter(name=LEDGER_OPENED_CHECKPOINT).exists()
+
+
+def open_bonus_ledger():
+    """
+    Carries the balances kept before the ledger existed into it: one
+    carried-forward entry per customer for the part of the balance the ledger
+    does not explain. Until this has run, compaction never corrects a balance.
+    Returns the number of entries written.
+    """
+    user_ids = sorted(set(BonusPoints.alive.values_list('user_id', flat=True)))
+    written = 0
+    for start in range(0, len(user_ids), BONUS_LEDGER_BATCH_SIZE):
+        batch = user_ids[start:start + BONUS_LEDGER_BATCH_SIZE]
+        with transaction.atomic():
+            # Locked, so points booked meanwhile land in both the balance and the ledger
+            balances = {user_id: _locked_balance(user_id).points for user_id in batch}
+            totals = ledger_balances(batch)
+            entries = [
+                BonusTransaction(user_id=user_id, points=points - ledger, description=CARRIED_FORWARD)
+                for user_id, points in balances.items()
+                for ledger in [totals.get(user_id) or 0]
+                if points != ledger
+            ]
+            BonusTransaction.objects.bulk_create(entries)
+        written += len(entries)
+    TaskCheckpoint.objects.update_or_create(
+        name=LEDGER_OPENED_CHECKPOINT, defaults={'high_water_mark': timezone.now()}
+    )
+    logger.info("Bonus ledger opened: customers: %s, entries written: %s", len(user_ids), written)
+    return written
+
+
+def compact_user_ledger(user_id, cutoff, correct_balance=True):
+    """
+    Replaces the customer's entries older than cutoff with one carried-forward entry
+    and, with correct_balance, resets the balance to the ledger total.
+    Returns the number of removed entries.
+    """
+    with transaction.atomic():
+        balance = _locked_balance(user_id)
+        old_entries = BonusTransaction.alive.filter(user_id=user_id, created_at__lt=cutoff)
+        summary = list(old_entries.values_list('points', 'created_at'))
+        if len(summary) > 1:
+            carried = sum(points for points, _ in summary)
+            last_entry_at = max(created_at for _, created_at in summary)
+            old_entries.delete()
+            entry = BonusTransaction.objects.create(
+                user_id=user_id, points=carried, description=CARRIED_FORWARD
+            )
+            # Keeps the entry in its place in the history
+            BonusTransaction.objects.filter(pk=entry.pk).update(created_at=last_entry_at)
+        else:
+            summary = []
+
+        total = ledger_balances([user_id]).get(user_id) or 0
+        if balance.points != total:
+            logger.warning(
+                "Bonus balance differs from ledger: user #%s, balance: %s, ledger: %s, corrected: %s",
+                user_id, balance.points, total, correct_balance,
+            )
+            if correct_balance:
+                BonusPoints.objects.filter(pk=balance.pk).update(points=total, updated_at=timezone.now())
+    return len(summary)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from project_apps.customers.loyalty import open_bonus_ledger
+
+
+class Command(BaseCommand):
+    help = 'Carry bonus balances kept before the ledger into it, run once before the nightly compaction'
+
+    def handle(self, *args, **options):
+        entries = open_bonus_ledger()
+        self.stdout.write(self.style.SUCCESS(f'Bonus ledger opened: {entries} carried-forward entries'))
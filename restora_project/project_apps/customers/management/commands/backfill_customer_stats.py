@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from project_apps.customers.stats import rebuild_customer_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild CustomerStats rows from orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, action='append', dest='user_ids',
+                            help='Rebuild only this customer (repeatable), defaults to everyone')
+
+    def handle(self, *args, **options):
+        rows = rebuild_customer_stats(options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Customer stats rebuilt: {rows} rows'))
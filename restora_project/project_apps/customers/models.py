@@ -1,8 +1,8 @@
 from django.db import models
 
-from project_apps.core.mixins import TimestampMixin, SoftDeleteMixin
+from project_apps.core.mixins import TimestampMixin, SoftDeleteMixin, alive_index
 from project_apps.accounts.models import User
-from project_apps.core.logging import get_logger
+from project_apps.core.logging import get_logger, lazy_attr
 
 logging = get_logger(__name__)
 
@@ -28,8 +28,9 @@ class BonusTransaction(TimestampMixin, SoftDeleteMixin, models.Model):
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
         logging.info(
-            f"Bonus transaction: {self.user.email}, "
-            f"points: {self.points}, description: {self.description}"
+            "Bonus transaction: %s, "
+            "points: %s, description: %s",
+            lazy_attr(self, 'user.email'), self.points, self.description,
         )
 
     def __str__(self):
@@ -38,3 +39,33 @@ class BonusTransaction(TimestampMixin, SoftDeleteMixin, models.Model):
     class Meta:
         verbose_name = "bonus transaction"
         verbose_name_plural = "bonus transactions"
+        indexes = [
+            alive_index('user', 'created_at', name='bonus_tx_user_alive_idx'),
+        ]
+
+
+class CustomerStats(models.Model):
+    """
+    Lifetime order totals of a customer, kept up to date by the order signals
+    (project_apps.customers.stats) so hot paths read one row instead of the order history.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name="customer"
+    )
+    lifetime_spend = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="lifetime spend")
+    order_count = models.IntegerField(default=0, verbose_name="order count")
+    points = models.IntegerField(default=0, verbose_name="points earned from orders")
+    first_order_at = models.DateTimeField(null=True, blank=True, verbose_name="first order")
+    last_order_at = models.DateTimeField(null=True, blank=True, verbose_name="last order")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Customer #{self.user_id}: {self.order_count} orders, {self.lifetime_spend} AZN"
+
+    class Meta:
+        verbose_name = "customer stats"
+        verbose_name_plural = "customer stats"
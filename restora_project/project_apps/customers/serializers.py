@@ -9,13 +9,13 @@ from project_apps.orders.models import Order
 class BonusTransactionSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.filter(is_deleted=False, role="customer"),
+        queryset=User.alive.filter(role="customer"),
         source="user",
         write_only=True
     )
     order = OrderSerializer(read_only=True)
     order_id = serializers.PrimaryKeyRelatedField(
-        queryset=Order.objects.filter(is_deleted=False),
+        queryset=Order.alive.all(),
         source="order",
         write_only=True,
         required=False
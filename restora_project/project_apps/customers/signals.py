@@ -1,12 +1,14 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from project_apps.core.bulk import skip_in_bulk
 from project_apps.customers.models import BonusTransaction
-from project_apps.core.logging import get_logger
+from project_apps.core.logging import get_logger, lazy_attr
 
 logging = get_logger(__name__)
 
 @receiver(post_save, sender=BonusTransaction)
+@skip_in_bulk
 def log_bonus_transaction_creation(sender, instance, created, **kwargs):
     if created:
-        logging.info(f"yeni bonus emeliiyatu {instance.user.email}, xallar: {instance.points}")
\ No newline at end of file
+        logging.info("yeni bonus emeliiyatu %s, xallar: %s", lazy_attr(instance, 'user.email'), instance.points)
\ No newline at end of file
@@ -0,0 +1,138 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Floor, Greatest, Least
+from django.utils import timezone
+
+from project_apps.core.constants import BONUS_POINTS_PER_AZN
+from project_apps.customers.models import CustomerStats
+from project_apps.orders.models import Order
+from project_apps.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _contribution(snapshot):
+    """
+    Returns (created_at, spend, points) an order snapshot adds to its customer's stats,
+    or None for deleted orders.
+    """
+    if snapshot is None:
+        return None
+    created_at, _, _, total_amount, is_deleted, _ = snapshot
+    if is_deleted or created_at is None:
+        return None
+    return created_at, total_amount, int(total_amount // BONUS_POINTS_PER_AZN)
+
+
+def _live_orders(user_id):
+    return Order.alive.filter(user_id=user_id)
+
+
+def _create_from_orders(user_id):
+    # A missing row is built from the whole history, so it is right even before a backfill
+    totals = _live_orders(user_id).aggregate(
+        lifetime_spend=Sum('total_amount'),
+        order_count=Count('id'),
+        points=Sum(Floor(F('total_amount') / BONUS_POINTS_PER_AZN)),
+        first_order_at=Min('created_at'),
+        last_order_at=Max('created_at'),
+    )
+    totals['lifetime_spend'] = totals['lifetime_spend'] or 0
+    totals['points'] = int(totals['points'] or 0)
+    try:
+        with transaction.atomic():
+            CustomerStats.objects.create(user_id=user_id, **totals)
+        return True
+    except IntegrityError:
+        # Another transaction created the row first
+        return False
+
+
+def apply_order_change(old_snapshot, new_snapshot):
+    """
+    Moves an order's contribution in its customer's stats after it was created, changed or deleted.
+    The snapshots carry the customer, an order moved to another customer leaves the old one's stats.
+    """
+    if old_snapshot is not None and new_snapshot is not None and old_snapshot[5] != new_snapshot[5]:
+        _apply_to_customer(old_snapshot[5], old_snapshot, None)
+        _apply_to_customer(new_snapshot[5], None, new_snapshot)
+    elif old_snapshot is not None or new_snapshot is not None:
+        _apply_to_customer((new_snapshot or old_snapshot)[5], old_snapshot, new_snapshot)
+
+
+def _apply_to_customer(user_id, old_snapshot, new_snapshot):
+    old = _contribution(old_snapshot)
+    new = _contribution(new_snapshot)
+    if old == new:
+        return
+
+    values = {
+        'lifetime_spend': F('lifetime_spend') + (new[1] if new else 0) - (old[1] if old else 0),
+        'order_count': F('order_count') + (1 if new else 0) - (1 if old else 0),
+        'points': F('points') + (new[2] if new else 0) - (old[2] if old else 0),
+        'updated_at': timezone.now(),
+    }
+    if old is None or (new is not None and new[0] == old[0]):
+        if new is not None:
+            values['first_order_at'] = Least(Coalesce('first_order_at', Value(new[0])), Value(new[0]))
+            values['last_order_at'] = Greatest(Coalesce('last_order_at', Value(new[0])), Value(new[0]))
+    else:
+        # The removed order may have been the first or the last one
+        live = _live_orders(OuterRef('pk'))
+        values['first_order_at'] = Subquery(live.order_by('created_at').values('created_at')[:1])
+        values['last_order_at'] = Subquery(live.order_by('-created_at').values('created_at')[:1])
+
+    if CustomerStats.objects.filter(pk=user_id).update(**values):
+        return
+    if not _create_from_orders(user_id):
+        CustomerStats.objects.filter(pk=user_id).update(**values)
+
+
+def has_orders(user_id):
+    """
+    True when the customer has a live order; reads the stats row by primary key.
+    """
+    order_count = CustomerStats.objects.filter(pk=user_id).values_list('order_count', flat=True).first()
+    if order_count is None:
+        return _live_orders(user_id).exists()
+    return order_count > 0
+
+
+def rebuild_customer_stats(user_ids=None):
+    """
+    Recomputes stats rows from orders with one grouped query.
+    Returns the number of rows written.
+    """
+    orders = Order.alive.all()
+    stats = CustomerStats.objects.all()
+    if user_ids is not None:
+        orders = orders.filter(user_id__in=user_ids)
+        stats = stats.filter(user_id__in=user_ids)
+
+    rows = (
+        orders.values('user_id')
+        .annotate(
+            lifetime_spend=Sum('total_amount'),
+            order_count=Count('id'),
+            points=Sum(Floor(F('total_amount') / BONUS_POINTS_PER_AZN)),
+            first_order_at=Min('created_at'),
+            last_order_at=Max('created_at'),
+        )
+        .order_by()
+    )
+    new_stats = [
+        CustomerStats(
+            user_id=row['user_id'],
+            lifetime_spend=row['lifetime_spend'] or 0,
+            order_count=row['order_count'],
+            points=int(row['points'] or 0),
+            first_order_at=row['first_order_at'],
+            last_order_at=row['last_order_at'],
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        stats.delete()
+        CustomerStats.objects.bulk_create(new_stats, batch_size=1000)
+    logger.info("Customer stats rebuilt: rows: %s", len(new_stats))
+    return len(new_stats)
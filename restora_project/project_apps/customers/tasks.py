@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.db.models import Count
+from django.utils import timezone
+
+from project_apps.core.constants import BONUS_LEDGER_BATCH_SIZE, BONUS_LEDGER_COMPACT_AFTER_DAYS
+from project_apps.customers.loyalty import compact_user_ledger, ledger_balances, ledger_opened
+from project_apps.customers.models import BonusTransaction
+from project_apps.notifications.models import BonusPoints
+from project_apps.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@shared_task
+def compact_bonus_ledger(older_than_days=BONUS_LEDGER_COMPACT_AFTER_DAYS):
+    """
+    Collapses old bonus ledger entries into one entry per customer and
+    corrects balances that no longer match the ledger. Balances are only
+    corrected after the backfill_bonus_ledger command has carried the old ones in.
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    user_ids = set(
+        BonusTransaction.alive.filter(created_at__lt=cutoff)
+        .values('user_id')
+        .annotate(entries=Count('id'))
+        .filter(entries__gt=1)
+        .values_list('user_id', flat=True)
+    )
+
+    balances = {}
+    for user_id, points in BonusPoints.alive.order_by('id').values_list('user_id', 'points'):
+        balances.setdefault(user_id, points)
+    balance_user_ids = sorted(balances)
+    for start in range(0, len(balance_user_ids), BONUS_LEDGER_BATCH_SIZE):
+        batch = balance_user_ids[start:start + BONUS_LEDGER_BATCH_SIZE]
+        totals = ledger_balances(batch)
+        user_ids.update(user_id for user_id in batch if balances[user_id] != (totals.get(user_id) or 0))
+
+    correct_balances = ledger_opened()
+    if not correct_balances:
+        logger.warning("Bonus ledger has no opening balances yet, run backfill_bonus_ledger; balances are left as they are")
+    removed = sum(compact_user_ledger(user_id, cutoff, correct_balances) for user_id in sorted(user_ids))
+    logger.info("Bonus ledger compacted: customers: %s, entries removed: %s", len(user_ids), removed)
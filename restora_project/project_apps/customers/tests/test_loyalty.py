@@ -0,0 +1,119 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from project_apps.accounts.models import User
+from project_apps.customers import loyalty
+from project_apps.customers.models import BonusTransaction
+from project_apps.customers.tasks import compact_bonus_ledger
+from project_apps.notifications.models import BonusPoints
+from project_apps.orders.models import Order
+
+
+@patch('project_apps.customers.loyalty.send_coffee_bonus_email.delay')
+class LoyaltyServiceTest(TestCase):
+    def setUp(self):
+        with patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            self.customer = User.objects.create_user(
+                username="customer", password="testpassword", email="customer@example.com", role="customer"
+            )
+
+    def _balance(self):
+        return BonusPoints.objects.get(user=self.customer, is_deleted=False)
+
+    def _ledger(self):
+        return sum(BonusTransaction.objects.filter(user=self.customer, is_deleted=False).values_list('points', flat=True))
+
+    def test_order_lifecycle_is_booked_in_the_ledger(self, coffee_delay):
+        order = Order.objects.create(user=self.customer, total_amount=120)
+        self.assertEqual(self._balance().points, 12)
+
+        order.total_amount = 80
+        order.save()
+        self.assertEqual(self._balance().points, 8)
+
+        order.delete()
+        self.assertEqual(self._balance().points, 0)
+        self.assertEqual(self._ledger(), 0)
+        self.assertEqual(
+            list(BonusTransaction.objects.filter(order=order).order_by('id').values_list('points', flat=True)),
+            [12, -4, -8],
+        )
+
+    def test_coffee_bonus_is_sent_after_commit(self, coffee_delay):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            loyalty.add_points(self.customer.id, 11, "Manual correction")
+        self.assertEqual(len(callbacks), 2)
+        self.assertEqual(coffee_delay.call_count, 2)
+        self.assertEqual(self._balance().last_notified_points, 11)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            loyalty.add_points(self.customer.id, 3, "Manual correction")
+        self.assertEqual(coffee_delay.call_count, 2)
+
+    def test_redeem_points(self, coffee_delay):
+        loyalty.add_points(self.customer.id, 7, "Manual correction")
+
+        self.assertEqual(loyalty.redeem_points(self.customer.id, 5, "Free coffee gift"), 2)
+        with self.assertRaises(loyalty.InsufficientPoints):
+            loyalty.redeem_points(self.customer.id, 5, "Free coffee gift")
+        self.assertEqual(self._balance().points, 2)
+        self.assertEqual(self._ledger(), 2)
+
+    def test_compaction_merges_old_entries_and_fixes_drift(self, coffee_delay):
+        loyalty.open_bonus_ledger()
+        for points in (4, 6, -5, 3):
+            loyalty.add_points(self.customer.id, points, "Manual correction")
+        old = timezone.now() - timedelta(days=200)
+        BonusTransaction.objects.exclude(points=3).update(created_at=old)
+        BonusPoints.objects.filter(user=self.customer).update(points=100)
+
+        compact_bonus_ledger()
+
+        entries = list(BonusTransaction.objects.filter(user=self.customer).order_by('created_at'))
+        self.assertEqual([(entry.points, entry.description) for entry in entries],
+                         [(5, "Balance carried forward"), (3, "Manual correction")])
+        self.assertEqual(entries[0].created_at, old)
+        self.assertEqual(self._balance().points, 8)
+
+    def test_balances_from_before_the_ledger_survive_compaction(self, coffee_delay):
+        BonusPoints.objects.create(user=self.customer, points=37)
+
+        compact_bonus_ledger()
+        self.assertEqual(self._balance().points, 37)
+
+        self.assertEqual(loyalty.open_bonus_ledger(), 1)
+        loyalty.add_points(self.customer.id, 5, "Manual correction")
+        compact_bonus_ledger()
+
+        self.assertEqual(self._balance().points, 42)
+        self.assertEqual(
+            list(BonusTransaction.objects.filter(user=self.customer).order_by('id').values_list('points', 'description')),
+            [(37, "Balance carried forward"), (5, "Manual correction")],
+        )
+        # Opening again finds nothing left to carry
+        self.assertEqual(loyalty.open_bonus_ledger(), 0)
+
+
+class BonusRedeemViewTest(TestCase):
+    def setUp(self):
+        with patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            self.customer = User.objects.create_user(
+                username="customer", password="testpassword", email="customer@example.com", role="customer"
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.customer)
+
+    @patch('project_apps.customers.loyalty.send_coffee_bonus_email.delay')
+    def test_redeem_coffee(self, coffee_delay):
+        url = reverse('bonus_redeem')
+        self.assertEqual(self.client.post(url, {'action': 'coffee'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        loyalty.add_points(self.customer.id, 6, "Manual correction")
+        self.assertEqual(self.client.post(url, {'action': 'coffee'}).status_code, status.HTTP_200_OK)
+        self.assertEqual(BonusPoints.objects.get(user=self.customer).points, 1)
@@ -0,0 +1,110 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from project_apps.accounts.models import User
+from project_apps.core.bulk import bulk_signals
+from project_apps.customers.models import CustomerStats
+from project_apps.customers.stats import has_orders
+from project_apps.notifications.models import BonusPoints
+from project_apps.orders.models import DailySalesRollup, Order
+
+
+@patch('project_apps.customers.loyalty.send_coffee_bonus_email.delay')
+class CustomerStatsTest(TestCase):
+    def setUp(self):
+        with patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            self.customer = User.objects.create_user(
+                username="customer", password="testpassword", email="customer@example.com", role="customer"
+            )
+
+    def _stats(self):
+        return CustomerStats.objects.get(pk=self.customer.pk)
+
+    def test_stats_follow_order_events(self, coffee_delay):
+        first = Order.objects.create(user=self.customer, total_amount=Decimal('120.00'))
+        second = Order.objects.create(user=self.customer, total_amount=Decimal('35.50'))
+
+        stats = self._stats()
+        self.assertEqual((stats.order_count, stats.lifetime_spend, stats.points), (2, Decimal('155.50'), 15))
+        self.assertEqual(stats.first_order_at, first.created_at)
+        self.assertEqual(stats.last_order_at, second.created_at)
+
+        second.total_amount = Decimal('40.00')
+        second.save()
+        self.assertEqual(self._stats().lifetime_spend, Decimal('160.00'))
+
+        second.delete()
+        stats = self._stats()
+        self.assertEqual((stats.order_count, stats.lifetime_spend, stats.points), (1, Decimal('120.00'), 12))
+        self.assertEqual(stats.last_order_at, first.created_at)
+
+        first.delete()
+        stats = self._stats()
+        self.assertEqual(stats.order_count, 0)
+        self.assertIsNone(stats.first_order_at)
+
+    def test_order_moved_to_another_customer(self, coffee_delay):
+        with patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            other = User.objects.create_user(
+                username="other", password="testpassword", email="other@example.com", role="customer"
+            )
+        order = Order.objects.create(user=self.customer, total_amount=Decimal('120.00'))
+
+        def assert_booked_to(owner, previous):
+            stats = CustomerStats.objects.get(pk=owner.pk)
+            self.assertEqual((stats.order_count, stats.lifetime_spend, stats.points), (1, Decimal('120.00'), 12))
+            # A rebuild drops the row of a customer without orders, an update zeroes it
+            self.assertFalse(CustomerStats.objects.filter(pk=previous.pk).exclude(order_count=0, points=0).exists())
+            self.assertFalse(has_orders(previous.pk))
+            self.assertEqual(BonusPoints.objects.get(user=owner).points, 12)
+            self.assertEqual(BonusPoints.objects.get(user=previous).points, 0)
+            # The rollup is not per customer, it keeps the one order
+            self.assertEqual(DailySalesRollup.objects.get().order_count, 1)
+
+        order.user = other
+        order.save()
+        assert_booked_to(other, self.customer)
+
+        # The batched signals move it back the same way
+        order = Order.objects.get(pk=order.pk)
+        with bulk_signals():
+            order.user = self.customer
+            order.save()
+        assert_booked_to(self.customer, other)
+
+    def test_missing_row_is_built_from_history(self, coffee_delay):
+        Order.objects.bulk_create([Order(user=self.customer, total_amount=Decimal('20.00'))])
+        self.assertFalse(CustomerStats.objects.exists())
+
+        Order.objects.create(user=self.customer, total_amount=Decimal('30.00'))
+        stats = self._stats()
+        self.assertEqual((stats.order_count, stats.lifetime_spend), (2, Decimal('50.00')))
+
+    def test_has_orders_reads_one_row(self, coffee_delay):
+        with self.assertNumQueries(2):
+            # No stats row yet, falls back to the order table
+            self.assertFalse(has_orders(self.customer.pk))
+        Order.objects.create(user=self.customer, total_amount=Decimal('20.00'))
+        with self.assertNumQueries(1):
+            self.assertTrue(has_orders(self.customer.pk))
+
+    def test_backfill(self, coffee_delay):
+        old = timezone.now() - timedelta(days=30)
+        Order.objects.bulk_create([
+            Order(user=self.customer, total_amount=Decimal('20.00')),
+            Order(user=self.customer, total_amount=Decimal('15.00'), is_deleted=True),
+        ])
+        Order.objects.filter(total_amount=Decimal('20.00')).update(created_at=old)
+        CustomerStats.objects.create(user=self.customer, order_count=99)
+
+        call_command('backfill_customer_stats', stdout=StringIO())
+
+        stats = self._stats()
+        self.assertEqual((stats.order_count, stats.lifetime_spend, stats.points), (1, Decimal('20.00'), 2))
+        self.assertEqual(stats.first_order_at, old)
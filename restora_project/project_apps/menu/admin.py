@@ -30,4 +30,4 @@ class MenuItemAdmin(admin.ModelAdmin):
         if not obj.pk:
             obj.created_by = request.user
         obj.updated_by = request.user
-        super().saveGeomarketing(request, obj, form, change)
\ No newline at end of file
+        super().save_model(request, obj, form, change)
\ No newline at end of file
@@ -0,0 +1,87 @@
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+from project_apps.core.logging import get_logger
+from project_apps.core.metrics import record_cache_access
+
+logger = get_logger(__name__)
+
+MENU_VERSION_KEY = 'menu:version'
+
+
+def get_menu_version():
+    """
+    Returns the menu version, the epoch second of the last menu change.
+    A lost version key starts a new version, so no stale entry is reused.
+    """
+    version = cache.get(MENU_VERSION_KEY)
+    if version is None:
+        cache.add(MENU_VERSION_KEY, int(time.time()), timeout=None)
+        version = cache.get(MENU_VERSION_KEY)
+    return version
+
+
+def bump_menu_version():
+    # Strictly increasing, so Last-Modified changes even for two edits in one second
+    version = max(int(time.time()), (cache.get(MENU_VERSION_KEY) or 0) + 1)
+    cache.set(MENU_VERSION_KEY, version, timeout=None)
+    logger.debug("Menu cache version bumped: %s", version)
+    return version
+
+
+def schedule_menu_version_bump():
+    # Bumping before commit would let a concurrent read cache the old rows under the new version
+    transaction.on_commit(bump_menu_version)
+
+
+def _menu_cache_lookup(request):
+    """
+    Returns the cache key and validators of a menu GET, with a 304 response,
+    the cached data or None.
+    """
+    version = get_menu_version()
+    request_key = hashlib.md5(request.build_absolute_uri().encode('utf-8')).hexdigest()
+    etag = f'"{version}-{request_key}"'
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=version)
+    if not_modified is not None:
+        return None, etag, version, not_modified
+
+    cache_key = f'menu:{version}:{request_key}'
+    data = cache.get(cache_key)
+    record_cache_access(hit=data is not None)
+    return cache_key, etag, version, data
+
+
+async def cached_menu_response(request, build_data):
+    """
+    Serves a public menu GET from the cache with ETag and Last-Modified.
+    build_data() is awaited on a cache miss and must return the response data,
+    or a Response to be sent as is (it is not cached).
+    """
+    # One trip to the worker thread for the version and the entry
+    cache_key, etag, version, data = await sync_to_async(_menu_cache_lookup)(request)
+    if isinstance(data, HttpResponseBase):
+        return data
+    if data is None:
+        data = await build_data()
+        if isinstance(data, Response):
+            return data
+        await cache.aset(cache_key, data, timeout=settings.MENU_CACHE_TIMEOUT)
+
+    response = Response(data, status=status.HTTP_200_OK)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(version)
+    # Clients must revalidate, the ETag makes that a cheap 304
+    patch_cache_control(response, public=True, max_age=0)
+    return response
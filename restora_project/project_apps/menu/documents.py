@@ -8,9 +8,14 @@ class MenuItemDocument(Document):
     name = fields.TextField(analyzer='standard')
     description = fields.TextField(analyzer='standard')
     category = fields.TextField(attr='category.name')
+    category_id = fields.IntegerField()
     price = fields.FloatField()
     discount_percentage = fields.IntegerField()
     is_available = fields.BooleanField()
+    is_deleted = fields.BooleanField()
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('category')
 
     class Index:
         name = 'menu_items'
@@ -18,4 +23,4 @@ class MenuItemDocument(Document):
 
     class Django:
         model = MenuItem
-        fields = []
\ No newline at end of file
+        fields = []
@@ -1,14 +1,22 @@
 import os
+from django.contrib.postgres.search import SearchVector
 from django.db import models
 from django.conf import settings
 
-from project_apps.core.mixins import TimestampMixin, SoftDeleteMixin
-from project_apps.core.utils import add_watermark, create_thumbnail
+from project_apps.core.indexes import PostgresGinIndex
+from project_apps.core.mixins import TimestampMixin, SoftDeleteMixin, SoftDeleteQuerySet, AliveManager, alive_index
 from project_apps.core.constants import DISCOUNT_PERCENTAGES
 from project_apps.core.logging import get_logger
 
 logging = get_logger(__name__)
 
+# Full-text vector of a menu item; the GIN index and the search fallback must use the same expression
+MENU_ITEM_SEARCH_CONFIG = 'simple'
+MENU_ITEM_SEARCH_VECTOR = (
+    SearchVector('name', weight='A', config=MENU_ITEM_SEARCH_CONFIG)
+    + SearchVector('description', weight='B', config=MENU_ITEM_SEARCH_CONFIG)
+)
+
 # Category model to represent categories of menu items (e.g., "Starters", "Main Course", etc.)
 class Category(TimestampMixin, SoftDeleteMixin, models.Model):
     name = models.CharField(max_length=100, unique=True)  # Unique name for the category
@@ -19,13 +27,21 @@ class Category(TimestampMixin, SoftDeleteMixin, models.Model):
     
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        logging.info(f"Category created/updated: {self.name}")
+        logging.info("Category created/updated: %s", self.name)
 
     class Meta:
         verbose_name = "Category"
         verbose_name_plural = "Categories"
+        indexes = [
+            alive_index('name', name='category_name_alive_idx'),
+        ]
     
 
+class MenuItemQuerySet(SoftDeleteQuerySet):
+    def with_related(self):
+        return self.select_related('category')
+
+
 # MenuItem model represents items on the menu, like a specific dish or drink.
 class MenuItem(TimestampMixin, SoftDeleteMixin, models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='items')  # The category to which the item belongs
@@ -34,18 +50,34 @@ class MenuItem(TimestampMixin, SoftDeleteMixin, models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)  # Price of the item
     image = models.ImageField(upload_to='menu-images/', blank=True, null=True)  # Optional image for the item
     thumbnail = models.ImageField(upload_to='menu-thumbnails/', blank=True, null=True, editable=False, verbose_name="Thumbnail")  # Thumbnail for the item
+    image_hash = models.CharField(max_length=64, blank=True, editable=False)  # SHA-256 of the image the variants were made from
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)  # Resized JPEG/WebP paths by size name
     is_available = models.BooleanField(default=True)  # Whether the item is available on the menu
     discount_percentage = models.PositiveIntegerField(default=0, choices=DISCOUNT_PERCENTAGES)  # Discount percentage applicable to the item
 
+    objects = MenuItemQuerySet.as_manager()
+    alive = AliveManager.from_queryset(MenuItemQuerySet)()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the image pipeline tell a new upload from a plain save
+        instance._loaded_image_name = instance.image.name if 'image' in instance.__dict__ else None
+        return instance
+
     def __str__(self):
         return f"{self.name} ({self.category.name})"
     
     # Method to calculate the price after applying the discount (if any)
     def get_discounted_price(self):
         if self.discount_percentage > 0:
-            return self.price * (1 - self.discount_percentage / 100)
+            return self.price * (100 - self.discount_percentage) / 100
         return self.price
     
     class Meta:
         verbose_name = "Menu Item"
         verbose_name_plural = "Menu Items"
+        indexes = [
+            PostgresGinIndex(MENU_ITEM_SEARCH_VECTOR, name='menu_item_search_idx'),
+            alive_index('category', 'is_available', name='menu_item_category_alive_idx'),
+        ]
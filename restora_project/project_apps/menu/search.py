@@ -0,0 +1,122 @@
+import asyncio
+from contextlib import asynccontextmanager
+from weakref import WeakKeyDictionary
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from elasticsearch import ApiError, AsyncElasticsearch, TransportError
+from elasticsearch_dsl import AsyncSearch
+
+from project_apps.core.constants import MENU_SEARCH_FALLBACK_SECONDS
+from project_apps.menu.documents import MenuItemDocument
+from project_apps.menu.models import MENU_ITEM_SEARCH_CONFIG, MENU_ITEM_SEARCH_VECTOR, MenuItem
+from project_apps.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+SEARCH_UNAVAILABLE_KEY = 'menu:search:es_unavailable'
+
+# An async client's connections belong to the event loop that opened them
+_search_clients = WeakKeyDictionary()
+
+
+@asynccontextmanager
+async def search_client(shared):
+    """
+    An async Elasticsearch client for one search. The ASGI server runs one
+    loop per worker, so a shared client and its connections are kept for the
+    loop and reused across requests. Under WSGI the loop ends with the request,
+    so the client is opened for the search and closed right after it.
+    """
+    if not shared:
+        async with AsyncElasticsearch(**settings.ELASTICSEARCH_DSL['default']) as client:
+            yield client
+        return
+    loop = asyncio.get_running_loop()
+    client = _search_clients.get(loop)
+    if client is None:
+        client = _search_clients[loop] = AsyncElasticsearch(**settings.ELASTICSEARCH_DSL['default'])
+    yield client
+
+
+async def _search_index(params, limit, client):
+    """
+    Returns the ids of matching menu items from Elasticsearch, best match first.
+    """
+    search = AsyncSearch(using=client, index=MenuItemDocument._index._name)
+    search = search.filter('term', is_deleted=False)
+    if params.get('q'):
+        search = search.query(
+            'multi_match',
+            query=params['q'],
+            fields=['name^3', 'category^2', 'description'],
+            fuzziness='AUTO',
+        )
+    if params.get('category'):
+        search = search.filter('term', category_id=params['category'])
+    if params.get('is_available') is not None:
+        search = search.filter('term', is_available=params['is_available'])
+    price_range = {}
+    if params.get('min_price') is not None:
+        price_range['gte'] = float(params['min_price'])
+    if params.get('max_price') is not None:
+        price_range['lte'] = float(params['max_price'])
+    if price_range:
+        search = search.filter('range', price=price_range)
+    if params.get('min_discount'):
+        search = search.filter('range', discount_percentage={'gte': params['min_discount']})
+
+    response = await search.sort('_score', 'price').source(False).extra(size=limit).execute()
+    return [int(hit.meta.id) for hit in response]
+
+
+async def _search_database(params, limit):
+    items = MenuItem.alive.with_related()
+    if params.get('category'):
+        items = items.filter(category_id=params['category'])
+    if params.get('is_available') is not None:
+        items = items.filter(is_available=params['is_available'])
+    if params.get('min_price') is not None:
+        items = items.filter(price__gte=params['min_price'])
+    if params.get('max_price') is not None:
+        items = items.filter(price__lte=params['max_price'])
+    if params.get('min_discount'):
+        items = items.filter(discount_percentage__gte=params['min_discount'])
+
+    query = params.get('q')
+    if not query:
+        return [item async for item in items.order_by('price', 'id')[:limit]]
+    if connection.vendor == 'postgresql':
+        # Matches the GIN index expression on MenuItem, so the filter is an index scan
+        search_query = SearchQuery(query, config=MENU_ITEM_SEARCH_CONFIG, search_type='websearch')
+        items = items.annotate(
+            search=MENU_ITEM_SEARCH_VECTOR,
+            rank=SearchRank(MENU_ITEM_SEARCH_VECTOR, search_query),
+        ).filter(search=search_query).order_by('-rank', 'price')
+    else:
+        items = items.filter(
+            Q(name__icontains=query) | Q(description__icontains=query) | Q(category__name__icontains=query)
+        ).order_by('price', 'id')
+    return [item async for item in items[:limit]]
+
+
+async def search_menu_items(params, limit, shared_client=False):
+    """
+    Searches the menu in Elasticsearch and falls back to the database while it is unavailable.
+    Returns the matching items and the name of the backend that answered.
+    Pass shared_client only from a long-lived event loop, as under ASGI.
+    """
+    if not await cache.aget(SEARCH_UNAVAILABLE_KEY):
+        try:
+            async with search_client(shared_client) as client:
+                ids = await _search_index(params, limit, client)
+        except (ApiError, TransportError) as e:
+            await cache.aset(SEARCH_UNAVAILABLE_KEY, True, timeout=MENU_SEARCH_FALLBACK_SECONDS)
+            logger.throttled("es_unavailable").warning("Elasticsearch menu search failed, using database fallback: %s", e)
+        else:
+            items = await MenuItem.alive.with_related().ain_bulk(ids)
+            return [items[pk] for pk in ids if pk in items], 'elasticsearch'
+    return await _search_database(params, limit), 'database'
@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 
 from .models import *
@@ -37,7 +39,7 @@ class MenuItemSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     # Allow setting the category via its ID, while not exposing it as a read-only field
     category_id = serializers.PrimaryKeyRelatedField(
-        queryset=Category.objects.filter(is_deleted=False),
+        queryset=Category.alive.all(),
         source="category",
         write_only=True
     )
@@ -52,6 +54,7 @@ class MenuItemSerializer(serializers.ModelSerializer):
     # Yeni təhlükəsiz sahələr
     image_url = serializers.SerializerMethodField()
     thumbnail_url = serializers.SerializerMethodField() 
+    image_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = MenuItem
@@ -63,7 +66,10 @@ class MenuItemSerializer(serializers.ModelSerializer):
             "description",
             "price",
             "image",
+            "image_url",
             "thumbnail",
+            "thumbnail_url",
+            "image_variants",
             "is_available",
             "discount_percentage",
             "discounted_price",
@@ -72,6 +78,29 @@ class MenuItemSerializer(serializers.ModelSerializer):
             "is_deleted"
         ]
 
+    def get_image_url(self, obj):
+        return self._build_file_url(obj.image)
+
+    def get_thumbnail_url(self, obj):
+        return self._build_file_url(obj.thumbnail)
+
+    # Resized JPEG and WebP URLs by size name
+    def get_image_variants(self, obj):
+        return {
+            name: {extension: self._build_url(default_storage.url(path)) for extension, path in formats.items()}
+            for name, formats in (obj.image_variants or {}).items()
+        }
+
+    # Missing files return None instead of raising ValueError
+    def _build_file_url(self, file):
+        if not file:
+            return None
+        return self._build_url(file.url)
+
+    def _build_url(self, url):
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
     # Custom validation for the 'price' field
     def validate_price(self, value):
         if value <= 0:
@@ -84,3 +113,23 @@ class MenuItemSerializer(serializers.ModelSerializer):
         if value not in valid_discounts:
             raise serializers.ValidationError("Invalid discount percentage")
         return value
+
+
+# Query parameters of the menu search endpoint
+class MenuSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(required=False, allow_blank=True, max_length=200)
+    category = serializers.IntegerField(required=False, min_value=1)
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, min_value=0)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, min_value=0)
+    is_available = serializers.BooleanField(required=False, allow_null=True, default=None)
+    min_discount = serializers.IntegerField(required=False, min_value=0, max_value=100)
+    page_size = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_page_size(self, value):
+        return min(value, settings.API_MAX_PAGE_SIZE)
+
+    def validate(self, data):
+        min_price, max_price = data.get('min_price'), data.get('max_price')
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise serializers.ValidationError("Minimum price cannot be greater than maximum price")
+        return data
@@ -1,17 +1,50 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import  receiver
 
+from project_apps.core.bulk import defer_to_batch, register_batch_hook, skip_in_bulk
 from project_apps.menu.models import Category, MenuItem
+from project_apps.menu.cache import schedule_menu_version_bump
+from project_apps.menu.tasks import process_menu_item_image
 from project_apps.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 @receiver(post_save, sender=Category)
+@skip_in_bulk
 def log_category_creation(sender, instance, created, **kwargs):
     if created:
-        logger.info(f"yeni categroy yadarildi {instance.name}")
+        logger.info("yeni categroy yadarildi %s", instance.name)
 
 @receiver(post_save, sender=MenuItem)
+@skip_in_bulk
 def log_menu_item_creation(sender, instance, created, **kwargs):
     if created:
-        logger.info(f"yeni menu mehsulu yadarildi {instance.name}")
+        logger.info("yeni menu mehsulu yadarildi %s", instance.name)
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=MenuItem)
+def invalidate_menu_cache(sender, instance, **kwargs):
+    # Soft deletes are saves, so they are covered by post_save
+    if not defer_to_batch(instance):
+        schedule_menu_version_bump()
+
+@receiver(post_save, sender=MenuItem)
+def schedule_image_processing(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    image_name = instance.image.name if instance.image else None
+    if image_name and image_name != getattr(instance, '_loaded_image_name', None):
+        item_id = instance.pk
+        transaction.on_commit(lambda: process_menu_item_image.delay(item_id))
+    elif not image_name and (instance.thumbnail or instance.image_variants):
+        # The image was removed, drop the variants made from it
+        MenuItem.objects.filter(pk=instance.pk).update(thumbnail=None, image_hash='', image_variants={})
+    instance._loaded_image_name = image_name
+
+@register_batch_hook(Category)
+@register_batch_hook(MenuItem)
+def replay_menu_changes(rows):
+    schedule_menu_version_bump()
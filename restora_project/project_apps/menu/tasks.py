@@ -0,0 +1,58 @@
+from celery import shared_task
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image
+
+from project_apps.core.constants import MENU_IMAGE_SIZES
+from project_apps.core.utils import file_hash, render_image_variants
+from project_apps.menu.cache import schedule_menu_version_bump
+from project_apps.menu.models import MenuItem
+from project_apps.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def variant_path(image_hash, name, extension):
+    # Named by content, so an unchanged image maps to files that already exist
+    return f"menu-images/variants/{image_hash[:16]}/{name}.{extension}"
+
+
+@shared_task
+def process_menu_item_image(item_id):
+    """
+    Builds the thumbnail and the resized JPEG/WebP variants of a menu item image.
+    """
+    item = MenuItem.objects.filter(pk=item_id).only('id', 'image', 'image_hash', 'image_variants').first()
+    if not item or not item.image:
+        return
+    image_name = item.image.name
+
+    try:
+        image_hash = file_hash(item.image)
+        if image_hash == item.image_hash and item.image_variants:
+            logger.info("Menu item image unchanged, skipped: ID %s", item_id)
+            return
+
+        variants = {}
+        for name, extension, content in render_image_variants(item.image, MENU_IMAGE_SIZES):
+            path = variant_path(image_hash, name, extension)
+            if not default_storage.exists(path):
+                path = default_storage.save(path, ContentFile(content))
+            variants.setdefault(name, {})[extension] = path
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.error("Menu item image could not be processed: ID %s, error: %s", item_id, e)
+        return
+    finally:
+        item.image.close()
+
+    # Skipped when the image was replaced meanwhile, the newer upload has its own task
+    updated = MenuItem.objects.filter(pk=item_id, image=image_name).update(
+        thumbnail=variants['thumbnail']['jpeg'],
+        image_hash=image_hash,
+        image_variants=variants,
+        updated_at=timezone.now(),
+    )
+    if updated:
+        schedule_menu_version_bump()
+        logger.info("Menu item image processed: ID %s, variants: %s", item_id, len(variants))
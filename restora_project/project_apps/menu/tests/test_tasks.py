@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from project_apps.core.tests.eager_celery import eager_celery
+from project_apps.core.utils import load_watermark
+from project_apps.menu.models import Category, MenuItem
+from project_apps.menu.tasks import process_menu_item_image
+
+
+def make_jpeg(name='dish.jpg', size=(2000, 1500), color='orange'):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class MenuItemImagePipelineTest(TestCase):
+    def setUp(self):
+        eager_celery(self)
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        load_watermark.cache_clear()
+        self.addCleanup(load_watermark.cache_clear)
+        self.category = Category.objects.create(name='Grill')
+
+    def _create_item(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            item = MenuItem.objects.create(
+                category=self.category, name='Kebab', price=Decimal('12.00'), image=image
+            )
+        item.refresh_from_db()
+        return item
+
+    def test_upload_builds_sizes_and_webp(self):
+        item = self._create_item(make_jpeg())
+
+        self.assertEqual(len(item.image_hash), 64)
+        self.assertEqual(set(item.image_variants), {'thumbnail', 'small', 'medium'})
+        self.assertEqual(item.thumbnail.name, item.image_variants['thumbnail']['jpeg'])
+        with Image.open(os.path.join(self.media_root, item.image_variants['medium']['webp'])) as medium:
+            self.assertEqual(medium.format, 'WEBP')
+            self.assertEqual(medium.size, (800, 600))
+        with Image.open(item.thumbnail.path) as thumbnail:
+            self.assertEqual(thumbnail.size, (100, 75))
+
+    def test_unchanged_image_is_skipped(self):
+        item = self._create_item(make_jpeg())
+
+        with patch('project_apps.menu.tasks.render_image_variants') as mock_render:
+            process_menu_item_image(item.id)
+        mock_render.assert_not_called()
+
+    def test_plain_save_does_not_reprocess(self):
+        item = self._create_item(make_jpeg())
+
+        with patch('project_apps.menu.signals.process_menu_item_image.delay') as mock_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                item.price = Decimal('13.00')
+                item.save()
+        mock_delay.assert_not_called()
+
+    def test_watermark_is_decoded_once(self):
+        Image.new('RGBA', (20, 20), (255, 255, 255, 128)).save(os.path.join(self.media_root, 'watermark.png'))
+
+        with patch('project_apps.core.utils.Image.open', wraps=Image.open) as mock_open:
+            self._create_item(make_jpeg('first.jpg'))
+            self._create_item(make_jpeg('second.jpg', color='green'))
+
+        watermark_opens = [call for call in mock_open.call_args_list if str(call.args[0]).endswith('watermark.png')]
+        self.assertEqual(len(watermark_opens), 1)
+
+    def test_watermark_keeps_its_size_on_every_variant(self):
+        Image.new('RGBA', (20, 20), (0, 0, 255, 255)).save(os.path.join(self.media_root, 'watermark.png'))
+
+        item = self._create_item(make_jpeg())
+
+        for name in ('thumbnail', 'medium'):
+            with Image.open(os.path.join(self.media_root, item.image_variants[name]['jpeg'])) as variant:
+                red, green, blue = variant.convert('RGB').getpixel((20, 20))
+                self.assertGreater(blue, 200, name)
+                self.assertLess(red, 60, name)
+
+    def test_removed_image_clears_variants(self):
+        item = self._create_item(make_jpeg())
+
+        item.image = None
+        item.save()
+        item.refresh_from_db()
+
+        self.assertFalse(item.thumbnail)
+        self.assertEqual(item.image_variants, {})
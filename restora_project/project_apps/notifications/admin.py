@@ -4,7 +4,9 @@ from .models import (Notification,
                      DiscountCode,
                      BonusPoints,
                      AdminCode,
-                     Message)
+                     Message,
+                     EmailOutbox,
+                     Broadcast)
 
 
 @admin.register(Notification)
@@ -94,3 +96,21 @@ class MessageAdmin(admin.ModelAdmin):
     list_filter = ('is_read', 'is_deleted')
     readonly_fields = ('created_at', 'updated_at')
 
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'idempotency_key', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+    search_fields = ('idempotency_key', 'subject', 'recipients')
+    list_filter = ('status', 'created_at')
+    ordering = ('-created_at',)
+    readonly_fields = ('idempotency_key', 'attempts', 'sent_at', 'last_error', 'created_at', 'updated_at')
+
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = ('title', 'status', 'total_recipients', 'notifications_created', 'emails_queued', 'created_at')
+    search_fields = ('title', 'message')
+    list_filter = ('status', 'created_at')
+    ordering = ('-created_at',)
+    readonly_fields = ('status', 'total_recipients', 'notifications_created', 'emails_queued', 'last_user_id',
+                       'started_at', 'finished_at', 'last_error', 'created_at', 'updated_at')
@@ -11,6 +11,9 @@ class NotificationDocument(Document):
     is_read = fields.BooleanField()
     sent_at = fields.DateField()
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('user')
+
     class Index:
         name = 'notifications'
         settings = {
@@ -20,4 +23,4 @@ class NotificationDocument(Document):
 
     class Django:
         model = Notification
-        fields = []
\ No newline at end of file
+        fields = []
@@ -5,17 +5,49 @@ class Command(BaseCommand):
     help = 'Setup periodic tasks for Celery Beat'
 
     def handle(self, *args, **options):
-        schedule, _ = CrontabSchedule.objects.get_or_create(
-            minute='*/1',
-            hour='*',  # Hər saat başı
+        # Balances are kept by the bonus ledger, the per-minute recompute is no longer scheduled
+        PeriodicTask.objects.filter(
+            name__in=['Check customer points accuracy', 'Full customer points reconciliation']
+        ).delete()
+
+        hourly, _ = CrontabSchedule.objects.get_or_create(
+            minute='0',
+            hour='*',
             day_of_week='*',
             day_of_month='*',
             month_of_year='*',
             timezone='Asia/Baku'
         )
         PeriodicTask.objects.get_or_create(
-            crontab=schedule,
-            name='Check customer points accuracy',
+            crontab=hourly,
+            name='Send missed coffee bonuses',
             task='project_apps.notifications.tasks.check_customer_points',
         )
+        nightly, _ = CrontabSchedule.objects.get_or_create(
+            minute='0',
+            hour='4',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+            timezone='Asia/Baku'
+        )
+        PeriodicTask.objects.get_or_create(
+            crontab=nightly,
+            name='Compact bonus ledger',
+            task='project_apps.customers.tasks.compact_bonus_ledger',
+        )
+        every_minute, _ = CrontabSchedule.objects.get_or_create(
+            minute='*',
+            hour='*',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+            timezone='Asia/Baku'
+        )
+        # Queued emails schedule their own drain, this picks up retries and missed runs
+        PeriodicTask.objects.get_or_create(
+            crontab=every_minute,
+            name='Drain email outbox',
+            task='project_apps.notifications.tasks.drain_email_outbox',
+        )
         self.stdout.write(self.style.SUCCESS('Periodic tasks setup successfully'))
\ No newline at end of file
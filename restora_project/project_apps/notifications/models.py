@@ -1,9 +1,10 @@
 import uuid
 from django.db import models
+from django.utils import timezone
 
-from project_apps.core.mixins import TimestampMixin, SoftDeleteMixin
+from project_apps.core.mixins import TimestampMixin, SoftDeleteMixin, alive_index
 from project_apps.accounts.models import User
-from project_apps.core.logging import get_logger
+from project_apps.core.logging import get_logger, lazy_attr
 
 logging = get_logger(__name__)
 
@@ -24,7 +25,7 @@ class Notification(TimestampMixin, SoftDeleteMixin, models.Model):
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        logging.info(f"Notification created: {self.user.email}, title: {self.title}")
+        logging.info("Notification created: %s, title: %s", lazy_attr(self, 'user.email'), self.title)
 
     def __str__(self):
         return f"{self.title} ({self.user.email})"
@@ -32,6 +33,9 @@ class Notification(TimestampMixin, SoftDeleteMixin, models.Model):
     class Meta:
         verbose_name = "notification"
         verbose_name_plural = "notifications"
+        indexes = [
+            alive_index('user', 'is_read', 'created_at', name='notification_user_alive_idx'),
+        ]
 
 
 class DiscountCode(TimestampMixin, SoftDeleteMixin, models.Model):
@@ -61,6 +65,9 @@ class DiscountCode(TimestampMixin, SoftDeleteMixin, models.Model):
     class Meta:
         verbose_name = "discount code"
         verbose_name_plural = "discount codes"
+        indexes = [
+            alive_index('user', 'is_used', name='discount_code_user_alive_idx'),
+        ]
 
 
 class BonusPoints(TimestampMixin, SoftDeleteMixin, models.Model):
@@ -79,6 +86,9 @@ class BonusPoints(TimestampMixin, SoftDeleteMixin, models.Model):
     class Meta:
         verbose_name = "bonus point"
         verbose_name_plural = "bonus points"
+        indexes = [
+            alive_index('user', name='bonus_points_user_alive_idx'),
+        ]
 
 
 class AdminCode(TimestampMixin, SoftDeleteMixin, models.Model):
@@ -104,6 +114,9 @@ class AdminCode(TimestampMixin, SoftDeleteMixin, models.Model):
     class Meta:
         verbose_name = "admin code"
         verbose_name_plural = "admin codes"
+        indexes = [
+            alive_index('user', name='admin_code_user_alive_idx'),
+        ]
 
 
 class Message(TimestampMixin, SoftDeleteMixin, models.Model):
@@ -136,3 +149,88 @@ class Message(TimestampMixin, SoftDeleteMixin, models.Model):
         verbose_name = "message"
         verbose_name_plural = "messages"
         ordering = ['-created_at']
+        indexes = [
+            # sender OR recipient is answered from both, newest first
+            alive_index('sender', 'created_at', name='message_sender_alive_idx'),
+            alive_index('recipient', 'created_at', name='message_recipient_alive_idx'),
+        ]
+
+
+class EmailOutbox(TimestampMixin, models.Model):
+    """
+    Email waiting to be sent by the drain_email_outbox task (see notifications/outbox.py).
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    # The same key is queued only once, so retried tasks do not send twice
+    idempotency_key = models.CharField(max_length=200, unique=True, verbose_name="idempotency key")
+    subject = models.CharField(max_length=255, verbose_name="subject")
+    body = models.TextField(verbose_name="body")
+    from_email = models.CharField(max_length=255, blank=True, null=True, verbose_name="from")
+    recipients = models.JSONField(default=list, verbose_name="recipients")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="status")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="attempts")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="next attempt")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="sent at")
+    last_error = models.TextField(blank=True, default='', verbose_name="last error")
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+    class Meta:
+        verbose_name = "outgoing email"
+        verbose_name_plural = "outgoing emails"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+
+class Broadcast(TimestampMixin, models.Model):
+    """
+    Promotional notification sent to every active customer by the send_broadcast task.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+
+    title = models.CharField(max_length=200, verbose_name="title")
+    message = models.TextField(verbose_name="message")
+    send_email = models.BooleanField(default=True, verbose_name="send email")
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='broadcasts',
+        verbose_name="created by"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="status")
+    total_recipients = models.PositiveIntegerField(default=0, verbose_name="total recipients")
+    notifications_created = models.PositiveIntegerField(default=0, verbose_name="notifications created")
+    emails_queued = models.PositiveIntegerField(default=0, verbose_name="emails queued")
+    # Last customer id handled, a restarted task continues after it
+    last_user_id = models.PositiveBigIntegerField(default=0, verbose_name="last customer id")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="started at")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="finished at")
+    last_error = models.TextField(blank=True, default='', verbose_name="last error")
+
+    @property
+    def progress(self):
+        if not self.total_recipients:
+            return 100 if self.status == 'completed' else 0
+        return min(100, round(self.notifications_created * 100 / self.total_recipients))
+
+    def __str__(self):
+        return f"{self.title} ({self.status})"
+
+    class Meta:
+        verbose_name = "broadcast"
+        verbose_name_plural = "broadcasts"
+        ordering = ['-created_at']
@@ -0,0 +1,141 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from project_apps.core.constants import (
+    EMAIL_OUTBOX_BATCH_SIZE,
+    EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS,
+    EMAIL_OUTBOX_DRAIN_DELAY_SECONDS,
+    EMAIL_OUTBOX_MAX_ATTEMPTS,
+    EMAIL_OUTBOX_RETRY_SECONDS,
+)
+from project_apps.notifications.models import EmailOutbox
+from project_apps.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+DRAIN_SCHEDULED_KEY = 'notifications:outbox:drain_scheduled'
+
+
+def queue_email(idempotency_key, subject, message, recipient_list, from_email=None):
+    """
+    Stores an email in the outbox; it is sent by drain_email_outbox after the commit.
+    An email with the same key is queued only once, so a retried task does not send twice.
+    """
+    queue_emails([(idempotency_key, subject, message, recipient_list)], from_email=from_email)
+    logger.debug("Email queued: %s, key: %s", recipient_list, idempotency_key)
+
+
+def queue_emails(emails, from_email=None):
+    """
+    Bulk version of queue_email for (idempotency_key, subject, message, recipient_list) tuples.
+    """
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+    # INSERT ... ON CONFLICT DO NOTHING instead of get_or_create's SELECT, savepoint and INSERT per email
+    EmailOutbox.objects.bulk_create(
+        [
+            EmailOutbox(
+                idempotency_key=idempotency_key,
+                subject=subject,
+                body=message,
+                from_email=from_email,
+                recipients=list(recipient_list),
+            )
+            for idempotency_key, subject, message, recipient_list in emails
+        ],
+        ignore_conflicts=True,
+    )
+    transaction.on_commit(schedule_drain)
+
+
+def schedule_drain():
+    # One delayed drain per burst instead of one task per email
+    if cache.add(DRAIN_SCHEDULED_KEY, True, timeout=EMAIL_OUTBOX_DRAIN_DELAY_SECONDS):
+        from project_apps.notifications.tasks import drain_email_outbox
+        drain_email_outbox.apply_async(countdown=EMAIL_OUTBOX_DRAIN_DELAY_SECONDS)
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=EMAIL_OUTBOX_RETRY_SECONDS * 2 ** (attempts - 1))
+
+
+def _claim_batch(batch_size):
+    """
+    Marks up to batch_size due emails as sending and returns them.
+    Rows locked by another worker are skipped.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS)
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status='pending', next_attempt_at__lte=now)
+                | Q(status='sending', updated_at__lt=stale)
+            )
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        EmailOutbox.objects.filter(pk__in=[email.pk for email in batch]).update(
+            status='sending', attempts=F('attempts') + 1, updated_at=now
+        )
+    for email in batch:
+        email.attempts += 1
+    return batch
+
+
+def _record_failure(email, error):
+    email.last_error = str(error)[:2000]
+    if email.attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = 'failed'
+        logger.error("Email failed permanently: key: %s, error: %s", email.idempotency_key, error)
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+        logger.warning(
+            "Email failed, will retry: key: %s, attempt: %s, error: %s",
+            email.idempotency_key, email.attempts, error,
+        )
+    email.save(update_fields=['status', 'last_error', 'next_attempt_at', 'updated_at'])
+
+
+def send_batch(batch_size=EMAIL_OUTBOX_BATCH_SIZE):
+    """
+    Sends one batch of due emails over a single backend connection.
+    Returns (claimed, sent).
+    """
+    batch = _claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for email in batch:
+            _record_failure(email, e)
+        return len(batch), 0
+
+    sent = []
+    try:
+        for email in batch:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email, email.recipients, connection=connection
+            )
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                _record_failure(email, e)
+            else:
+                sent.append(email.pk)
+    finally:
+        connection.close()
+
+    EmailOutbox.objects.filter(pk__in=sent).update(
+        status='sent', sent_at=timezone.now(), last_error='', updated_at=timezone.now()
+    )
+    return len(batch), len(sent)
@@ -5,9 +5,11 @@ from .models import (Notification,
                      BonusPoints,
                      AdminCode,
                      Message,
+                     Broadcast,
                      )
 from project_apps.accounts.serializers import UserSerializer
 from project_apps.accounts.models import User
+from project_apps.customers import stats as customer_stats
 from project_apps.orders.models import Order, OrderItem
 from project_apps.orders.serializers import OrderItemSerializer, OrderSerializer
 
@@ -15,7 +17,7 @@ from project_apps.orders.serializers import OrderItemSerializer, OrderSerializer
 class NotificationSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.filter(is_deleted=False),
+        queryset=User.alive.all(),
         source="user",
         write_only=True
     )
@@ -55,13 +57,13 @@ class NotificationSerializer(serializers.ModelSerializer):
 class DiscountCodeSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.filter(is_deleted=False, role='customer'),
+        queryset=User.alive.filter(role='customer'),
         source="user",
         write_only=True
     )
     notification = NotificationSerializer(read_only=True)
     notification_id = serializers.PrimaryKeyRelatedField(
-        queryset=Notification.objects.filter(is_deleted=False),
+        queryset=Notification.alive.all(),
         source="notification",
         write_only=True,
         required=False,
@@ -103,7 +105,7 @@ class DiscountCodeSerializer(serializers.ModelSerializer):
         user = data.get("user")
         notification = data.get("notification")
         if notification and notification.title == "70% Discount on First Order":
-            if Order.objects.filter(user=user, is_deleted=False).exists():
+            if customer_stats.has_orders(user.id):
                 raise serializers.ValidationError(
                     "The 70% discount code is only valid for the first order."
                 )
@@ -113,13 +115,13 @@ class DiscountCodeSerializer(serializers.ModelSerializer):
 class BonusPointsSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.filter(is_deleted=False, role='customer'),
+        queryset=User.alive.filter(role='customer'),
         source="user",
         write_only=True
     )
     order = OrderSerializer(read_only=True)
     order_id = serializers.PrimaryKeyRelatedField(
-        queryset=Order.objects.filter(is_deleted=False),
+        queryset=Order.alive.all(),
         source="order",
         write_only=True,
         required=False,
@@ -159,7 +161,7 @@ class BonusPointsSerializer(serializers.ModelSerializer):
 class AdminCodeSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.filter(is_deleted=False, is_staff=True),
+        queryset=User.alive.filter(is_staff=True),
         source="user",
         write_only=True
     )
@@ -193,11 +195,11 @@ class AdminCodeSerializer(serializers.ModelSerializer):
 
 class MessageSerializer(serializers.ModelSerializer):
     sender = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.filter(is_deleted=False),
+        queryset=User.alive.all(),
         default=serializers.CurrentUserDefault()
     )
     recipient = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.filter(is_deleted=False)
+        queryset=User.alive.all()
     )
 
     class Meta:
@@ -229,3 +231,50 @@ class MessageSerializer(serializers.ModelSerializer):
         if sender.role == 'admin' and recipient.role != 'customer':
             raise serializers.ValidationError("Admins can only send messages to customers")
         return data
+
+
+class BroadcastSerializer(serializers.ModelSerializer):
+    progress = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Broadcast
+        fields = [
+            "id",
+            "title",
+            "message",
+            "send_email",
+            "created_by",
+            "status",
+            "progress",
+            "total_recipients",
+            "notifications_created",
+            "emails_queued",
+            "started_at",
+            "finished_at",
+            "last_error",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = [
+            "id",
+            "created_by",
+            "status",
+            "total_recipients",
+            "notifications_created",
+            "emails_queued",
+            "started_at",
+            "finished_at",
+            "last_error",
+            "created_at",
+            "updated_at",
+        ]
+
+    def validate_title(self, value):
+        if not value.strip():
+            raise serializers.ValidationError("Title cannot be empty")
+        return value
+
+    def validate_message(self, value):
+        if not value.strip():
+            raise serializers.ValidationError("Message cannot be empty")
+        return value
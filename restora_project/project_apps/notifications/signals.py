@@ -1,8 +1,10 @@
+from django.db import transaction
 from django.utils import timezone
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 from project_apps.accounts.models import User
+from project_apps.core.bulk import defer_to_batch, register_batch_hook, skip_in_bulk
 from .models import (Notification,
                      DiscountCode,
                      AdminCode,
@@ -12,27 +14,30 @@ from .tasks import (send_discount_code_email,
                     send_admin_code_email,
                     send_message_notification_email
                     )
-from project_apps.core.logging import get_logger
+from project_apps.core.logging import get_logger, lazy_attr
 
 logger = get_logger(__name__)
 
 @receiver(post_save, sender=User)
 def create_discount_or_admin_code(sender, instance, created, **kwargs):
     if created and not instance.is_deleted:
+        if defer_to_batch(instance, created=True):
+            return
         if instance.role == "customer":
             discount_code = DiscountCode.objects.create(user=instance)
             send_discount_code_email.delay(instance.id, discount_code.id)
-            logger.info(f"Endirim kodu yaradildi: {instance.email}")
+            logger.info("Endirim kodu yaradildi: %s", instance.email)
         elif instance.role == "admin":
             admin_code = AdminCode.objects.create(user=instance)
             send_admin_code_email.delay(instance.id, admin_code.id)
-            logger.info(f"Admin kodu yaradildi: {instance.email}")
-            logger.info(f"Admin kodu gonderildi: {instance.email}, kod: {admin_code.code}")
+            logger.info("Admin kodu yaradildi: %s", instance.email)
+            logger.info("Admin kodu gonderildi: %s, kod: %s", instance.email, admin_code.code)
 
 @receiver(post_save, sender=Notification)
+@skip_in_bulk
 def log_notification_creation(sender, instance, created, **kwargs):
     if created:
-        logger.info(f"Yeni bildiris yaradildi: {instance.user.email}, basliq: {instance.title}")       
+        logger.info("Yeni bildiris yaradildi: %s, basliq: %s", lazy_attr(instance, 'user.email'), instance.title)       
 
 @receiver(post_save, sender=Message)
 def create_message_notification(sender, instance, created, **kwargs):
@@ -66,6 +71,26 @@ def create_message_notification(sender, instance, created, **kwargs):
                 instance.content
             )
             
-            logger.info(f"Mesaj bildirisi yaradildi {instance.sender.email} -> {instance.recipient.email}")
+            logger.info("Mesaj bildirisi yaradildi %s -> %s", lazy_attr(instance, 'sender.email'), lazy_attr(instance, 'recipient.email'))
         except Exception as e:
-            logger.error(f"xeta bas verdi mesaj bildiri yarananda {str(e)}", exc_info=True)
+            logger.error("xeta bas verdi mesaj bildiri yarananda %s", e, exc_info=True)
+
+@register_batch_hook(User)
+def replay_new_user_codes(rows):
+    # Welcome codes for the users created in the batch, inserted together
+    users = [row.instance for row in rows if row.created and not row.instance.is_deleted]
+    discount_codes = DiscountCode.objects.bulk_create(
+        [DiscountCode(user=user) for user in users if user.role == "customer"]
+    )
+    admin_codes = AdminCode.objects.bulk_create(
+        [AdminCode(user=user) for user in users if user.role == "admin"]
+    )
+
+    def send_codes():
+        for code in discount_codes:
+            send_discount_code_email.delay(code.user_id, code.id)
+        for code in admin_codes:
+            send_admin_code_email.delay(code.user_id, code.id)
+
+    transaction.on_commit(send_codes)
+    logger.info("Endirim kodlari yaradildi: %s, admin kodlari: %s", len(discount_codes), len(admin_codes))
@@ -1,8 +1,10 @@
+import uuid
+import warnings
+
 from celery import shared_task
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
-from django.db.models import Sum
+from django.db.models import F
 
 from project_apps.accounts.models import User
 from project_apps.notifications.models import (
@@ -10,9 +12,19 @@ from project_apps.notifications.models import (
     BonusPoints,
     DiscountCode,
     AdminCode,
-    Message
+    Message,
+    EmailOutbox,
+    Broadcast,
+)
+from project_apps.notifications.outbox import queue_email, queue_emails, send_batch
+from project_apps.core.db import replica_reads
+from project_apps.core.indexing import queue_ids_for_indexing
+from project_apps.core.constants import (
+    BONUS_COFFEE_THRESHOLD,
+    BROADCAST_CHUNK_SIZE,
+    EMAIL_OUTBOX_BATCH_SIZE,
+    EMAIL_OUTBOX_MAX_BATCHES,
 )
-from project_apps.orders.models import Order
 from project_apps.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -20,8 +32,8 @@ logger = get_logger(__name__)
 @shared_task
 def send_discount_code_email(user_id, discount_code_id):
     try:
-        user = User.objects.get(id=user_id, is_deleted=False, role="customer")
-        discount_code = DiscountCode.objects.get(id=discount_code_id, is_deleted=False)
+        user = User.alive.get(id=user_id, role="customer")
+        discount_code = DiscountCode.alive.get(id=discount_code_id)
         
         # Create notification for the discount code
         notification = Notification.objects.create(
@@ -38,23 +50,21 @@ def send_discount_code_email(user_id, discount_code_id):
         discount_code.notification = notification
         discount_code.save()
 
-        # Send email with discount code
-        send_mail(
-            notification.title,
-            notification.message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
-        logger.info(f"Discount code sent: {user.email}, code: {discount_code.code}")
+        # Queue email with discount code
+        queue_email(f"discount-code:{discount_code.id}", notification.title, notification.message, [user.email])
+        logger.info("Discount code queued: %s, code: %s", user.email, discount_code.code)
     except Exception as e:
-        logger.error(f"Failed to send discount code: {e}")
+        logger.error("Failed to send discount code: %s", e)
 
 
 @shared_task
-def send_coffee_bonus_email(user_id):
+def send_coffee_bonus_email(user_id, idempotency_key=None):
     try:
-        user = User.objects.get(id=user_id, is_deleted=False, role="customer")
+        if idempotency_key and EmailOutbox.objects.filter(idempotency_key=idempotency_key).exists():
+            logger.info("Coffee bonus already queued: key: %s", idempotency_key)
+            return
+
+        user = User.alive.get(id=user_id, role="customer")
         
         # Create notification for coffee bonus
         notification = Notification.objects.create(
@@ -69,24 +79,53 @@ def send_coffee_bonus_email(user_id):
             sent_at=timezone.now()
         )
         
-        # Send email with coffee bonus notification
-        send_mail(
+        # Queue email with coffee bonus notification
+        queue_email(
+            idempotency_key or f"coffee-bonus:{notification.id}",
             notification.title,
             notification.message,
-            settings.DEFAULT_FROM_EMAIL,
             [user.email],
-            fail_silently=False,
         )
-        logger.info(f"Coffee bonus email sent: {user.email}")
+        logger.info("Coffee bonus email queued: %s", user.email)
     except Exception as e:
-        logger.error(f"Failed to send coffee bonus: {e}")
+        logger.error("Failed to send coffee bonus: %s", e)
+
+
+@shared_task
+def send_email_task(subject, message, from_email, recipient_list, idempotency_key=None):
+    # Kept for already queued calls, new code uses outbox.queue_email directly
+    try:
+        key = idempotency_key or f"email-task:{send_email_task.request.id or uuid.uuid4()}"
+        queue_email(key, subject, message, recipient_list, from_email=from_email)
+    except Exception as e:
+        logger.error("Failed to queue email: %s", e)
+
+
+@shared_task
+def drain_email_outbox(max_batches=EMAIL_OUTBOX_MAX_BATCHES):
+    """
+    Sends pending outbox emails in batches, one backend connection per batch.
+    Runs shortly after emails are queued and every minute as a safety net.
+    """
+    total = sent = 0
+    try:
+        for _ in range(max_batches):
+            claimed, delivered = send_batch()
+            total += claimed
+            sent += delivered
+            if claimed < EMAIL_OUTBOX_BATCH_SIZE:
+                break
+    except Exception as e:
+        logger.error("Error while draining email outbox: %s", e)
+    logger.info("Email outbox drained: claimed: %s, sent: %s", total, sent)
+    return sent
 
 
 @shared_task
 def send_admin_code_email(user_id, admin_code_id):
     try:
-        user = User.objects.get(id=user_id, role="admin", is_deleted=False)
-        admin_code = AdminCode.objects.get(id=admin_code_id, is_deleted=False)
+        user = User.alive.get(id=user_id, role="admin")
+        admin_code = AdminCode.alive.get(id=admin_code_id)
         
         # Create notification for admin code
         notification = Notification.objects.create(
@@ -103,73 +142,144 @@ def send_admin_code_email(user_id, admin_code_id):
         admin_code.notification = notification
         admin_code.save()
 
-        # Send admin code via email
-        send_mail(
-            notification.title,
-            notification.message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
-        logger.info(f"Admin code email sent: {user.email}, code: {admin_code.code}")
+        # Queue admin code email
+        queue_email(f"admin-code:{admin_code.id}", notification.title, notification.message, [user.email])
+        logger.info("Admin code email queued: %s, code: %s", user.email, admin_code.code)
     except Exception as e:
-        logger.error(f"Error sending admin code: {e}")
-        logger.error(f"User ID: {user_id}, Admin Code ID: {admin_code_id}")
+        logger.error("Error sending admin code: %s", e)
+        logger.error("User ID: %s, Admin Code ID: %s", user_id, admin_code_id)
 
 
 @shared_task
-def check_customer_points():
+@replica_reads
+def check_customer_points(full_scan=None):
+    """
+    Sends coffee bonuses that were missed when points were booked, e.g. after a
+    balance was corrected by hand. Balances are kept by the bonus ledger
+    (project_apps.customers.loyalty), so nothing is recomputed from orders.
+    full_scan is deprecated: every run checks all balances. It is still accepted
+    so that beat schedules passing it keep working; remove it from them.
+    """
+    if full_scan is not None:
+        warnings.warn(
+            "check_customer_points(full_scan=...) is deprecated and ignored, every run checks all balances",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        logger.throttled("full_scan_deprecated").warning(
+            "check_customer_points called with deprecated full_scan=%s, remove it from the schedule", full_scan
+        )
     try:
-        customers = User.objects.filter(role="customer", is_deleted=False)
-        
-        for customer in customers:
-            orders = Order.objects.filter(user=customer, is_deleted=False)
-            total_spent = orders.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-            points = int(total_spent // 10)
-
-            points_obj, _ = BonusPoints.objects.get_or_create(user=customer, is_deleted=False)
-
-            logger.info(f"{customer.email} => Total spent: {total_spent}, Points: {points}, Last notified: {points_obj.last_notified_points}")
-
-            new_bonus_count = points // 5
-            old_bonus_count = (points_obj.last_notified_points or 0) // 5
-            bonuses_to_send = new_bonus_count - old_bonus_count
-
-            for _ in range(bonuses_to_send):
-                send_coffee_bonus_email.delay(customer.id)
-                logger.info(f"Coffee bonus sent: {customer.email}, points: {points}")
-
-            if points_obj.points != points or bonuses_to_send > 0:
-                points_obj.points = points
-                points_obj.last_notified_points = points
-                points_obj.save()
+        candidates = (
+            BonusPoints.alive.filter(points__gt=F('last_notified_points'))
+            .values_list('id', 'user_id', 'points', 'last_notified_points')
+        )
+        sent = 0
+        for points_id, user_id, points, last_notified in candidates.iterator():
+            bonuses = points // BONUS_COFFEE_THRESHOLD - last_notified // BONUS_COFFEE_THRESHOLD
+            if bonuses <= 0:
+                continue
+            # Only the run that moves last_notified_points sends, concurrent runs skip the row
+            claimed = BonusPoints.objects.filter(
+                pk=points_id, points=points, last_notified_points=last_notified
+            ).update(last_notified_points=points, updated_at=timezone.now())
+            if not claimed:
+                continue
+            for i in range(bonuses):
+                send_coffee_bonus_email.delay(user_id, f"coffee-bonus:points-{points_id}:{points}:{i}")
+            sent += bonuses
+            logger.info("Coffee bonus sent: customer #%s, points: %s", user_id, points)
+        logger.info("Points check finished: coffee bonuses sent: %s", sent)
 
     except Exception as e:
-        logger.error(f"Error while checking points: {e}")
+        logger.error("Error while checking points: %s", e)
 
 
 @shared_task
 def send_message_notification_email(message_id, sender_email, recipient_email, content):
     try:
-        message = Message.objects.get(id=message_id, is_deleted=False)
+        message = Message.alive.get(id=message_id)
         
         # Directly fetch the notification from the message's notification field
         notification = message.notification
         
         # If no notification is found, log an error and return
         if not notification:
-            logger.error(f"No notification found for message ID: {message_id}")
+            logger.error("No notification found for message ID: %s", message_id)
             return
         
-        # Send email with message notification
-        send_mail(
-            notification.title,
-            notification.message,
-            settings.DEFAULT_FROM_EMAIL,
-            [recipient_email],
-            fail_silently=False,
-        )
+        # Queue email with message notification
+        queue_email(f"message:{message_id}", notification.title, notification.message, [recipient_email])
         
-        logger.info(f"Message notification sent: {sender_email} -> {recipient_email}, Message ID: {message_id}")
+        logger.info("Message notification queued: %s -> %s, Message ID: %s", sender_email, recipient_email, message_id)
     except Exception as e:
-        logger.error(f"Failed to send message notification, Message ID: {message_id}, error: {str(e)}", exc_info=True)
+        logger.error("Failed to send message notification, Message ID: %s, error: %s", message_id, e, exc_info=True)
+
+
+def broadcast_recipients():
+    return User.alive.filter(role="customer", is_active=True)
+
+
+@shared_task
+def send_broadcast(broadcast_id):
+    """
+    Creates the broadcast's notifications and emails in chunks of customers.
+    Every chunk is one transaction that also moves the broadcast's progress,
+    so a restarted task continues after the last committed chunk.
+    """
+    broadcast = Broadcast.objects.get(pk=broadcast_id)
+    if broadcast.status == 'completed':
+        logger.info("Broadcast already completed: #%s", broadcast_id)
+        return
+    if broadcast.started_at is None:
+        broadcast.started_at = timezone.now()
+    broadcast.status = 'running'
+    broadcast.save(update_fields=['status', 'started_at', 'updated_at'])
+
+    try:
+        while True:
+            with transaction.atomic():
+                customers = list(
+                    broadcast_recipients()
+                    .filter(pk__gt=broadcast.last_user_id)
+                    .order_by('pk')
+                    .values_list('pk', 'email')[:BROADCAST_CHUNK_SIZE]
+                )
+                if not customers:
+                    break
+
+                sent_at = timezone.now()
+                # bulk_create skips Notification.save and its post_save log for every row
+                notifications = Notification.objects.bulk_create([
+                    Notification(user_id=user_id, title=broadcast.title, message=broadcast.message, sent_at=sent_at)
+                    for user_id, _ in customers
+                ])
+                queue_ids_for_indexing(Notification, [notification.pk for notification in notifications])
+                emails = 0
+                if broadcast.send_email:
+                    queue_emails([
+                        (f"broadcast:{broadcast.pk}:{user_id}", broadcast.title, broadcast.message, [email])
+                        for user_id, email in customers
+                    ])
+                    emails = len(customers)
+
+                broadcast.last_user_id = customers[-1][0]
+                Broadcast.objects.filter(pk=broadcast.pk).update(
+                    last_user_id=broadcast.last_user_id,
+                    notifications_created=F('notifications_created') + len(customers),
+                    emails_queued=F('emails_queued') + emails,
+                    updated_at=timezone.now(),
+                )
+            logger.info("Broadcast chunk sent: #%s, customers: %s, up to #%s",
+                        broadcast_id, len(customers), broadcast.last_user_id)
+    except Exception as e:
+        logger.error("Broadcast failed: #%s, error: %s", broadcast_id, e, exc_info=True)
+        Broadcast.objects.filter(pk=broadcast.pk).update(
+            status='failed', last_error=str(e), updated_at=timezone.now()
+        )
+        raise
+
+    Broadcast.objects.filter(pk=broadcast.pk).update(
+        status='completed', finished_at=timezone.now(), updated_at=timezone.now()
+    )
+    logger.info("Broadcast completed: #%s", broadcast_id)
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from smtplib import SMTPException
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from project_apps.accounts.models import User
+from project_apps.core.constants import EMAIL_OUTBOX_MAX_ATTEMPTS, EMAIL_OUTBOX_RETRY_SECONDS
+from project_apps.core.tests.eager_celery import eager_celery
+from project_apps.notifications.models import EmailOutbox, Notification
+from project_apps.notifications.outbox import queue_email, send_batch
+from project_apps.notifications.tasks import drain_email_outbox, send_coffee_bonus_email
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class EmailOutboxTest(TestCase):
+    def setUp(self):
+        eager_celery(self)
+        cache.clear()
+
+    def _queue(self, count, prefix='promo'):
+        for i in range(count):
+            queue_email(f'{prefix}:{i}', 'Weekend promo', 'Two kebabs for one', [f'customer{i}@example.com'])
+
+    def test_queued_emails_are_sent_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self._queue(3)
+            self.assertEqual(len(mail.outbox), 0)
+
+        # One drain for the whole burst
+        self.assertEqual(len(callbacks), 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(EmailOutbox.objects.exclude(status='sent').exists())
+
+    def test_one_connection_per_batch(self):
+        self._queue(5)
+        with patch('project_apps.notifications.outbox.get_connection', wraps=get_connection) as connections:
+            self.assertEqual(send_batch(batch_size=2), (2, 2))
+            self.assertEqual(drain_email_outbox(), 3)
+
+        # One for the batch of two, one for the rest; an empty batch opens none
+        self.assertEqual(connections.call_count, 2)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_same_key_is_queued_once(self):
+        self._queue(2)
+        self._queue(2)
+        drain_email_outbox()
+        drain_email_outbox()
+
+        self.assertEqual(EmailOutbox.objects.count(), 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_failed_email_is_retried_with_backoff(self):
+        self._queue(2)
+        original = EmailBackend.send_messages
+
+        def flaky(backend, messages):
+            if messages[0].to == ['customer0@example.com']:
+                raise SMTPException('Mailbox unavailable')
+            return original(backend, messages)
+
+        with patch.object(EmailBackend, 'send_messages', flaky):
+            self.assertEqual(drain_email_outbox(), 1)
+
+        failed = EmailOutbox.objects.get(idempotency_key='promo:0')
+        self.assertEqual((failed.status, failed.attempts), ('pending', 1))
+        self.assertIn('Mailbox unavailable', failed.last_error)
+        self.assertGreater(failed.next_attempt_at, timezone.now() + timedelta(seconds=EMAIL_OUTBOX_RETRY_SECONDS - 5))
+
+        # Not due yet
+        self.assertEqual(drain_email_outbox(), 0)
+
+        EmailOutbox.objects.filter(pk=failed.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(drain_email_outbox(), 1)
+        self.assertEqual(EmailOutbox.objects.get(pk=failed.pk).status, 'sent')
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_email_fails_after_max_attempts(self):
+        self._queue(1)
+        with patch.object(EmailBackend, 'send_messages', side_effect=SMTPException('Relay denied')):
+            for _ in range(EMAIL_OUTBOX_MAX_ATTEMPTS):
+                EmailOutbox.objects.update(next_attempt_at=timezone.now())
+                drain_email_outbox()
+
+        email = EmailOutbox.objects.get()
+        self.assertEqual((email.status, email.attempts), ('failed', EMAIL_OUTBOX_MAX_ATTEMPTS))
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(drain_email_outbox(), 0)
+
+    def test_connection_failure_backs_off_the_batch(self):
+        self._queue(3)
+        with patch.object(EmailBackend, 'open', side_effect=OSError('Connection refused')):
+            self.assertEqual(drain_email_outbox(), 0)
+
+        self.assertEqual(list(EmailOutbox.objects.values_list('status', 'attempts').distinct()), [('pending', 1)])
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_stale_sending_rows_are_reclaimed(self):
+        self._queue(1)
+        EmailOutbox.objects.update(status='sending', updated_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(drain_email_outbox(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_coffee_bonus_is_not_repeated_for_the_same_key(self):
+        with patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            customer = User.objects.create_user(
+                username="customer", password="testpassword", email="customer@example.com", role="customer"
+            )
+
+        send_coffee_bonus_email(customer.id, 'coffee-bonus:1:0')
+        send_coffee_bonus_email(customer.id, 'coffee-bonus:1:0')
+
+        self.assertEqual(Notification.objects.filter(user=customer).count(), 1)
+        self.assertEqual(EmailOutbox.objects.filter(idempotency_key='coffee-bonus:1:0').count(), 1)
@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from project_apps.accounts.models import User
+from project_apps.notifications.models import BonusPoints
+from project_apps.notifications.tasks import check_customer_points
+
+
+@patch('project_apps.notifications.tasks.send_coffee_bonus_email.delay')
+class CheckCustomerPointsTest(TestCase):
+    def setUp(self):
+        with patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            self.first = User.objects.create_user(
+                username="first", password="testpassword", email="first@example.com", role="customer"
+            )
+            self.second = User.objects.create_user(
+                username="second", password="testpassword", email="second@example.com", role="customer"
+            )
+
+    def test_missed_coffee_bonuses_are_sent_once(self, coffee_delay):
+        # Balances changed by hand, outside the loyalty service
+        BonusPoints.objects.create(user=self.first, points=26, last_notified_points=4)
+        BonusPoints.objects.create(user=self.second, points=3, last_notified_points=0)
+
+        check_customer_points()
+        self.assertEqual(coffee_delay.call_count, 5)
+        self.assertEqual({call.args[0] for call in coffee_delay.call_args_list}, {self.first.id})
+        # Every bonus gets its own outbox key
+        self.assertEqual(len({call.args[1] for call in coffee_delay.call_args_list}), 5)
+        self.assertEqual(BonusPoints.objects.get(user=self.first).last_notified_points, 26)
+
+        check_customer_points()
+        self.assertEqual(coffee_delay.call_count, 5)
+
+    def test_balances_are_not_recomputed(self, coffee_delay):
+        BonusPoints.objects.create(user=self.first, points=7, last_notified_points=7)
+
+        check_customer_points()
+
+        self.assertEqual(BonusPoints.objects.get(user=self.first).points, 7)
+        coffee_delay.assert_not_called()
+
+    def test_full_scan_is_deprecated(self, coffee_delay):
+        with self.assertWarns(DeprecationWarning):
+            check_customer_points(full_scan=True)
+
+    def test_query_count_does_not_scale_with_quiet_customers(self, coffee_delay):
+        BonusPoints.objects.bulk_create([
+            BonusPoints(user=self.first, points=12, last_notified_points=12),
+            BonusPoints(user=self.second, points=3, last_notified_points=0),
+        ])
+        with self.assertNumQueries(1):
+            check_customer_points()
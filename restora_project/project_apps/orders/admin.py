@@ -1,9 +1,7 @@
-import csv
-from datetime import datetime
 from django.contrib import admin
-from django.http import HttpResponse
 
-from project_apps.orders.models import Order, OrderItem
+from project_apps.orders.exports import sales_export_response
+from project_apps.orders.models import DailySalesRollup, Order, OrderItem
 
 
 @admin.register(Order)
@@ -16,30 +14,8 @@ class OrderAdmin(admin.ModelAdmin):
     actions = ['export_sales_report']
 
     def export_sales_report(self, request, queryset):
-        # Tarix aralığını queryset-dən alırıq
-        orders = queryset.order_by('created_at')
-        if orders.exists():
-            start_date = orders.first().created_at.date()
-            end_date = orders.last().created_at.date()
-            filename = f"sales_report_{start_date}_to_{end_date}.csv"
-        else:
-            start_date = end_date = datetime.now().date()
-            filename = f"sales_report_{start_date}.csv"
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'User', 'Total Amount', 'Payment Type', 'Status', 'Created At'])
-        for order in orders:
-            writer.writerow([
-                order.id,
-                order.user.email,
-                order.total_amount,
-                order.payment_type,
-                order.status,
-                order.created_at
-            ])
-        return response
+        # Streamed row by row, the file is never built in memory
+        return sales_export_response(queryset, 'csv', request)
     export_sales_report.short_description = "Satış hesabatını ixrac et"
 
     def save_model(self, request, obj, form, change):
@@ -60,4 +36,12 @@ class OrderItemAdmin(admin.ModelAdmin):
         if not obj.pk:
             obj.created_by = request.user
         obj.updated_by = request.user
-        super().save_model(request, obj, form, change)
\ No newline at end of file
+        super().save_model(request, obj, form, change)
+
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(admin.ModelAdmin):
+    list_display = ('date', 'payment_type', 'status', 'revenue', 'order_count', 'bonus_points')
+    list_filter = ('payment_type', 'status', 'date')
+    ordering = ('-date',)
+    readonly_fields = ('date', 'payment_type', 'status', 'revenue', 'order_count', 'bonus_points',
+                       'created_at', 'updated_at')
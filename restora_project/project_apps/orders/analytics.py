@@ -0,0 +1,276 @@
+import hashlib
+import time
+from datetime import date
+from decimal import Decimal
+from itertools import islice
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.db.models.functions import ExtractHour, TruncDate
+
+from project_apps.core.constants import (
+    ORDER_ANALYTICS_CACHE_SECONDS,
+    ORDER_ANALYTICS_CHUNK_SIZE,
+    PAYMENT_TYPE_CHOICES,
+    STATUS_CHOICES,
+)
+from project_apps.core.dates import date_range_q
+from project_apps.menu.models import MenuItem
+from project_apps.orders.models import OrderItem
+from project_apps.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+PAYMENT_TYPES = [value for value, _ in PAYMENT_TYPE_CHOICES]
+STATUSES = [value for value, _ in STATUS_CHOICES]
+
+# The order items of one day as column arrays
+COLUMNS = (
+    ('order', np.int64),
+    ('hour', np.int8),  # Local hour the order was placed
+    ('payment_type', np.int8),  # Index in PAYMENT_TYPES
+    ('status', np.int8),  # Index in STATUSES
+    ('menu_item', np.int64),
+    ('quantity', np.int64),
+    ('cents', np.int64),  # Line total, price * quantity, in hundredths of AZN
+)
+
+
+def _empty_partition():
+    return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS}
+
+
+def _day_versions(start_date, end_date):
+    """
+    A version per day that changes whenever one of the day's live order items,
+    or the order it belongs to, is written or deleted. Days without order items are left out.
+    """
+    rows = (
+        _order_lines(start_date, end_date)
+        .annotate(day=TruncDate('order__created_at'))
+        .values('day')
+        .annotate(rows=Count('id'), items_changed=Max('updated_at'), orders_changed=Max('order__updated_at'))
+        .values_list('day', 'rows', 'items_changed', 'orders_changed')
+        .order_by()
+    )
+    return {
+        day: hashlib.md5(repr(version).encode('utf-8')).hexdigest()
+        for day, *version in rows
+    }
+
+
+def _order_lines(start_date, end_date):
+    return OrderItem.alive.filter(order__is_deleted=False).filter(
+        date_range_q('order__created_at', start_date, end_date)
+    )
+
+
+def _load_days(start_date, end_date):
+    """
+    Streams the order items of a date range into column arrays.
+    Returns {date: partition}.
+    """
+    rows = (
+        _order_lines(start_date, end_date)
+        .annotate(day=TruncDate('order__created_at'), hour=ExtractHour('order__created_at'))
+        .values_list(
+            'day', 'order_id', 'hour', 'order__payment_type', 'order__status', 'menu_item_id', 'quantity', 'price'
+        )
+        .order_by()
+        .iterator(chunk_size=ORDER_ANALYTICS_CHUNK_SIZE)
+    )
+    payment_codes = {value: code for code, value in enumerate(PAYMENT_TYPES)}
+    status_codes = {value: code for code, value in enumerate(STATUSES)}
+
+    days, chunks = [], {name: [] for name, _ in COLUMNS}
+    while chunk := list(islice(rows, ORDER_ANALYTICS_CHUNK_SIZE)):
+        day, order, hour, payment_type, status, menu_item, quantity, price = zip(*chunk)
+        days.append(np.fromiter((d.toordinal() for d in day), dtype=np.int64, count=len(chunk)))
+        chunks['order'].append(np.array(order, dtype=np.int64))
+        chunks['hour'].append(np.array(hour, dtype=np.int8))
+        chunks['payment_type'].append(np.array([payment_codes[value] for value in payment_type], dtype=np.int8))
+        chunks['status'].append(np.array([status_codes[value] for value in status], dtype=np.int8))
+        chunks['menu_item'].append(np.array(menu_item, dtype=np.int64))
+        quantity = np.array(quantity, dtype=np.int64)
+        chunks['quantity'].append(quantity)
+        chunks['cents'].append(np.rint(np.array(price, dtype=np.float64) * 100).astype(np.int64) * quantity)
+
+    if not days:
+        return {}
+    day = np.concatenate(days)
+    columns = {name: np.concatenate(values) for name, values in chunks.items()}
+
+    # Split the rows into one partition per day
+    by_day = np.argsort(day, kind='stable')
+    ordinals, starts = np.unique(day[by_day], return_index=True)
+    partitions = {}
+    for ordinal, rows_of_day in zip(ordinals, np.split(by_day, starts[1:])):
+        partitions[date.fromordinal(int(ordinal))] = {name: values[rows_of_day] for name, values in columns.items()}
+    return partitions
+
+
+def load_partitions(start_date, end_date):
+    """
+    Returns {date: partition} for the days of the range that have orders.
+    Partitions are cached under their day's version, so a changed day is read
+    again and every other day comes from the cache.
+    """
+    versions = _day_versions(start_date, end_date)
+    keys = {day: f'orders:analytics:{day.isoformat()}:{version}' for day, version in versions.items()}
+    cached = cache.get_many(list(keys.values()))
+    partitions = {day: cached[key] for day, key in keys.items() if key in cached}
+
+    missing = sorted(set(keys) - set(partitions))
+    if missing:
+        # One query from the first to the last missing day, rows of cached days in between are dropped
+        loaded = _load_days(missing[0], missing[-1])
+        fresh = {day: loaded.get(day) or _empty_partition() for day in missing}
+        cache.set_many({keys[day]: partition for day, partition in fresh.items()}, timeout=ORDER_ANALYTICS_CACHE_SECONDS)
+        partitions.update(fresh)
+    logger.debug("Analytics partitions: %s cached, %s loaded", len(partitions) - len(missing), len(missing))
+    return partitions
+
+
+def _amount(cents):
+    return (Decimal(int(round(cents))) / 100).quantize(Decimal('0.01'))
+
+
+def _ranked(values, top):
+    # Indexes of the top largest values, ties in index order
+    return np.argsort(-values, kind='stable')[:top]
+
+
+def sales_analytics(start_date, end_date, payment_type=None, status=None, top=10):
+    """
+    Revenue by hour, weekday, category and menu item, plus basket statistics
+    for the orders of a date range. Revenue is the sum of order lines
+    (price * quantity), before order-level discounts.
+    """
+    started = time.perf_counter()
+    partitions = load_partitions(start_date, end_date)
+    days = sorted(partitions)
+    columns = {
+        name: np.concatenate([np.empty(0, dtype=dtype)] + [partitions[day][name] for day in days])
+        for name, dtype in COLUMNS
+    }
+    columns['weekday'] = np.concatenate(
+        [np.empty(0, dtype=np.int8)]
+        + [np.full(len(partitions[day]['order']), day.weekday(), dtype=np.int8) for day in days]
+    )
+
+    selected = np.ones(len(columns['order']), dtype=bool)
+    if payment_type:
+        selected &= columns['payment_type'] == PAYMENT_TYPES.index(payment_type)
+    if status:
+        selected &= columns['status'] == STATUSES.index(status)
+    columns = {name: values[selected] for name, values in columns.items()}
+    cents, quantity = columns['cents'], columns['quantity']
+
+    # Order level: the hour and weekday of an order are those of any of its lines
+    orders, first_line, order_index = np.unique(columns['order'], return_index=True, return_inverse=True)
+    order_cents = np.bincount(order_index, weights=cents, minlength=len(orders))
+    order_quantity = np.bincount(order_index, weights=quantity, minlength=len(orders)).astype(np.int64)
+    order_hour = columns['hour'][first_line]
+    order_weekday = columns['weekday'][first_line]
+
+    hour_cents = np.bincount(columns['hour'], weights=cents, minlength=24)
+    hour_orders = np.bincount(order_hour, minlength=24)
+    weekday_cents = np.bincount(columns['weekday'], weights=cents, minlength=7)
+    weekday_orders = np.bincount(order_weekday, minlength=7)
+
+    # Menu items, and their categories as they are now
+    item_ids, item_index = np.unique(columns['menu_item'], return_inverse=True)
+    menu = {
+        pk: (name, category_id, category_name)
+        for pk, name, category_id, category_name in MenuItem.objects.filter(pk__in=item_ids.tolist())
+        .values_list('id', 'name', 'category_id', 'category__name')
+    }
+    item_cents = np.bincount(item_index, weights=cents, minlength=len(item_ids))
+    item_quantity = np.bincount(item_index, weights=quantity, minlength=len(item_ids)).astype(np.int64)
+    # Each (order, item) once, sorted by order and then item
+    order_items = np.unique(order_index.astype(np.int64) * len(item_ids) + item_index)
+    basket_order, basket_item = np.divmod(order_items, max(len(item_ids), 1))
+    item_orders = np.bincount(basket_item, minlength=len(item_ids))
+
+    item_category = np.array([menu.get(int(pk), (None, 0, None))[1] for pk in item_ids], dtype=np.int64)
+    category_ids, category_of_item = np.unique(item_category, return_inverse=True)
+    category_names = {category_id: category_name for _, category_id, category_name in menu.values()}
+    category_cents = np.bincount(category_of_item[item_index], weights=cents, minlength=len(category_ids))
+    category_quantity = np.bincount(
+        category_of_item[item_index], weights=quantity, minlength=len(category_ids)
+    ).astype(np.int64)
+
+    # Items bought together: pair every item of an order with the items after it
+    pair_keys = []
+    basket_size = np.bincount(basket_order)
+    for distance in range(1, int(basket_size.max()) if len(basket_size) else 0):
+        same_order = basket_order[:-distance] == basket_order[distance:]
+        pair_keys.append(basket_item[:-distance][same_order] * len(item_ids) + basket_item[distance:][same_order])
+    pairs, pair_orders = np.unique(np.concatenate([np.empty(0, dtype=np.int64)] + pair_keys), return_counts=True)
+
+    item_counts, orders_per_count = np.unique(order_quantity, return_counts=True)
+    total_cents = order_cents.sum()
+
+    def item_name(index):
+        return menu.get(int(item_ids[index]), (None,))[0]
+
+    report = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'payment_type': payment_type,
+        'status': status,
+        'totals': {
+            'revenue': _amount(total_cents),
+            'order_count': len(orders),
+            'item_count': int(quantity.sum()),
+            'average_order_value': _amount(total_cents / len(orders)) if len(orders) else _amount(0),
+            'average_items_per_order': round(float(order_quantity.mean()), 2) if len(orders) else 0,
+        },
+        'by_hour': [
+            {'hour': hour, 'revenue': _amount(hour_cents[hour]), 'order_count': int(hour_orders[hour])}
+            for hour in range(24)
+        ],
+        # 1 is Monday, as in ISO 8601
+        'by_weekday': [
+            {'weekday': weekday + 1, 'revenue': _amount(weekday_cents[weekday]), 'order_count': int(weekday_orders[weekday])}
+            for weekday in range(7)
+        ],
+        'by_category': [
+            {
+                'category_id': int(category_ids[index]) or None,
+                'name': category_names.get(int(category_ids[index])),
+                'revenue': _amount(category_cents[index]),
+                'quantity': int(category_quantity[index]),
+            }
+            for index in _ranked(category_cents, len(category_ids))
+        ],
+        'top_items': [
+            {
+                'menu_item_id': int(item_ids[index]),
+                'name': item_name(index),
+                'revenue': _amount(item_cents[index]),
+                'quantity': int(item_quantity[index]),
+                'order_count': int(item_orders[index]),
+            }
+            for index in _ranked(item_cents, top)
+        ],
+        'top_pairs': [
+            {
+                'menu_item_ids': [int(item_ids[first]), int(item_ids[second])],
+                'names': [item_name(first), item_name(second)],
+                'order_count': int(pair_orders[index]),
+            }
+            for index in _ranked(pair_orders, top)
+            for first, second in [divmod(int(pairs[index]), len(item_ids))]
+        ],
+        'basket_sizes': [
+            {'items': int(count), 'order_count': int(orders_with_count)}
+            for count, orders_with_count in zip(item_counts, orders_per_count)
+        ],
+    }
+    logger.info(
+        "Sales analytics computed: %s - %s, days: %s, order items: %s, %.1f ms",
+        start_date, end_date, len(days), len(cents), (time.perf_counter() - started) * 1000,
+    )
+    return report
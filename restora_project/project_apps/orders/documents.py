@@ -10,6 +10,9 @@ class OrderDocument(Document):
     total_amount = fields.FloatField()
     status = fields.TextField()
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('user')
+
     class Index:
         name = 'orders'
         settings = {
@@ -19,4 +22,4 @@ class OrderDocument(Document):
 
     class Django:
         model = Order
-        fields = ['id']
\ No newline at end of file
+        fields = ['id']
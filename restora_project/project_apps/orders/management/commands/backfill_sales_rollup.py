@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project_apps.orders.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild DailySalesRollup rows from orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help='First day to rebuild (YYYY-MM-DD), defaults to the first order')
+        parser.add_argument('--end-date', help='Last day to rebuild (YYYY-MM-DD), defaults to the last order')
+
+    def handle(self, *args, **options):
+        try:
+            start_date = date.fromisoformat(options['start_date']) if options['start_date'] else None
+            end_date = date.fromisoformat(options['end_date']) if options['end_date'] else None
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+        if start_date and end_date and start_date > end_date:
+            raise CommandError('Start date cannot be greater than end date')
+
+        rows = rebuild_rollups(start_date, end_date)
+        self.stdout.write(self.style.SUCCESS(f'Sales rollup rebuilt: {rows} rows'))
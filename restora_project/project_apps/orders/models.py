@@ -1,13 +1,32 @@
 from django.db import models
 
-from project_apps.core.mixins import TimestampMixin, SoftDeleteMixin
+from project_apps.core.mixins import TimestampMixin, SoftDeleteMixin, SoftDeleteQuerySet, AliveManager, alive_index
 from project_apps.accounts.models import User
 from project_apps.menu.models import MenuItem
 from project_apps.core.constants import STATUS_CHOICES, PAYMENT_TYPE_CHOICES
-from project_apps.core.logging import get_logger
+from project_apps.core.logging import get_logger, lazy_attr
 
 logging = get_logger(__name__)
 
+
+class OrderQuerySet(SoftDeleteQuerySet):
+    def with_related(self):
+        """
+        Loads everything OrderSerializer renders in a fixed number of queries
+        """
+        return self.select_related('user', 'created_by').prefetch_related(
+            models.Prefetch(
+                'order_items',
+                queryset=OrderItem.alive.with_related(),
+            )
+        )
+
+
+class OrderItemQuerySet(SoftDeleteQuerySet):
+    def with_related(self):
+        return self.select_related('menu_item__category')
+
+
 class Order(TimestampMixin, SoftDeleteMixin, models.Model):
     """
     For orders and bonus systems
@@ -43,16 +62,43 @@ class Order(TimestampMixin, SoftDeleteMixin, models.Model):
         default='cash', 
         verbose_name="Payment type"
         )
+
+    objects = OrderQuerySet.as_manager()
+    alive = AliveManager.from_queryset(OrderQuerySet)()
     
     # 1 point for every 10 AZN
     def calculate_bonus_points(self):
         return int(self.total_amount // 10)
     
+    # Rollup receivers compare the loaded state with the saved one
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._sales_snapshot = instance.sales_snapshot()
+        return instance
+
+    def sales_snapshot(self):
+        """
+        Returns the values that DailySalesRollup aggregates and the customer
+        they are booked to, or None when some of them were not loaded.
+        """
+        loaded = self.__dict__
+        if any(
+            name not in loaded
+            for name in ('created_at', 'payment_type', 'status', 'total_amount', 'is_deleted', 'user_id')
+        ):
+            return None
+        return (self.created_at, self.payment_type, self.status, self.total_amount, self.is_deleted, self.user_id)
+
+    def batch_state(self):
+        return {'snapshot': self.sales_snapshot()}
+
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
         logging.info(
-            f"Order created or updated: {self.user.email}, "
-            f"Amount: {self.total_amount} AZN, Status: {self.status}"
+            "Order created or updated: %s, "
+            "Amount: %s AZN, Status: %s",
+            lazy_attr(self, 'user.email'), self.total_amount, self.status,
         )
     
     def __str__(self):
@@ -62,7 +108,49 @@ class Order(TimestampMixin, SoftDeleteMixin, models.Model):
         verbose_name = "order"
         verbose_name_plural = "orders"
         indexes = [
-            models.Index(fields=['user', 'is_deleted']),
+            alive_index('user', 'created_at', name='order_user_alive_idx'),
+            # Sales reports and the admin order list: date range, then payment type
+            alive_index('created_at', 'payment_type', name='order_created_alive_idx'),
+            models.Index(fields=['updated_at']),
+        ]
+
+
+class DailySalesRollup(TimestampMixin, models.Model):
+    """
+    Sales pre-aggregated per day, payment type and status.
+    Maintained from order signals, rebuilt with backfill_sales_rollup.
+    """
+    date = models.DateField(verbose_name="date")
+    payment_type = models.CharField(
+        max_length=10,
+        choices=PAYMENT_TYPE_CHOICES,
+        verbose_name="Payment type"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        verbose_name="status"
+    )
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name="revenue"
+    )
+    order_count = models.IntegerField(default=0, verbose_name="order count")
+    bonus_points = models.IntegerField(default=0, verbose_name="bonus points")
+
+    def __str__(self):
+        return f"{self.date} {self.payment_type}/{self.status}: {self.revenue} AZN"
+
+    class Meta:
+        verbose_name = "daily sales rollup"
+        verbose_name_plural = "daily sales rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'payment_type', 'status'],
+                name='unique_daily_sales_rollup',
+            ),
         ]
 
 
@@ -87,12 +175,16 @@ class OrderItem(TimestampMixin, SoftDeleteMixin, models.Model):
                                 decimal_places=2,
                                 verbose_name="price"
                                 )
+
+    objects = OrderItemQuerySet.as_manager()
+    alive = AliveManager.from_queryset(OrderItemQuerySet)()
     
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
         logging.info(
-            f"Order item: {self.menu_item.name}, "
-            f"Quantity: {self.quantity}, Price: {self.price} AZN"
+            "Order item: %s, "
+            "Quantity: %s, Price: %s AZN",
+            lazy_attr(self, 'menu_item.name'), self.quantity, self.price,
         )
     
     def __str__(self):
@@ -101,3 +193,6 @@ class OrderItem(TimestampMixin, SoftDeleteMixin, models.Model):
     class Meta:
         verbose_name = "order item"
         verbose_name_plural = "order items"
+        indexes = [
+            alive_index('order', name='order_item_order_alive_idx'),
+        ]
@@ -0,0 +1,129 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Floor, TruncDate
+from django.utils import timezone
+
+from project_apps.core.dates import date_range_q
+from project_apps.core.constants import BONUS_POINTS_PER_AZN
+from project_apps.orders.models import DailySalesRollup, Order
+from project_apps.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _contribution(snapshot):
+    """
+    Turns an order snapshot into a rollup key and the amounts it adds.
+    Deleted orders add nothing.
+    """
+    if snapshot is None:
+        return None
+    created_at, payment_type, status, total_amount, is_deleted, _ = snapshot
+    if is_deleted or created_at is None:
+        return None
+    total_amount = Decimal(str(total_amount))
+    key = {
+        'date': timezone.localdate(created_at),
+        'payment_type': payment_type,
+        'status': status,
+    }
+    return key, total_amount, int(total_amount // BONUS_POINTS_PER_AZN)
+
+
+def _add_to_rollup(key, revenue, order_count, bonus_points):
+    values = {
+        'revenue': F('revenue') + revenue,
+        'order_count': F('order_count') + order_count,
+        'bonus_points': F('bonus_points') + bonus_points,
+        'updated_at': timezone.now(),
+    }
+    if DailySalesRollup.objects.filter(**key).update(**values):
+        return
+    try:
+        with transaction.atomic():
+            DailySalesRollup.objects.create(
+                revenue=revenue, order_count=order_count, bonus_points=bonus_points, **key
+            )
+    except IntegrityError:
+        # Another transaction created the row first
+        DailySalesRollup.objects.filter(**key).update(**values)
+
+
+def apply_order_change(old_snapshot, new_snapshot):
+    """
+    Moves an order's contribution from its old rollup row to the new one.
+    """
+    old = _contribution(old_snapshot)
+    new = _contribution(new_snapshot)
+    if old == new:
+        return
+    if old:
+        key, revenue, bonus_points = old
+        _add_to_rollup(key, -revenue, -1, -bonus_points)
+    if new:
+        key, revenue, bonus_points = new
+        _add_to_rollup(key, revenue, 1, bonus_points)
+
+
+def apply_order_changes(changes):
+    """
+    Bulk version of apply_order_change for (old_snapshot, new_snapshot) pairs,
+    with one update per touched rollup row.
+    """
+    totals = {}
+    for old_snapshot, new_snapshot in changes:
+        for contribution, sign in ((_contribution(old_snapshot), -1), (_contribution(new_snapshot), 1)):
+            if contribution is None:
+                continue
+            key, revenue, bonus_points = contribution
+            total = totals.setdefault((key['date'], key['payment_type'], key['status']), [Decimal('0'), 0, 0])
+            total[0] += sign * revenue
+            total[1] += sign
+            total[2] += sign * bonus_points
+    for (date, payment_type, status), (revenue, order_count, bonus_points) in sorted(totals.items()):
+        if revenue or order_count or bonus_points:
+            key = {'date': date, 'payment_type': payment_type, 'status': status}
+            _add_to_rollup(key, revenue, order_count, bonus_points)
+
+
+def rebuild_rollups(start_date=None, end_date=None):
+    """
+    Recomputes rollup rows from orders with one grouped query.
+    Returns the number of rows written.
+    """
+    orders = Order.alive.all()
+    rollups = DailySalesRollup.objects.all()
+    orders = orders.filter(date_range_q('created_at', start_date, end_date))
+    if start_date:
+        rollups = rollups.filter(date__gte=start_date)
+    if end_date:
+        rollups = rollups.filter(date__lte=end_date)
+
+    rows = (
+        orders.annotate(day=TruncDate('created_at'))
+        .values('day', 'payment_type', 'status')
+        .annotate(
+            revenue=Sum('total_amount'),
+            order_count=Count('id'),
+            bonus_points=Sum(Floor(F('total_amount') / BONUS_POINTS_PER_AZN)),
+        )
+        .order_by()
+    )
+    new_rollups = [
+        DailySalesRollup(
+            date=row['day'],
+            payment_type=row['payment_type'],
+            status=row['status'],
+            revenue=row['revenue'] or 0,
+            order_count=row['order_count'],
+            bonus_points=int(row['bonus_points'] or 0),
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        rollups.delete()
+        DailySalesRollup.objects.bulk_create(new_rollups, batch_size=1000)
+    logger.info("Sales rollups rebuilt: %s - %s, rows: %s", start_date or 'start', end_date or 'today', len(new_rollups))
+    return len(new_rollups)
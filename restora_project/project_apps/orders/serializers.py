@@ -1,25 +1,42 @@
+from decimal import Decimal
+import uuid
+
 from rest_framework import serializers
-from django.db.models import Sum
+from django.db import transaction
 from django.utils import timezone
-import uuid
 
-from project_apps.customers.models import BonusTransaction
-from project_apps.notifications.models import BonusPoints
+from project_apps.customers import loyalty, stats as customer_stats
 from .models import Order, OrderItem
 from project_apps.accounts.models import User
 from project_apps.accounts.serializers import UserSerializer
 from project_apps.menu.serializers import MenuItemSerializer
 from project_apps.menu.models import MenuItem
-from project_apps.core.constants import STATUS_CHOICES, PAYMENT_TYPE_CHOICES
+from project_apps.core.constants import STATUS_CHOICES, PAYMENT_TYPE_CHOICES, ORDER_ANALYTICS_MAX_DAYS
 from project_apps.notifications.models import DiscountCode, Notification
-from project_apps.core.logging import get_logger
+from project_apps.notifications.outbox import queue_email
+from project_apps.core.logging import get_logger, lazy_attr
 
 logger = get_logger(__name__)
 
+CENTS = Decimal("0.01")
+
+
+class MenuItemPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """
+    Looks menu items up in the batch the parent order serializer loaded,
+    falling back to a query per item when used on its own.
+    """
+    def to_internal_value(self, data):
+        menu_items = self.context.get("menu_items_by_id")
+        if menu_items and str(data).isdigit() and int(data) in menu_items:
+            return menu_items[int(data)]
+        return super().to_internal_value(data)
+
+
 class OrderItemSerializer(serializers.ModelSerializer):
     menu_item = MenuItemSerializer(read_only=True)
-    menu_item_id = serializers.PrimaryKeyRelatedField(
-        queryset=MenuItem.objects.filter(is_available=True, is_deleted=False),
+    menu_item_id = MenuItemPrimaryKeyField(
+        queryset=MenuItem.alive.with_related().filter(is_available=True),
         source="menu_item",
         write_only=True
     )
@@ -52,13 +69,13 @@ class OrderItemSerializer(serializers.ModelSerializer):
 class OrderSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.filter(is_deleted=False, role="customer"),
+        queryset=User.alive.filter(role="customer"),
         source="user",
         write_only=True
     )
     created_by = UserSerializer(read_only=True)
     created_by_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.filter(is_deleted=False, role__in=["admin", "staff"]),
+        queryset=User.alive.filter(role__in=["admin", "staff"]),
         source="created_by",
         write_only=True,
         required=False,
@@ -109,118 +126,126 @@ class OrderSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Invalid payment type entered")
         return value
     
-    def create(self, validated_data):
-        from project_apps.notifications.tasks import send_email_task
-        from django.conf import settings
+    def to_internal_value(self, data):
+        # Resolve every menu item of the order with one query instead of one per line
+        menu_item_ids = set()
+        order_items = data.get("order_items") if hasattr(data, "get") else None
+        if isinstance(order_items, list):
+            for item in order_items:
+                menu_item_id = item.get("menu_item_id") if isinstance(item, dict) else None
+                if str(menu_item_id).isdigit():
+                    menu_item_ids.add(int(menu_item_id))
+        menu_item_field = self.fields["order_items"].child.fields["menu_item_id"]
+        self.context["menu_items_by_id"] = menu_item_field.get_queryset().in_bulk(menu_item_ids)
+        return super().to_internal_value(data)
 
+    def create(self, validated_data):
         order_items_data = validated_data.pop("order_items")
         discount_code = validated_data.pop("discount_code", None)
-        total_amount = 0
-        for item_data in order_items_data:
-            total_amount += item_data["quantity"] * item_data["menu_item"].get_discounted_price()
-
-        # Applying discount code
-        discount_percentage = 0
-        if discount_code:
-            discount = DiscountCode.objects.filter(
-                code=discount_code, is_deleted=False, is_used=False
-            ).first()
-            if not discount:
-                raise serializers.ValidationError("Invalid or already used discount code.")
-            if discount.user != validated_data.get("user"):
-                raise serializers.ValidationError("This discount code is not for you.")
-            if discount.notification and discount.notification.title == "70% Discount for First Order":
-                if Order.objects.filter(user=validated_data.get("user"), is_deleted=False).exists():
-                    raise serializers.ValidationError(
-                        "The 70% discount code is only valid for the first order."
-                    )
-                discount_percentage = 70.00
-            elif discount.notification and discount.notification.title == "50 AZN Order Discount":
-                discount_percentage = 20.00
-            else:
-                discount_percentage = 20.00
-            total_amount *= (1 - discount_percentage / 100)
-            discount.is_used = True
-            discount.save()
-            logger.info(
-                f"{discount_percentage}% discount applied: "
-                f"Customer: {discount.user.email}, Code: {discount.code}, "
-                f"New amount: {total_amount} AZN"
-            )
-
-        validated_data["total_amount"] = total_amount
-        order = Order.objects.create(**validated_data)
-
-        for item_data in order_items_data:
-            OrderItem.objects.create(
-                order=order,
-                menu_item=item_data["menu_item"],
-                quantity=item_data["quantity"],
-                price=item_data["menu_item"].get_discounted_price(),
-            )
-
-        # Bonus points
-        bonus_points = 0
-        if total_amount >= 50:
-            bonus_points = 5
-            BonusTransaction.objects.create(
-                user=order.user,
-                points=bonus_points,
-                description="Bonus earned from 50 AZN order",
-                order=order
-            )
-            bonus_obj, created = BonusPoints.objects.get_or_create(
-                user=order.user,
-                defaults={"points": bonus_points}
-            )
-            if not created:
-                bonus_obj.points += bonus_points
-                bonus_obj.save()
-            logger.info(
-                f"Bonus earned: ID {order.id}, "
-                f"Customer: {order.user.email}, Points: {bonus_points}"
-            )
-
-        # 50 AZN discount code
-        if total_amount >= 50:
-            discount_code = str(uuid.uuid4())[:8]
-            notification = Notification.objects.create(
-                user=order.user,
-                title="50 AZN Order Discount",
-                message=(
-                    f"Dear {order.user.email},\n\n"
-                    f"You earned a 20% discount code for orders of 50 AZN or more!\n"
-                    f"Code: {discount_code}\n"
-                    f"You can use it for your next order."
-                ),
-                sent_at=timezone.now()
-            )
-            DiscountCode.objects.create(
-                user=order.user,
-                code=discount_code,
-                notification=notification
-            )
-            send_email_task.delay(
-                subject="Discount Code for Your 50 AZN Order!",
-                message=notification.message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[order.user.email]
-            )
-            logger.info(
-                f"50 AZN discount code sent: Customer: {order.user.email}, Code: {discount_code}"
-            )
+        customer = validated_data.get("user")
+        prices = [item_data["menu_item"].get_discounted_price() for item_data in order_items_data]
+        total_amount = sum(
+            (item_data["quantity"] * price for item_data, price in zip(order_items_data, prices)),
+            Decimal("0"),
+        )
+
+        with transaction.atomic():
+            # Applying discount code
+            if discount_code:
+                discount = (
+                    DiscountCode.alive.select_for_update(of=("self",))
+                    .select_related("notification")
+                    .filter(code=discount_code, is_used=False)
+                    .first()
+                )
+                if not discount:
+                    raise serializers.ValidationError("Invalid or already used discount code.")
+                if discount.user_id != customer.id:
+                    raise serializers.ValidationError("This discount code is not for you.")
+                if discount.notification and discount.notification.title == "70% Discount for First Order":
+                    if customer_stats.has_orders(customer.id):
+                        raise serializers.ValidationError(
+                            "The 70% discount code is only valid for the first order."
+                        )
+                    discount_percentage = 70
+                else:
+                    discount_percentage = 20
+                total_amount = total_amount * (100 - discount_percentage) / 100
+                discount.is_used = True
+                discount.save(update_fields=["is_used", "updated_at"])
+                logger.info(
+                    f"{discount_percentage}% discount applied: "
+                    f"Customer: {customer.email}, Code: {discount.code}, "
+                    f"New amount: {total_amount} AZN"
+                )
+
+            validated_data["total_amount"] = total_amount.quantize(CENTS)
+            order = Order.objects.create(**validated_data)
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    menu_item=item_data["menu_item"],
+                    quantity=item_data["quantity"],
+                    price=Decimal(price).quantize(CENTS),
+                )
+                for item_data, price in zip(order_items_data, prices)
+            ])
+            # The order is committed either way, a failed reward is logged instead of failing the request
+            transaction.on_commit(lambda: grant_order_rewards(order), robust=True)
 
         logger.info(
-            f"Order created: ID {order.id}, "
-            f"Customer: {order.user.email}, Amount: {order.total_amount} AZN"
+            f"Order created: ID {order.id}, Customer: {customer.email}, "
+            f"Items: {len(order_items_data)}, Amount: {order.total_amount} AZN"
         )
         return order
 
 
+def grant_order_rewards(order):
+    """
+    Bonus points and the 50 AZN discount code, run once the order is committed.
+    """
+    if order.total_amount < 50:
+        return
+
+    bonus_points = 5
+    discount_code = str(uuid.uuid4())[:8]
+    with transaction.atomic():
+        loyalty.add_points(order.user_id, bonus_points, "Bonus earned from 50 AZN order", order=order)
+        notification = Notification.objects.create(
+            user=order.user,
+            title="50 AZN Order Discount",
+            message=(
+                f"Dear {order.user.email},\n\n"
+                f"You earned a 20% discount code for orders of 50 AZN or more!\n"
+                f"Code: {discount_code}\n"
+                f"You can use it for your next order."
+            ),
+            sent_at=timezone.now()
+        )
+        DiscountCode.objects.create(
+            user=order.user,
+            code=discount_code,
+            notification=notification
+        )
+        queue_email(
+            f"order-discount:{order.id}",
+            subject="Discount Code for Your 50 AZN Order!",
+            message=notification.message,
+            recipient_list=[order.user.email],
+        )
+    logger.info(
+        "Bonus earned: ID %s, Customer: %s, Points: %s", order.id, lazy_attr(order, 'user.email'), bonus_points
+    )
+    logger.info(
+        "50 AZN discount code queued: Customer: %s, Code: %s", lazy_attr(order, 'user.email'), discount_code
+    )
+
+
 class SalesReportSerializer(serializers.Serializer):
     start_date = serializers.DateField(required=True)
     end_date = serializers.DateField(required=True)
     payment_type = serializers.ChoiceField(choices=PAYMENT_TYPE_CHOICES, required=False)
+    include_orders = serializers.BooleanField(required=False, default=False)
     orders = OrderSerializer(many=True, read_only=True)
     total_amount = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     order_count = serializers.IntegerField(read_only=True)
@@ -230,3 +255,18 @@ class SalesReportSerializer(serializers.Serializer):
         if data['start_date'] > data['end_date']:
             raise serializers.ValidationError("Start date cannot be greater than end date")
         return data
+
+
+class SalesAnalyticsSerializer(serializers.Serializer):
+    start_date = serializers.DateField(required=True)
+    end_date = serializers.DateField(required=True)
+    payment_type = serializers.ChoiceField(choices=PAYMENT_TYPE_CHOICES, required=False)
+    status = serializers.ChoiceField(choices=STATUS_CHOICES, required=False)
+    top = serializers.IntegerField(required=False, default=10, min_value=1, max_value=100)
+
+    def validate(self, data):
+        if data['start_date'] > data['end_date']:
+            raise serializers.ValidationError("Start date cannot be greater than end date")
+        if (data['end_date'] - data['start_date']).days >= ORDER_ANALYTICS_MAX_DAYS:
+            raise serializers.ValidationError(f"Date range cannot be longer than {ORDER_ANALYTICS_MAX_DAYS} days")
+        return data
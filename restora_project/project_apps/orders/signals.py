@@ -1,27 +1,75 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from project_apps.accounts.models import User
-from project_apps.notifications.models import BonusPoints
+from project_apps.core.bulk import defer_to_batch, register_batch_hook, skip_in_bulk
+from project_apps.customers import loyalty, stats as customer_stats
 from .models import Order, OrderItem
-from project_apps.core.logging import get_logger
+from .rollups import apply_order_change, apply_order_changes
+from project_apps.core.logging import get_logger, lazy_attr
 
 logging = get_logger(__name__)
 
 @receiver(post_save, sender=Order)
-def update_bonus_points(sender, instance, created, **kwargs):
-    if created and not instance.is_deleted:
-        points_obj, _ = BonusPoints.objects.get_or_create(user=instance.user, is_deleted=False)
-        points_obj.points += instance.calculate_bonus_points()
-        points_obj.save()
-        logging.info(f"Xallar elave olundu: {instance.user.email}, xal: {instance.calculate_bonus_points()}")
-
-@receiver(post_save, sender=Order)
+@skip_in_bulk
 def log_order_creation(sender, instance, created, **kwargs):
     if created:
-        logging.info(f"Yeni sifaris yaradildi: #{instance.id}, musteri: {instance.user.email}")
+        logging.info("Yeni sifaris yaradildi: #%s, musteri: %s", instance.id, lazy_attr(instance, 'user.email'))
 
 @receiver(post_save, sender=OrderItem)
+@skip_in_bulk
 def log_order_item_creation(sender, instance, created, **kwargs):
     if created:
-        logging.info(f"Yeni sifaris elementi: {instance.menu_item.name}, say: {instance.quantity}")
\ No newline at end of file
+        logging.info("Yeni sifaris elementi: %s, say: %s", lazy_attr(instance, 'menu_item.name'), instance.quantity)
+
+@receiver(pre_save, sender=Order)
+def remember_sales_snapshot(sender, instance, **kwargs):
+    # Orders loaded with deferred fields have no snapshot, read the stored row once
+    if instance._state.adding or getattr(instance, '_sales_snapshot', None) is not None:
+        return
+    instance._sales_snapshot = Order.objects.filter(pk=instance.pk).values_list(
+        'created_at', 'payment_type', 'status', 'total_amount', 'is_deleted', 'user_id'
+    ).first()
+
+@receiver(post_save, sender=Order)
+def apply_order_snapshot(sender, instance, created, **kwargs):
+    # Sales rollup, customer stats and bonus points all move by the same snapshot difference,
+    # the snapshots name the customer, so an order moved to another customer leaves the old one
+    old_snapshot = None if created else getattr(instance, '_sales_snapshot', None)
+    new_snapshot = instance.sales_snapshot()
+    if defer_to_batch(instance, created, snapshot=old_snapshot):
+        instance._sales_snapshot = new_snapshot
+        return
+    apply_order_change(old_snapshot, new_snapshot)
+    if created or old_snapshot is not None:
+        customer_stats.apply_order_change(old_snapshot, new_snapshot)
+        loyalty.apply_order_change(instance, old_snapshot, new_snapshot)
+    instance._sales_snapshot = new_snapshot
+
+@receiver(post_delete, sender=Order)
+def remove_order_snapshot(sender, instance, **kwargs):
+    old_snapshot = getattr(instance, '_sales_snapshot', None) or instance.sales_snapshot()
+    if defer_to_batch(instance, snapshot=old_snapshot):
+        return
+    apply_order_change(old_snapshot, None)
+    customer_stats.apply_order_change(old_snapshot, None)
+    loyalty.apply_order_change(instance, old_snapshot, None)
+
+@register_batch_hook(Order)
+def replay_order_snapshots(rows):
+    # Snapshots from before the batch against the rows as they are now, deleted orders have none
+    current = {
+        pk: snapshot
+        for pk, *snapshot in Order.objects.filter(pk__in=[row.pk for row in rows]).values_list(
+            'pk', 'created_at', 'payment_type', 'status', 'total_amount', 'is_deleted', 'user_id'
+        )
+    }
+    changes = [
+        (row.instance, row.state.get('snapshot'), tuple(current[row.pk]) if row.pk in current else None)
+        for row in rows
+    ]
+    apply_order_changes([(old, new) for _, old, new in changes])
+    # Orders moved to another customer change the stats of the previous one too
+    customer_stats.rebuild_customer_stats(
+        {order.user_id for order, _, _ in changes} | {old[5] for _, old, _ in changes if old is not None}
+    )
+    loyalty.apply_order_changes(changes)
@@ -0,0 +1,74 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from project_apps.accounts.models import User
+from project_apps.orders.models import DailySalesRollup, Order
+
+
+class DailySalesRollupTest(TestCase):
+    def setUp(self):
+        with patch('project_apps.notifications.signals.send_discount_code_email.delay'):
+            self.customer = User.objects.create_user(
+                username="rollupuser", password="testpassword", email="rollup@example.com"
+            )
+        self.today = timezone.localdate()
+
+    def _rows(self):
+        return {
+            (row.date, row.payment_type, row.status): (row.revenue, row.order_count, row.bonus_points)
+            for row in DailySalesRollup.objects.all()
+        }
+
+    def test_create_adds_to_rollup(self):
+        Order.objects.create(user=self.customer, total_amount=Decimal('45.50'), payment_type='card')
+        Order.objects.create(user=self.customer, total_amount=Decimal('12.00'), payment_type='card')
+
+        self.assertEqual(
+            self._rows(),
+            {(self.today, 'card', 'pending'): (Decimal('57.50'), 2, 5)},
+        )
+
+    def test_status_change_moves_order_between_rows(self):
+        order = Order.objects.create(user=self.customer, total_amount=Decimal('30.00'))
+        order = Order.objects.get(pk=order.pk)
+        order.status = 'completed'
+        order.save()
+
+        self.assertEqual(
+            self._rows(),
+            {
+                (self.today, 'cash', 'pending'): (Decimal('0.00'), 0, 0),
+                (self.today, 'cash', 'completed'): (Decimal('30.00'), 1, 3),
+            },
+        )
+
+    def test_soft_delete_and_restore(self):
+        order = Order.objects.create(user=self.customer, total_amount=Decimal('20.00'))
+        order.delete()
+        self.assertEqual(self._rows()[(self.today, 'cash', 'pending')], (Decimal('0.00'), 0, 0))
+
+        Order.objects.get(pk=order.pk).restore()
+        self.assertEqual(self._rows()[(self.today, 'cash', 'pending')], (Decimal('20.00'), 1, 2))
+
+    def test_backfill_matches_incremental_rows(self):
+        Order.objects.create(user=self.customer, total_amount=Decimal('19.99'), payment_type='card')
+        old = Order.objects.create(user=self.customer, total_amount=Decimal('70.00'))
+        Order.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=3))
+        deleted = Order.objects.create(user=self.customer, total_amount=Decimal('5.00'))
+        deleted.delete()
+
+        DailySalesRollup.objects.all().delete()
+        call_command('backfill_sales_rollup', verbosity=0)
+
+        self.assertEqual(
+            self._rows(),
+            {
+                (self.today, 'card', 'pending'): (Decimal('19.99'), 1, 1),
+                (self.today - timedelta(days=3), 'cash', 'pending'): (Decimal('70.00'), 1, 7),
+            },
+        )
@@ -1,8 +1,8 @@
 from django.db import models
 
 from project_apps.accounts.models import User
-from project_apps.core.mixins import TimestampMixin, SoftDeleteMixin
-from project_apps.core.logging import get_logger
+from project_apps.core.mixins import TimestampMixin, SoftDeleteMixin, alive_index
+from project_apps.core.logging import get_logger, lazy_attr
 from project_apps.core.constants import ROLE_CHOICES
 
 logger = get_logger(__name__)
@@ -22,7 +22,7 @@ class Staff(TimestampMixin, SoftDeleteMixin, models.Model):
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        logger.info(f"Staff created/updated: {self.user.email}, Role: {self.role}")
+        logger.info("Staff created/updated: %s, Role: %s", lazy_attr(self, 'user.email'), self.role)
 
     def __str__(self):
         return f"{self.user.email} ({self.role})"
@@ -30,3 +30,6 @@ class Staff(TimestampMixin, SoftDeleteMixin, models.Model):
     class Meta:
         verbose_name = "staff"
         verbose_name_plural = "staff members"
+        indexes = [
+            alive_index('role', name='staff_role_alive_idx'),
+        ]
@@ -9,7 +9,7 @@ from project_apps.core.constants import ROLE_CHOICES
 class StaffSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.filter(is_deleted=False),
+        queryset=User.alive.all(),
         source="user",
         write_only=True
     )
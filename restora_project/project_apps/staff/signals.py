@@ -2,12 +2,14 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 from project_apps.accounts.models import User
+from project_apps.core.bulk import skip_in_bulk
 from project_apps.core.logging import get_logger
 
 logging = get_logger(__name__)
 
 
 @receiver(post_save, sender=User)
+@skip_in_bulk
 def log_user_creation(sender, instance, created, **kwargs):
     if created:
-        logging.info(f"yeni istifadeci yaradildi: {instance.email}")
\ No newline at end of file
+        logging.info("yeni istifadeci yaradildi: %s", instance.email)
\ No newline at end of file
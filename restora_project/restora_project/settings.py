@@ -4,6 +4,11 @@ from dotenv import load_dotenv
 from datetime import timedelta
 import logging
 
+import dj_database_url
+
+from project_apps.core.db import connection_settings
+from project_apps.core.logging import parse_log_levels
+
 logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -62,6 +67,7 @@ ELASTICSEARCH_DSL = {
         'hosts': 'http://elasticsearch:9200'
     },
 }
+ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = 'project_apps.core.indexing.QueuedSignalProcessor'
 
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -75,8 +81,28 @@ DATABASES = {
         'PORT': os.getenv('POSTGRES_PORT', '5432'),
     }
 }
+# Overrides the settings above, e.g. DATABASE_URL=sqlite:///bench.sqlite3 for local benchmark runs
+if os.getenv('DATABASE_URL'):
+    DATABASES['default'] = dj_database_url.parse(os.getenv('DATABASE_URL'))
+# Optional read replica. Reads of the views and tasks marked with replica_reads go there
+if os.getenv('REPLICA_DATABASE_URL'):
+    DATABASES['replica'] = dj_database_url.parse(os.getenv('REPLICA_DATABASE_URL'))
+    # Tests run against one database, the replica reads it too
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['project_apps.core.db.ReplicaRouter']
+# After a write, the client reads from the primary for this long, to cover replication lag
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 10))
+
+# Connection reuse for web and Celery workers, see connection_settings() for the modes.
+# Celery's Django fixup applies it around every task.
+DB_CONNECTION_MODE = os.getenv('DB_CONNECTION_MODE', 'persistent')
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
+for database in DATABASES.values():
+    database.update(connection_settings(DB_CONNECTION_MODE, DB_CONN_MAX_AGE))
 
 MIDDLEWARE = [
+    'project_apps.core.metrics.RequestMetricsMiddleware',
+    'project_apps.core.db.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -94,8 +120,13 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'project_apps.core.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', 50)),
 }
 
+# Upper bound for the ?page_size= query parameter of list endpoints
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 500))
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Restaurant API',
     'DESCRIPTION': 'API for restaurant orders, menus, and customer services.',
@@ -160,73 +191,65 @@ CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
+REDIS_CACHE_URL = os.getenv('REDIS_CACHE_URL')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+            'KEY_PREFIX': 'restora',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+MENU_CACHE_TIMEOUT = int(os.getenv('MENU_CACHE_TIMEOUT', 60 * 60))
+
+LOG_DIR = os.getenv('LOG_DIR', '/app/logs')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.1))  # Share of hot-path records that are kept
+
+# One queue handler on the root logger; a background thread per process writes JSON lines
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
-    'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
-            'style': '{',
-        },
-        'simple': {
-            'format': '{levelname} {message}',
-            'style': '{',
-        },
-    },
     'handlers': {
-        'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
-        },
-        'file': {
-            'class': 'logging.handlers.RotatingFileHandler',
-            'filename': '/app/logs/django.log',
-            'maxBytes': 10*1024*1024,
-            'backupCount': 5,
-            'formatter': 'verbose',
-            'encoding': 'utf-8',
-        },
-        'error_file': {
-            'class': 'logging.handlers.RotatingFileHandler',
-            'filename': '/app/logs/django_error.log',
-            'maxBytes': 10*1024*1024,
-            'backupCount': 5,
-            'formatter': 'verbose',
-            'encoding': 'utf-8',
-        },
-        'app_file': {
-            'class': 'logging.handlers.RotatingFileHandler',
-            'filename': '/app/logs/app.log',
-            'maxBytes': 10*1024*1024,
-            'backupCount': 5,
-            'formatter': 'verbose',
-            'encoding': 'utf-8',
+        'queue': {
+            '()': 'project_apps.core.logging.BackgroundLogHandler',
+            'log_file': os.path.join(LOG_DIR, 'app.log'),
+            'error_file': os.path.join(LOG_DIR, 'error.log'),
+            'console': os.getenv('LOG_CONSOLE', 'True') == 'True',
         },
     },
+    'root': {
+        'handlers': ['queue'],
+        'level': LOG_LEVEL,
+    },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
             'level': 'INFO',
-            'propagate': True,
-        },
-        'django.request': {
-            'handlers': ['error_file', 'console'],
-            'level': 'ERROR',
-            'propagate': False,
-        },
-        'project_apps': {
-            'handlers': ['console', 'file', 'app_file'],
-            'level': 'DEBUG',
-            'propagate': True,
-        },
-        '': {
-            'handlers': ['console', 'file'],
-            'level': 'DEBUG',
-            'propagate': True,
         },
+        # Per-logger overrides, e.g. LOG_LEVELS="project_apps.orders=DEBUG,django.db.backends=WARNING"
+        **parse_log_levels(os.getenv('LOG_LEVELS', '')),
     },
 }
 
+# Request metrics: Server-Timing headers and the /restaurant/metrics/ scrape endpoint
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Per-view limits by URL name; a request over any limit is logged and counted.
+# Keys: duration_ms, queries, query_time_ms, duplicate_queries, response_bytes
+PERFORMANCE_BUDGETS = {
+    'default': {'duration_ms': 500, 'queries': 20, 'duplicate_queries': 5},
+    'order_list': {'duration_ms': 800, 'queries': 30},
+    'sales_report_export': {'duration_ms': 5000, 'response_bytes': 50 * 1024 * 1024},
+    'menu_search': {'duration_ms': 300, 'queries': 5},
+}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -3,11 +3,13 @@ from django.contrib import admin
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from project_apps.core.metrics import metrics_view
 from . import api_urls
 
 urlpatterns = [
     path('restaurant/admin/', admin.site.urls),
     path('restaurant/api/v1/', include(api_urls)),
+    path('restaurant/metrics/', metrics_view, name='metrics'),
     path('restaurant/api/v1/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('restaurant/api/v1/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('restaurant/api/v1/schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),